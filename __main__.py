@@ -133,6 +133,16 @@ def parse_args(cmdln_args):
         type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
     )
 
+    parser.add_argument(
+        "--full-refresh",
+        help="Reload the whole report instead of syncing the changes since "
+             "the last run (Jira worklog and filter reports, "
+             "testrail-test-case-coverage)",
+        required=False,
+        action="store_true",
+        default=False,
+    )
+
     return parser.parse_args(args=cmdln_args)
 
 
@@ -61,8 +61,13 @@ class BitriseClient(Bitrise):
         self.db.report_bitrise_builds_info(payload_filtered)
 
     def database_latest_build(self):
-        # Fetch latest triggered_at
-        latest_ts = self.db.session.query(func.max(ReportBitriseBuildsCount.triggered_at)).scalar() # noqa
+        # Fetch latest triggered_at: the sync cursor, or the table's max
+        # before the first cursor is written
+        cursor = self.db.get_sync_state('bitrise', 'builds')
+        if cursor and cursor.synced_until:
+            latest_ts = cursor.synced_until
+        else:
+            latest_ts = self.db.session.query(func.max(ReportBitriseBuildsCount.triggered_at)).scalar() # noqa
         print(latest_ts)
         # Assuming you already have this from your DB
         dt = latest_ts
@@ -85,18 +90,29 @@ class DatabaseBitrise(Database):
         self.db = Database()
 
     def report_bitrise_builds_info(self, payload):
-        for index, row in payload.iterrows():
-            report = ReportBitriseBuildsCount(
-                build_number=row['build_number'],
-                branch=row['branch'],
-                status=row['status'],
-                status_text=row['status_text'],
-                triggered_workflow=row['triggered_workflow'],
-                triggered_by=row['triggered_by'],
-                triggered_at=dt.parse_iso_timestamp(row['triggered_at'])
+        triggered_at = payload['triggered_at'].map(dt.parse_iso_timestamp)
+        # Builds and the sync cursor are committed together
+        self.bulk_insert(
+            ReportBitriseBuildsCount,
+            payload.assign(triggered_at=triggered_at),
+            {
+                'build_number': 'build_number',
+                'branch': 'branch',
+                'status': 'status',
+                'status_text': 'status_text',
+                'triggered_workflow': 'triggered_workflow',
+                'triggered_by': 'triggered_by',
+                'triggered_at': 'triggered_at',
+            },
+            commit=False,
+        )
+        synced_until = dt.to_naive_utc(triggered_at.max())
+        if synced_until is not None:
+            self.set_sync_state(
+                'bitrise', 'builds',
+                synced_until=synced_until.to_pydatetime(),
             )
-            self.session.add(report)
-            self.session.commit()
+        self.session.commit()
 
     def report_bitrise_builds_count(self, payload):
         # Normalize the JSON data
@@ -17,6 +17,7 @@ from constants import PRODUCTS, FIELDS
 from constants import BUGZILLA_BUGS_FIELDS, BUGZILLA_QA_WHITEBOARD_FILTER
 from constants import BUGZILLA_QA_WHITEBOARD_OVERALL_FILTER
 from lib.bugzilla_conn import BugzillaAPIClient
+from lib.http_conn import get_session
 from utils.datetime_utils import DatetimeUtils
 from utils.retry_bz import with_retry
 
@@ -40,12 +41,21 @@ BZ_HIST_BATCH_SIZE = 200
 TIMEOUT = 30
 RETRY = 2
 SLEEP_SEC: float = 0.2
+# Re-read this much before the change cursor, so bugs changed while the
+# previous run was querying are not missed (upserts are idempotent)
+DESKTOP_BUGS_CHANGES_OVERLAP_HOURS = 1
+
+
+def _join_keywords(keywords):
+    """Bugzilla keyword list -> "a, b" (None when not a list)."""
+    return ", ".join(keywords) if isinstance(keywords, list) else None
 
 
 class Bugz:
 
     def __init__(self) -> None:
         self.conn = BugzillaAPIClient()
+        self.session = get_session('bugzilla')
 
     def get_bugs(self, bug_ids: list) -> list:
         bugs = with_retry(self.conn.bz_client.getbugs, bug_ids)
@@ -72,7 +82,7 @@ class Bugz:
     """
     def fetch_bug_history(self, bug_id: int, timeout: int = TIMEOUT) -> list[tuple]:
         url = f"{BUGZILLA_API_BASE}/bug/{bug_id}/history"
-        r = requests.get(url, timeout=timeout)
+        r = self.session.get(url, timeout=timeout)
         r.raise_for_status()
         j = r.json()
 
@@ -131,8 +141,8 @@ class Bugz:
             err: Exception | None = None
             for attempt in range(retries + 1):
                 try:
-                    # Reuse same session by temporarily swapping in self.fetch_bug_history's call # noqa
-                    # fetch_bug_history accepts timeout; it constructs and uses requests.get directly. # noqa
+                    # fetch_bug_history goes through the shared pooled session,
+                    # so worker threads reuse keep-alive connections.
                     # Keep using that method for consistency and single parsing logic.
                     history = self.fetch_bug_history(bug_id, timeout=timeout)
                     return bug_id, history
@@ -298,7 +308,7 @@ class BugzillaClient(Bugz):
         BUGZILLA_VERSION_FLOOR = 140  # keep all versions starting from this one
 
         url = f"{BUGZILLA_API_BASE}/field/bug"
-        r = requests.get(url, timeout=30)
+        r = self.session.get(url, timeout=30)
         r.raise_for_status()
         names = [f["name"] for f in r.json().get("fields", []) if "name" in f]
 
@@ -438,7 +448,11 @@ class BugzillaClient(Bugz):
     def bugzilla_query_desktop_bugs(self):
         # Get latest entry in database to update bugs
         now_utc = datetime.utcnow()
-        last_creation_time = self.db.session.query(func.max(ReportBugzillaSoftvisionBugs.bugzilla_bug_created_at)).scalar() # noqa
+        cursor = self.db.get_sync_state('bugzilla', 'desktop_bugs')
+        if cursor and cursor.synced_until:
+            last_creation_time = cursor.synced_until
+        else:
+            last_creation_time = self.db.session.query(func.max(ReportBugzillaSoftvisionBugs.bugzilla_bug_created_at)).scalar() # noqa
         creation_time = (last_creation_time + DatetimeUtils.delta_seconds(1)).strftime("%Y-%m-%dT%H:%M:%SZ") # noqa
         print(f"Last fetched bug created_at: {last_creation_time}")
         print(f"Fetch new bugs after : {creation_time}")
@@ -481,8 +495,15 @@ class BugzillaClient(Bugz):
         print(df_new)
         print(f"Saved {len(df_new)} new bugs. Total now: {len(df_new)}")
 
-        # Insert data
-        self.db.report_bugzilla_desktop_bugs_update_insert(df_new)
+        # Insert data, moving the creation cursor in the same transaction
+        self.db.report_bugzilla_desktop_bugs_update_insert(df_new, commit=False)
+        if not df_new.empty:
+            self.db.set_sync_state(
+                'bugzilla', 'desktop_bugs',
+                synced_until=DatetimeUtils.to_naive_utc(
+                    df_new['created_at'].max()).to_pydatetime(),
+            )
+        self.db.session.commit()
 
         # Update data
         self.bugzilla_query_desktop_bugs_update()
@@ -491,8 +512,16 @@ class BugzillaClient(Bugz):
     def bugzilla_query_desktop_bugs_update(self):
         # Query bugzilla with these fields where updated is > fecha query
 
-        # Calculate start of yesterday in UTC
-        last_change_time = (datetime.utcnow() - DatetimeUtils.delta_hours(48)).strftime("%Y-%m-%dT%H:%M:%SZ") # noqa
+        # Changes since the previous run (the change cursor), or over the
+        # last 48 hours before the first cursor is written
+        now_utc = datetime.utcnow()
+        cursor = self.db.get_sync_state('bugzilla', 'desktop_bugs_changes')
+        if cursor and cursor.synced_until:
+            since = cursor.synced_until - DatetimeUtils.delta_hours(
+                DESKTOP_BUGS_CHANGES_OVERLAP_HOURS)
+        else:
+            since = now_utc - DatetimeUtils.delta_hours(48)
+        last_change_time = since.strftime("%Y-%m-%dT%H:%M:%SZ")
         print(f"Update bugs if any after {last_change_time}")
 
         query = {
@@ -529,7 +558,11 @@ class BugzillaClient(Bugz):
         df_update = pd.DataFrame(rows)
         print(f"Updated {len(df_update)} bugs")
 
-        self.db.report_bugzilla_desktop_bugs_update_insert(df_update)
+        self.db.report_bugzilla_desktop_bugs_update_insert(
+            df_update, commit=False)
+        self.db.set_sync_state(
+            'bugzilla', 'desktop_bugs_changes', synced_until=now_utc)
+        self.db.session.commit()
 
     def bugzilla_query(self):
         all_bugs = []
@@ -557,52 +590,56 @@ class BugzillaClient(Bugz):
             "offset": 0,
         }
 
-        rows = []
         total = 0
+        seen = set()
         q = dict(base_query)
 
-        while True:
-            page = BugzillaHelper().query(q)  # returns list of bugs for this page
-            if not page:
-                break
-
-            for bug in page:
-                resolved_raw = getattr(bug, "cf_last_resolved", None)
-                resolved_at = (
-                    pd.to_datetime(str(resolved_raw))
-                    if resolved_raw
-                    else None
-                )
+        with self.db.report_bugzilla_overall_bugs_writer() as writer:
+            while True:
+                page = BugzillaHelper().query(q)  # returns list of bugs for this page
+                if not page:
+                    break
+
+                rows = []
+                for bug in page:
+                    # guard against dupes if the server shifted during paging
+                    if bug.id in seen:
+                        continue
+                    seen.add(bug.id)
+
+                    resolved_raw = getattr(bug, "cf_last_resolved", None)
+                    resolved_at = (
+                        pd.to_datetime(str(resolved_raw))
+                        if resolved_raw
+                        else None
+                    )
+
+                    rows.append({
+                        "bug_id": bug.id,
+                        "summary": bug.summary,
+                        "product": bug.product,
+                        "qa_whiteboard": getattr(bug, "cf_qa_whiteboard", ""),
+                        "severity": bug.severity,
+                        "priority": bug.priority,
+                        "status": bug.status,
+                        "resolution": bug.resolution,
+                        "created_at": pd.to_datetime(str(bug.creation_time)),
+                        "last_change_time": pd.to_datetime(str(bug.last_change_time)),
+                        "whiteboard": bug.whiteboard,
+                        "keyword": _join_keywords(bug.keywords),
+                        "resolved_at": resolved_at,
+                    })
+
+                # Rows are written behind while the next page is fetched
+                writer.put(rows)
+                total += len(page)
+                print(f"Fetched {total} so far (page size {len(page)})")
 
-                rows.append({
-                    "bug_id": bug.id,
-                    "summary": bug.summary,
-                    "product": bug.product,
-                    "qa_whiteboard": getattr(bug, "cf_qa_whiteboard", ""),
-                    "severity": bug.severity,
-                    "priority": bug.priority,
-                    "status": bug.status,
-                    "resolution": bug.resolution,
-                    "created_at": pd.to_datetime(str(bug.creation_time)),
-                    "last_change_time": pd.to_datetime(str(bug.last_change_time)),
-                    "whiteboard": bug.whiteboard,
-                    "keyword": bug.keywords,
-                    "resolved_at": resolved_at,
-                })
-
-            total += len(page)
-            print(f"Fetched {total} so far (page size {len(page)})")
-
-            if len(page) < PAGE_SIZE:
-                break  # last page
-            q["offset"] += PAGE_SIZE
-
-        # Convert to DataFrame + guard against dupes if the server shifted during paging
-        df = pd.DataFrame(rows).drop_duplicates(subset=["bug_id"], keep="last")
-        print(f"Total {len(df)} bugs tracked after dedupe")
-        self.db.clean_table(ReportBugzillaOverallBugs)
-
-        self.db.report_bugzilla_overall_bugs(df)
+                if len(page) < PAGE_SIZE:
+                    break  # last page
+                q["offset"] += PAGE_SIZE
+
+        print(f"Total {len(seen)} bugs tracked after dedupe")
 
     def bugzilla_meta_bug(self, meta_bug_id: int):
         bug = self.BugzillaHelperClient.get_bug(meta_bug_id)
@@ -637,8 +674,6 @@ class BugzillaClient(Bugz):
 
         # Create DataFrame
         df = pd.DataFrame(rows)
-        self.db.clean_table(ReportBugzillaMetaBugs)
-
         self.db.report_bugzilla_meta_bug(df)
 
     def bugzilla_query_qe_verify(self):
@@ -828,26 +863,22 @@ class DatabaseBugzilla(Database):
         return df
 
     def report_bugzilla_qa_needed_insert(self, payload):
-        for index, row in payload.iterrows():
-            print(row)
-            try:
-                report = ReportBugzillaQENeeded(
-                            bugzilla_key=row['bugzilla_key'],
-                            bugzilla_summary=row['bugzilla_summary'],
-                            buzilla_modified_at=row['bugzilla_modified_at'],
-                            bugzilla_tag_name=row['bugzilla_tag_name'],
-                            bugzilla_created_at=row['bugzilla_created_at'],
-                            bugzilla_tag_status=row['bugzilla_tag_status'],
-                            bugzilla_tag_setter=row['bugzilla_tag_setter'],
-                            bugzilla_bug_severity=row['bugzilla_bug_severity'],
-                            bugzilla_bug_priority=row['bugzilla_bug_priority'],
-                            bugzilla_bug_status=row['bugzilla_bug_status'],
-                            bugzilla_bug_resolution=row['bugzilla_bug_resolution'] # noqa
-                )
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-            self.session.add(report)
-        self.session.commit()
+        try:
+            self.bulk_insert(ReportBugzillaQENeeded, payload, {
+                'bugzilla_key': 'bugzilla_key',
+                'bugzilla_summary': 'bugzilla_summary',
+                'bugzilla_modified_at': 'buzilla_modified_at',
+                'bugzilla_tag_name': 'bugzilla_tag_name',
+                'bugzilla_created_at': 'bugzilla_created_at',
+                'bugzilla_tag_status': 'bugzilla_tag_status',
+                'bugzilla_tag_setter': 'bugzilla_tag_setter',
+                'bugzilla_bug_severity': 'bugzilla_bug_severity',
+                'bugzilla_bug_priority': 'bugzilla_bug_priority',
+                'bugzilla_bug_status': 'bugzilla_bug_status',
+                'bugzilla_bug_resolution': 'bugzilla_bug_resolution',
+            })
+        except KeyError as e:
+            print(f"Missing key: {e} in payload")
 
     def report_bugzilla_qa_needed_count(self, payload):
         total_rows = len(payload)
@@ -863,179 +894,126 @@ class DatabaseBugzilla(Database):
         self.session.commit()
 
     def report_bugzilla_query_release_flags_for_bugs(self, payload):
-        for index, row in payload.iterrows():
-            try:
-                bugzilla_bug_keywords = (
-                    ", ".join(row["keywords"])
-                    if isinstance(row["keywords"], list)
-                    else None
-                )
-                report = ReportBugzillaReleaseFlagsBugs(
-                    bugzilla_key=row['bugzilla_key'],
-                    bugzilla_bug_type=row['type'],
-                    bugzilla_release_version=row['flag-version'],
-                    bugzilla_bug_status=row['status'],
-                    bugzilla_bug_keywords=bugzilla_bug_keywords,
-                    bugzilla_bug_severity=row['severity'],
-                    bugzilla_bug_qa_found_in=row['qa-found-in'],
-                    bugzilla_bug_resolution=row['resolution'],
-                    bugzilla_bug_flag_fixed_at=None if pd.isna(row['bugzilla_flag_fixed_at']) else row['bugzilla_flag_fixed_at']) # noqa
-                self.session.add(report)
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-        self.session.commit()
+        try:
+            self.bulk_insert(
+                ReportBugzillaReleaseFlagsBugs,
+                payload.assign(keywords=payload['keywords'].map(_join_keywords)),
+                {
+                    'bugzilla_key': 'bugzilla_key',
+                    'type': 'bugzilla_bug_type',
+                    'flag-version': 'bugzilla_release_version',
+                    'status': 'bugzilla_bug_status',
+                    'keywords': 'bugzilla_bug_keywords',
+                    'severity': 'bugzilla_bug_severity',
+                    'qa-found-in': 'bugzilla_bug_qa_found_in',
+                    'resolution': 'bugzilla_bug_resolution',
+                    'bugzilla_flag_fixed_at': 'bugzilla_bug_flag_fixed_at',
+                },
+            )
+        except KeyError as e:
+            print(f"Missing key: {e} in payload")
 
     def report_bugzilla_meta_bug(self, payload):
-        for index, row in payload.iterrows():
-            print(row)
-            try:
-                report = ReportBugzillaMetaBugs(
-                    bugzilla_key=row['id'],
-                    bugzilla_summary=row['summary'],
-                    bugzilla_bug_status=row['status'],
-                    bugzilla_bug_created_at=row['creation_time'],
-                    bugzilla_bug_resolution=None if pd.isna(row['resolution']) else row['resolution'], # noqa
-                    bugzilla_bug_severity=row['severity'],
-                    bugzilla_bug_priority=row['priority'],
-                    bugzilla_bug_assigned_to=row['assigned_to'],
-                    bugzilla_bug_keyword=row['keywords'],
-                    bugzilla_bug_resolved_at=None if pd.isna(row['cf_last_resolution']) else row['cf_last_resolution'], # noqa            
-                    bugzilla_bug_parent=row['parent_bug_id'],
-                    bugzilla_bug_product=row['product']
-                )
-
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-            self.session.add(report)
-        self.session.commit()
-
-    def report_bugzilla_desktop_bugs_update_insert(self, payload):
-        for index, row in payload.iterrows():
-            try:
-                kw = row.get('keyword', [])
-                bugzilla_bug_keyword = ", ".join(kw) if isinstance(kw, list) and kw else None # noqa
-
-                bug_id = row['bug_id']
-
-                # Check if the bug already exists
-                existing = self.session.query(ReportBugzillaSoftvisionBugs).filter_by(
-                    bugzilla_key=bug_id
-                ).one_or_none()
-
-                if existing:
-                    print(f"Updating bug {bug_id}")
-                    # Compare last_change_time to update.
-                    # REST returns tz-aware timestamps; MySQL DATETIME
-                    # comes back tz-naive. Normalize both sides.
-                    last_change_remote = DatetimeUtils.to_naive_utc(
-                        row['last_change_time']
-                    )
-                    last_change_existing = DatetimeUtils.to_naive_utc(
-                        existing.bugzilla_bug_last_change_time
-                    )
-                    if last_change_remote > last_change_existing:
-                        existing.bugzilla_summary = row['summary']
-                        existing.bugzilla_product = row['product']
-                        existing.bugzilla_qa_whiteboard = row['qa_whiteboard']
-                        existing.bugzilla_bug_severity = row['severity']
-                        existing.bugzilla_bug_priority = row['priority']
-                        existing.bugzilla_bug_status = row['status']
-                        existing.bugzilla_bug_resolution = None if pd.isna(row['resolution']) else row['resolution'] # noqa
-                        existing.bugzilla_bug_created_at = row['created_at']
-                        existing.bugzilla_bug_last_change_time = row['last_change_time']
-                        existing.bugzilla_bug_whiteboard = None if pd.isna(row['whiteboard']) else row['whiteboard'] # noqa
-                        existing.bugzilla_bug_keyword = bugzilla_bug_keyword
-                        existing.bugzilla_bug_resolved_at = None if pd.isna(row['resolved_at']) else row['resolved_at'] # noqa
-                else:
-                    print(f"Inserting new bug {bug_id}")
-                    new_bug = ReportBugzillaSoftvisionBugs(
-                        bugzilla_key=bug_id,
-                        bugzilla_summary=row['summary'],
-                        bugzilla_product=row['product'],
-                        bugzilla_qa_whiteboard=row['qa_whiteboard'],
-                        bugzilla_bug_severity=row['severity'],
-                        bugzilla_bug_priority=row['priority'],
-                        bugzilla_bug_status=row['status'],
-                        bugzilla_bug_resolution=None if pd.isna(row['resolution']) else row['resolution'], # noqa
-                        bugzilla_bug_created_at=row['created_at'],
-                        bugzilla_bug_last_change_time=row['last_change_time'],
-                        bugzilla_bug_whiteboard=None if pd.isna(row['whiteboard']) else row['whiteboard'], # noqa
-                        bugzilla_bug_keyword=bugzilla_bug_keyword,
-                        bugzilla_bug_resolved_at=None if pd.isna(row['resolved_at']) else row['resolved_at'] # noqa
-                    )
-                    self.session.add(new_bug)
-
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-
-        self.session.commit()
+        try:
+            self.bulk_replace(ReportBugzillaMetaBugs, payload, {
+                'id': 'bugzilla_key',
+                'summary': 'bugzilla_summary',
+                'status': 'bugzilla_bug_status',
+                'creation_time': 'bugzilla_bug_created_at',
+                'resolution': 'bugzilla_bug_resolution',
+                'severity': 'bugzilla_bug_severity',
+                'priority': 'bugzilla_bug_priority',
+                'assigned_to': 'bugzilla_bug_assigned_to',
+                'keywords': 'bugzilla_bug_keyword',
+                'cf_last_resolution': 'bugzilla_bug_resolved_at',
+                'parent_bug_id': 'bugzilla_bug_parent',
+                'product': 'bugzilla_bug_product',
+            })
+        except KeyError as e:
+            print(f"Missing key: {e} in payload")
+
+    def report_bugzilla_desktop_bugs_update_insert(self, payload, commit=True):
+        # Upsert on bugzilla_key; an existing bug is only overwritten when
+        # the incoming last_change_time is newer (checked in SQL). Errors
+        # propagate, so callers never move a sync cursor past lost rows.
+        if payload.empty:
+            print("No bugs to upsert")
+            return
+        if 'keyword' in payload.columns:
+            keywords = payload['keyword'].map(
+                lambda kw: ", ".join(kw) if isinstance(kw, list) and kw else None
+            )
+        else:
+            keywords = None
+        affected = self.bulk_upsert(
+            ReportBugzillaSoftvisionBugs,
+            payload.assign(
+                keyword=keywords,
+                last_change_time=payload['last_change_time'].map(
+                    DatetimeUtils.to_naive_utc),
+            ),
+            {
+                'bug_id': 'bugzilla_key',
+                'summary': 'bugzilla_summary',
+                'product': 'bugzilla_product',
+                'qa_whiteboard': 'bugzilla_qa_whiteboard',
+                'severity': 'bugzilla_bug_severity',
+                'priority': 'bugzilla_bug_priority',
+                'status': 'bugzilla_bug_status',
+                'resolution': 'bugzilla_bug_resolution',
+                'created_at': 'bugzilla_bug_created_at',
+                'last_change_time': 'bugzilla_bug_last_change_time',
+                'whiteboard': 'bugzilla_bug_whiteboard',
+                'keyword': 'bugzilla_bug_keyword',
+                'resolved_at': 'bugzilla_bug_resolved_at',
+            },
+            newer_than='bugzilla_bug_last_change_time',
+            commit=commit,
+        )
+        print(f"Upserted {len(payload)} bugs ({affected} rows affected)")
 
     def report_bugzilla_query_by_keyword_insert(self, payload):
         """
         Insert rows into the ReportBugzillaQueryByKeyword table.
         """
-        for index, row in payload.iterrows():
-            try:
-                bugzilla_bug_keyword = (
-                    ", ".join(row["keyword"])
-                    if isinstance(row["keyword"], list)
-                    else None
-                )
-
-                report = ReportBugzillaQueryByKeyword(
-                    bugzilla_key=row["bug_id"],
-                    bugzilla_summary=row["summary"],
-                    bugzilla_product=row["product"],
-                    bugzilla_qa_whiteboard=row["qa_whiteboard"],
-                    bugzilla_bug_severity=row["severity"],
-                    bugzilla_bug_priority=row["priority"],
-                    bugzilla_bug_status=row["status"],
-                    bugzilla_bug_resolution=(
-                        None if pd.isna(row["resolution"]) else row["resolution"]
-                    ),
-                    bugzilla_bug_created_at=row["created_at"],
-                    bugzilla_bug_last_change_time=row["last_change_time"],
-                    bugzilla_bug_whiteboard=(
-                        None if pd.isna(row["whiteboard"]) else row["whiteboard"]
-                    ),
-                    bugzilla_bug_keyword=bugzilla_bug_keyword,
-                    bugzilla_bug_resolved_at=(
-                        None if pd.isna(row["resolved_at"]) else row["resolved_at"]
-                    ),
-                )
-
-                self.session.add(report)
-
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-
-        self.session.commit()
-
-    def report_bugzilla_overall_bugs(self, payload):
-        for index, row in payload.iterrows():
-            try:
-                bugzilla_bug_keyword = (
-                    ", ".join(row["keyword"])
-                    if isinstance(row["keyword"], list)
-                    else None
-                )
-                report = ReportBugzillaOverallBugs(
-                        bugzilla_key=row['bug_id'],
-                        bugzilla_summary=row['summary'],
-                        bugzilla_product=row['product'],
-                        bugzilla_qa_whiteboard=row['qa_whiteboard'],
-                        bugzilla_bug_severity=row['severity'],
-                        bugzilla_bug_priority=row['priority'],
-                        bugzilla_bug_status=row['status'],
-                        bugzilla_bug_resolution=None if pd.isna(row['resolution']) else row['resolution'], # noqa
-                        bugzilla_bug_created_at=row['created_at'],
-                        bugzilla_bug_last_change_time=row['last_change_time'],
-                        bugzilla_bug_whiteboard=None if pd.isna(row['whiteboard']) else row['whiteboard'], # noqa
-                        bugzilla_bug_keyword=bugzilla_bug_keyword,
-                        bugzilla_bug_resolved_at=None if pd.isna(row['resolved_at']) else row['resolved_at'] # noqa
-                    )
-                self.session.add(report)
-
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-        self.session.commit()
+        try:
+            self.bulk_insert(
+                ReportBugzillaQueryByKeyword,
+                payload.assign(keyword=payload['keyword'].map(_join_keywords)),
+                {
+                    'bug_id': 'bugzilla_key',
+                    'summary': 'bugzilla_summary',
+                    'product': 'bugzilla_product',
+                    'qa_whiteboard': 'bugzilla_qa_whiteboard',
+                    'severity': 'bugzilla_bug_severity',
+                    'priority': 'bugzilla_bug_priority',
+                    'status': 'bugzilla_bug_status',
+                    'resolution': 'bugzilla_bug_resolution',
+                    'created_at': 'bugzilla_bug_created_at',
+                    'last_change_time': 'bugzilla_bug_last_change_time',
+                    'whiteboard': 'bugzilla_bug_whiteboard',
+                    'keyword': 'bugzilla_bug_keyword',
+                    'resolved_at': 'bugzilla_bug_resolved_at',
+                },
+            )
+        except KeyError as e:
+            print(f"Missing key: {e} in payload")
+
+    def report_bugzilla_overall_bugs_writer(self):
+        """Write-behind loader replacing report_bugzilla_overall_bugs with
+        the rows put() into it (see Database.replacing)."""
+        return self.replacing(ReportBugzillaOverallBugs, {
+            'bug_id': 'bugzilla_key',
+            'summary': 'bugzilla_summary',
+            'product': 'bugzilla_product',
+            'qa_whiteboard': 'bugzilla_qa_whiteboard',
+            'severity': 'bugzilla_bug_severity',
+            'priority': 'bugzilla_bug_priority',
+            'status': 'bugzilla_bug_status',
+            'resolution': 'bugzilla_bug_resolution',
+            'created_at': 'bugzilla_bug_created_at',
+            'last_change_time': 'bugzilla_bug_last_change_time',
+            'whiteboard': 'bugzilla_bug_whiteboard',
+            'keyword': 'bugzilla_bug_keyword',
+            'resolved_at': 'bugzilla_bug_resolved_at',
+        })
@@ -14,7 +14,6 @@ from database import (
     Database,
     ReportGithubBugs
 )
-from sqlalchemy.exc import IntegrityError
 
 import pandas as pd
 
@@ -267,7 +266,7 @@ class GithubClient(Github):
     def github_update_bugs(self, project):
         issues = self.database.get_all_issues(project)
         print(f"Found {len(issues)} issues. Checking for updates...")
-        updated_count = 0
+        changed = []
 
         for issue in issues:
             issue_data = self.get_existing_issue_by_number(
@@ -281,10 +280,10 @@ class GithubClient(Github):
                 if issue.github_updated_at else None
             )
             if api_updated_at != db_updated_at:
-                self.database.update_issue(issue_data, issue.github_project)
-                updated_count += 1
+                changed.append(issue_data)
 
-        print(f"Updated {updated_count} issues.")
+        self.database.update_issues(changed, project)
+        print(f"Updated {len(changed)} issues.")
 
 
 class DatabaseGithub(Database):
@@ -317,36 +316,51 @@ class DatabaseGithub(Database):
                 """
 
     def issue_insert(self, payload, project):
-        for index, row in payload.iterrows():
-            issue_created_at = datetime.strptime(
-                row['github_created_at'], '%Y-%m-%dT%H:%M:%SZ'
-            ) if row['github_created_at'] else None
-            issue_updated_at = datetime.strptime(
-                row['github_updated_at'], '%Y-%m-%dT%H:%M:%SZ'
-            ) if row['github_updated_at'] else None
-            issue_closed_at = datetime.strptime(
-                row['github_closed_at'], '%Y-%m-%dT%H:%M:%SZ'
-            ) if row['github_closed_at'] else None
-            issue = ReportGithubBugs(
-                github_number=row['github_number'],
-                github_title=row['github_title'],
-                github_url=row['github_url'],
-                github_created_at=issue_created_at,
-                github_updated_at=issue_updated_at,
-                github_closed_at=issue_closed_at,
-                github_user=row['github_user'],
-                github_author_association=row['github_author_association'],
-                github_state=row['github_state'],
-                github_project=project
-            )
-            print("Inserted Issue: {} - {}".format(
-                row['github_number'], row['github_title']))
-            try:
-                self.db.session.add(issue)
-                self.db.session.commit()
-            except IntegrityError:
-                self.db.session.rollback()
-                print(f"Skipping duplicate issue #{row['github_number']}")
+        if payload.empty:
+            return
+
+        def parse(value):
+            return datetime.strptime(
+                value, '%Y-%m-%dT%H:%M:%SZ'
+            ) if value else None
+
+        # (github_number, github_project) is unique: skip issues already
+        # stored for this project instead of failing the whole batch
+        existing = {
+            number for (number,) in self.db.session.query(
+                ReportGithubBugs.github_number
+            ).filter(ReportGithubBugs.github_project == project)
+        }
+        duplicate = (
+            payload['github_number'].isin(existing)
+            | payload['github_number'].duplicated()
+        )
+        for number in payload.loc[duplicate, 'github_number']:
+            print(f"Skipping duplicate issue #{number}")
+        payload = payload[~duplicate]
+
+        inserted = self.db.bulk_insert(
+            ReportGithubBugs,
+            payload.assign(
+                github_created_at=payload['github_created_at'].map(parse),
+                github_updated_at=payload['github_updated_at'].map(parse),
+                github_closed_at=payload['github_closed_at'].map(parse),
+                github_project=project,
+            ),
+            {
+                'github_number': 'github_number',
+                'github_title': 'github_title',
+                'github_url': 'github_url',
+                'github_created_at': 'github_created_at',
+                'github_updated_at': 'github_updated_at',
+                'github_closed_at': 'github_closed_at',
+                'github_user': 'github_user',
+                'github_author_association': 'github_author_association',
+                'github_state': 'github_state',
+                'github_project': 'github_project',
+            },
+        )
+        print(f"Inserted {inserted} issues")
 
     def get_all_issues(self, project):
         return self.db.session.query(ReportGithubBugs).filter(
@@ -354,34 +368,33 @@ class DatabaseGithub(Database):
         ).all()
 
     def update_issue(self, issue_data, project):
-        record = self.db.session.query(ReportGithubBugs).filter(
-            ReportGithubBugs.github_number == issue_data['number'],
-            ReportGithubBugs.github_project == project
-        ).first()
-
-        if not record:
-            print(f"Issue #{issue_data['number']} not found in DB, skipping.")
-            return
+        self.update_issues([issue_data], project)
+        print(f"Updated issue #{issue_data['number']}.")
 
+    def update_issues(self, issues_data, project):
+        """Write refreshed GitHub issues back in one upsert on
+        (github_number, github_project). A stored issue is only
+        overwritten when the API's updated_at is newer."""
         fmt = '%Y-%m-%dT%H:%M:%SZ'
 
-        record.github_title = issue_data.get('title')
-        record.github_url = issue_data.get('html_url')
-        record.github_state = issue_data.get('state')
-        record.github_user = issue_data.get('user', {}).get('login')
-        record.github_author_association = issue_data.get('author_association')
-        record.github_created_at = (
-            datetime.strptime(issue_data['created_at'], fmt)
-            if issue_data.get('created_at') else None
-        )
-        record.github_updated_at = (
-            datetime.strptime(issue_data['updated_at'], fmt)
-            if issue_data.get('updated_at') else None
-        )
-        record.github_closed_at = (
-            datetime.strptime(issue_data['closed_at'], fmt)
-            if issue_data.get('closed_at') else None
-        )
-
-        self.db.session.commit()
-        print(f"Updated issue #{issue_data['number']}.")
+        def parse(value):
+            return datetime.strptime(value, fmt) if value else None
+
+        rows = [
+            {
+                'github_number': issue_data['number'],
+                'github_project': project,
+                'github_title': issue_data.get('title'),
+                'github_url': issue_data.get('html_url'),
+                'github_state': issue_data.get('state'),
+                'github_user': issue_data.get('user', {}).get('login'),
+                'github_author_association': issue_data.get(
+                    'author_association'),
+                'github_created_at': parse(issue_data.get('created_at')),
+                'github_updated_at': parse(issue_data.get('updated_at')),
+                'github_closed_at': parse(issue_data.get('closed_at')),
+            }
+            for issue_data in issues_data
+        ]
+        return self.db.bulk_upsert(
+            ReportGithubBugs, rows, newer_than='github_updated_at')
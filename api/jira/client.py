@@ -6,6 +6,7 @@
 
 import os
 import sys
+from urllib.parse import quote
 
 from lib.jira_conn import JiraAPIClient
 
@@ -18,12 +19,17 @@ from constants import (
     FILTER_ID_ALL_REQUEST_ISSUE_TYPE,
     FILTER_ID_QA_NEEDED_iOS,
     FIREFOX_RELEASE_TRAIN,
+    ISSUE_ID_BATCH_SIZE,
     MAX_RESULT,
     QATT_BOARD,
     QATT_PARENT_TICKETS_IN_BOARD,
     SEARCH,
     STORY_POINTS,
     TESTED_TRAINS,
+    WORKLOG_DELETED,
+    WORKLOG_LIST,
+    WORKLOG_LIST_BATCH_SIZE,
+    WORKLOG_UPDATED,
     WORKLOG_URL_TEMPLATE,
 )
 
@@ -40,30 +46,46 @@ class Jira:
             print("ERROR: Missing jira env var")
             sys.exit(1)
 
+    # API: Search
+    def search(self, query, sharded=False, shards=None):
+        """Issues of a search/jql query. sharded=True allows splitting it
+        into `shards` (default JIRA_SEARCH_SHARDS, off unless set)
+        created-date ranges fetched in parallel, for whole-filter loads."""
+        if sharded:
+            return self.client.get_search_sharded(
+                query, data_type='issues', shards=shards)
+        return self.client.get_search(query, data_type='issues')
+
     # API: Filters
-    def filters(self, filter_id=FILTER_ID_ALL_REQUESTS_2022, extra_fields=None):
+    def filters(self, filter_id=FILTER_ID_ALL_REQUESTS_2022, extra_fields=None,
+                updated_since=None, shards=None):
+        """Issues of a saved filter; only those updated at or after
+        updated_since (a datetime) when it is given. A full load of a large
+        filter can be sharded by created date with `shards` (see search)."""
         if extra_fields is None:
             extra_fields = [STORY_POINTS, FIREFOX_RELEASE_TRAIN, ENGINEERING_TEAM]
 
         fields = DEFAULT_COLUMNS + ',' + ','.join(extra_fields)
         query = SEARCH + '?' + JQL_QUERY + filter_id \
+            + updated_since_jql(updated_since) \
             + '&fields=' + fields + '&' + MAX_RESULT
 
-        tmp = self.client.get_search(query, data_type='issues')
+        tmp = self.search(query, sharded=updated_since is None, shards=shards)
         print("function: filters")
         print(f"DIAGNOSTIC - query: {query}")
         print(f"DIAGNOSTIC - get_search: {tmp}")
         return tmp
 
-    def filters_new_issue_type(self):
+    def filters_new_issue_type(self, updated_since=None, shards=None):
         query = SEARCH + '?' + JQL_QUERY + FILTER_ID_ALL_REQUEST_ISSUE_TYPE \
+                + updated_since_jql(updated_since) \
                 + '&fields=' + DEFAULT_COLUMNS \
                 + COLUMNS_ISSUE_TYPE + ',' + STORY_POINTS + ',' \
                 + TESTED_TRAINS + '&' + MAX_RESULT
         print("function: filters_new_issue_type")
         print(f"DIAGNOSTIC - query: {query}")
 
-        return self.client.get_search(query, data_type='issues')
+        return self.search(query, sharded=updated_since is None, shards=shards)
 
     def filter_qa_needed(self):
         query = SEARCH + '?' + JQL_QUERY + FILTER_ID_QA_NEEDED_iOS \
@@ -101,9 +123,53 @@ class Jira:
         print(f"DIAGNOSTIC - query: {query}")
         return self.client.get_search(query, data_type='issues')
 
+    def issues_by_ids(self, ids):
+        """Key, summary and parent of the issues with the given ids, one
+        `id in (...)` search per ISSUE_ID_BATCH_SIZE ids."""
+        issues = []
+        for i in range(0, len(ids), ISSUE_ID_BATCH_SIZE):
+            batch = ids[i:i + ISSUE_ID_BATCH_SIZE]
+            query = SEARCH + '?jql=' \
+                + quote(f'id in ({",".join(str(id_) for id_ in batch)})') \
+                + '&fields=summary,parent&' + MAX_RESULT
+            issues.extend(self.client.get_search(query, data_type='issues'))
+        return issues
+
     # API: Worklogs
     def filter_worklogs(self, issue_key):
         query = WORKLOG_URL_TEMPLATE.format(issue_key=issue_key)
         print("function: filter_work_logs")
         print(f"DIAGNOSTIC - query: {query}")
         return self.client.get_search(query, data_type='worklogs')
+
+    def worklogs_changed_since(self, since, deleted=False):
+        """Ids of the worklogs updated (or deleted) since `since` (epoch
+        ms), and the `until` (epoch ms) to resume from next time."""
+        path = WORKLOG_DELETED if deleted else WORKLOG_UPDATED
+        ids = []
+        while True:
+            data = self.client.get(path, params={'since': since})
+            ids.extend(value['worklogId'] for value in data.get('values', []))
+            since = data.get('until', since)
+            if data.get('lastPage', True):
+                break
+        print(f"function: worklogs_changed_since - {len(ids)} from {path}")
+        return ids, since
+
+    def worklogs_by_ids(self, ids):
+        """Full worklogs for `ids`, fetched in batches of
+        WORKLOG_LIST_BATCH_SIZE."""
+        worklogs = []
+        for i in range(0, len(ids), WORKLOG_LIST_BATCH_SIZE):
+            batch = ids[i:i + WORKLOG_LIST_BATCH_SIZE]
+            worklogs.extend(self.client.post(WORKLOG_LIST, {'ids': batch}))
+        return worklogs
+
+
+def updated_since_jql(updated_since):
+    """URL-encoded JQL clause appended to a filter query to keep only the
+    issues updated at or after updated_since; empty when it is None."""
+    if updated_since is None:
+        return ''
+    return quote(
+        f' AND updated >= "{updated_since.strftime("%Y-%m-%d %H:%M")}"')
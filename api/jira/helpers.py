@@ -6,7 +6,9 @@
 
 
 import inspect
+import os
 import pandas as pd
+from datetime import datetime, timedelta, timezone
 
 from database import (
     Database,
@@ -16,6 +18,16 @@ from utils.datetime_utils import DatetimeUtils as dt
 from sqlalchemy.exc import OperationalError
 from typing import Dict, Any
 
+# Cap on concurrent Jira requests in reports that fan out per issue
+JIRA_MAX_WORKERS = int(os.environ.get('JIRA_MAX_WORKERS') or 8)
+
+# Incremental filter reports re-read this many hours before their last
+# sync (JQL dates are in the Jira user's timezone, not UTC) ...
+JIRA_SYNC_OVERLAP_HOURS = int(os.environ.get('JIRA_SYNC_OVERLAP_HOURS') or 24)
+# ... and reload the whole filter every this many days, so issues deleted
+# or moved out of the filter drop out of the report
+JIRA_FULL_RECONCILE_DAYS = int(os.environ.get('JIRA_FULL_RECONCILE_DAYS') or 7)
+
 _DB = None
 
 
@@ -48,12 +60,62 @@ def jira_delete(table):
         print(f"Delete failed with OperationalError: {e}")
 
 
-def prepare_jira_df(payload: Any) -> pd.DataFrame:
+def filter_sync_since(db, report, full_refresh=False):
+    """
+    Start of an incremental run of a filter report: the `updated`
+    watermark to add to the filter JQL, or None when the whole filter
+    must be reloaded (first run, full_refresh, or the last full reload is
+    JIRA_FULL_RECONCILE_DAYS old).
+    """
+    if full_refresh or full_reload_due(db, report):
+        return None
+    cursor = db.get_sync_state('jira', report)
+    if not (cursor and cursor.synced_until):
+        return None
+    return cursor.synced_until - timedelta(hours=JIRA_SYNC_OVERLAP_HOURS)
+
+
+def full_reload_due(db, report):
+    """
+    True if `report` was never reloaded in full, or its last full reload
+    (the `<report>_full` sync state) is JIRA_FULL_RECONCILE_DAYS old.
+    """
+    reconciled = db.get_sync_state('jira', report + '_full')
+    if not (reconciled and reconciled.synced_until):
+        return True
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if now - reconciled.synced_until >= timedelta(days=JIRA_FULL_RECONCILE_DAYS):
+        print(f"{report}: last full reload {reconciled.synced_until}, "
+              "reloading in full")
+        return True
+    return False
+
+
+def filter_sync_done(db, report, run_started, full):
+    """
+    Move the sync cursor of a filter report to run_started (and its last
+    full reload too, if full) and commit, together with rows loaded with
+    commit=False.
+    """
+    db.set_sync_state('jira', report, synced_until=run_started)
+    if full:
+        db.set_sync_state('jira', report + '_full', synced_until=run_started)
+    db.session.commit()
+
+
+def prepare_jira_df(payload: Any, columns=None) -> pd.DataFrame:
     """
     Normalize Jira payload JSON into a DataFrame
     Ensure expected columns exist.
+
+    With `columns` (e.g. a report's selected_columns), only those
+    json_normalize-style columns are extracted (see project_jira_df)
+    instead of flattening every field of every issue.
     """
-    df = pd.json_normalize(payload, sep='_')
+    if columns is None:
+        df = pd.json_normalize(payload, sep='_')
+    else:
+        df = project_jira_df(payload, columns)
 
     # Ensure fields_labels exists
     if 'fields_labels' not in df.columns:
@@ -76,6 +138,54 @@ def prepare_jira_df(payload: Any) -> pd.DataFrame:
     return df
 
 
+def project_jira_df(payload: Any, columns) -> pd.DataFrame:
+    """
+    Build the `columns` pd.json_normalize(payload, sep='_') would produce,
+    without flattening the rest of each issue.
+
+    A column name such as 'fields_customfield_10155_value' is resolved to
+    a key path (fields -> customfield_10155 -> value) on the first issue
+    that has it; that path is then read from every issue, None where it is
+    missing. As with json_normalize, a column no issue has is left out.
+    """
+    data = {}
+    for column in columns:
+        path = None
+        values = []
+        for issue in payload:
+            if path is None:
+                path = _json_path(issue, column)
+            values.append(_json_get(issue, path) if path else None)
+        if path:
+            data[column] = values
+    return pd.DataFrame(data, index=pd.RangeIndex(len(payload)))
+
+
+def _json_path(obj, name):
+    """Keys leading to the json_normalize column `name` in dict obj."""
+    if name in obj:
+        return (name,)
+    parts = name.split('_')
+    # Keys contain underscores too (customfield_10155): try the longest
+    # prefix that is a nested dict first
+    for i in range(len(parts) - 1, 0, -1):
+        child = obj.get('_'.join(parts[:i]))
+        if isinstance(child, dict):
+            rest = _json_path(child, '_'.join(parts[i:]))
+            if rest:
+                return ('_'.join(parts[:i]),) + rest
+    return None
+
+
+def _json_get(obj, path):
+    for key in path:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    # json_normalize would have flattened a dict into further columns
+    return None if isinstance(obj, dict) else obj
+
+
 def select_and_transform_jira_df(
         df: pd.DataFrame,
         selected_columns: Dict[str, str],
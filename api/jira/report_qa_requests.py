@@ -6,6 +6,7 @@
 
 import inspect
 import logging
+from datetime import datetime, timezone
 
 from database import (
     Database,
@@ -15,7 +16,8 @@ from database import (
 
 from api.jira.client import Jira
 from api.jira.helpers import (
-    jira_delete,
+    filter_sync_done,
+    filter_sync_since,
     prepare_jira_df,
     select_and_transform_jira_df
 )
@@ -44,24 +46,20 @@ def _jira() -> Jira():
 # ===================================================================
 
 
-def jira_qa_requests():
+def jira_qa_requests(full_refresh=False):
+    """Sync report_jira_qa_requests with the QA requests filter: upsert the
+    issues updated since the last run, or reload the whole filter (see
+    filter_sync_since)."""
     jira = _jira()
+    db = _db()
+    run_started = datetime.now(timezone.utc).replace(tzinfo=None)
+    since = filter_sync_since(db, 'qa_requests', full_refresh)
     try:
-        payload = jira.filters()
+        payload = jira.filters(updated_since=since)
     except Exception as exc:
         logger.exception("Jira filters call failed %. No DB changes made.", exc)
         return
 
-    df = prepare_jira_df(payload)
-
-    if df.empty:
-        raise ValueError(
-            "jira_qa_requests returned empty payload — "
-            "check Jira credentials or filter. Database was not modified."
-        )
-
-    jira_delete(ReportJiraQARequests)
-
     selected_columns = {
         'key': 'jira_key',
         'fields_summary': 'jira_summary',
@@ -73,34 +71,42 @@ def jira_qa_requests():
         'fields_assignee_emailAddress': 'jira_assignee_username',
         'fields_labels': 'jira_labels'
     }
+
+    df = prepare_jira_df(payload, selected_columns)
+
+    if df.empty and since is not None:
+        print(f"jira_qa_requests: no issues updated since {since}")
+        filter_sync_done(db, 'qa_requests', run_started, full=False)
+        return
+    if df.empty:
+        raise ValueError(
+            "jira_qa_requests returned empty payload — "
+            "check Jira credentials or filter. Database was not modified."
+        )
+
     missing_inputs = [c for c in selected_columns.keys() if c not in df.columns]
     if missing_inputs:
         logger.info("Input columns are missing from Jira payload: %s", missing_inputs)
 
     payload = select_and_transform_jira_df(df, selected_columns)
 
-    report_jira_qa_requests_insert(payload)
+    report_jira_qa_requests_insert(payload, incremental=since is not None)
+    filter_sync_done(db, 'qa_requests', run_started, full=since is None)
 
 
-def jira_qa_requests_workload():
+def jira_qa_requests_workload(full_refresh=False):
+    """Sync report_jira_qa_requests_new_issue_types like jira_qa_requests."""
     jira = _jira()
+    db = _db()
+    run_started = datetime.now(timezone.utc).replace(tzinfo=None)
+    since = filter_sync_since(db, 'qa_requests_workload', full_refresh)
 
     try:
-        payload = jira.filters_new_issue_type()
+        payload = jira.filters_new_issue_type(updated_since=since)
     except Exception as exc:
         logger.exception("Jira filters call failed %. No DB changes made.", exc)
         return
 
-    df = prepare_jira_df(payload)
-
-    if df.empty:
-        raise ValueError(
-            "jira_qa_requests_workload returned empty payload — "
-            "check Jira credentials or filter. Database was not modified."
-        )
-
-    jira_delete(ReportJIraQARequestsNewIssueType)
-
     selected_columns = {
         'key': 'jira_key',
         'fields_summary': 'jira_summary',
@@ -113,6 +119,19 @@ def jira_qa_requests_workload():
         'fields_issuetype_name': 'jira_issue_type',
         'fields_parent_key': 'jira_parent_link'
     }
+
+    df = prepare_jira_df(payload, selected_columns)
+
+    if df.empty and since is not None:
+        print(f"jira_qa_requests_workload: no issues updated since {since}")
+        filter_sync_done(db, 'qa_requests_workload', run_started, full=False)
+        return
+    if df.empty:
+        raise ValueError(
+            "jira_qa_requests_workload returned empty payload — "
+            "check Jira credentials or filter. Database was not modified."
+        )
+
     missing_inputs = [c for c in selected_columns.keys() if c not in df.columns]
     if missing_inputs:
         logger.info("Input columns are missing from Jira payload: %s", missing_inputs)
@@ -120,14 +139,19 @@ def jira_qa_requests_workload():
     payload = select_and_transform_jira_df(df, selected_columns)
 
     print(payload)
-    report_jira_qa_requests_workload_insert(payload)
+    report_jira_qa_requests_workload_insert(
+        payload, incremental=since is not None)
+    filter_sync_done(
+        db, 'qa_requests_workload', run_started, full=since is None)
 
 # ===================================================================
 # DB INSERT
 # ===================================================================
 
 
-def report_jira_qa_requests_insert(payload):
+def report_jira_qa_requests_insert(payload, incremental=False):
+    """Replace report_jira_qa_requests with payload, or upsert it on
+    jira_key without committing when incremental."""
     # DIAGNOSTIC
     print("--------------------------------------")
     print("Running: report_jira_qa_requests")
@@ -137,22 +161,30 @@ def report_jira_qa_requests_insert(payload):
     db = _db()
     print(payload)
 
-    for index, row in payload.iterrows():
-        print(row)
-        report = ReportJiraQARequests(jira_key=row['jira_key'],
-                                      jira_created_at=row['jira_created_at'].date(), # noqa
-                                      jira_summary=row['jira_summary'], # noqa
-                                      jira_firefox_release_train=row['jira_firefox_release_train'], # noqa
-                                      jira_engineering_team=row['jira_engineering_team'], # noqa
-                                      jira_story_points=row['jira_story_points'], # noqa
-                                      jira_status=row['jira_status'], # noqa
-                                      jira_assignee_username=row['jira_assignee_username'], # noqa
-                                      jira_labels=row['jira_labels'])
-        db.session.add(report)
-    db.session.commit()
-
-
-def report_jira_qa_requests_workload_insert(payload):
+    payload = payload.drop_duplicates(subset=['jira_key'], keep='last')
+    df = payload.assign(
+        jira_created_at=payload['jira_created_at'].map(lambda d: d.date())
+    )
+    column_map = {
+        'jira_key': 'jira_key',
+        'jira_created_at': 'jira_created_at',
+        'jira_summary': 'jira_summary',
+        'jira_firefox_release_train': 'jira_firefox_release_train',
+        'jira_engineering_team': 'jira_engineering_team',
+        'jira_story_points': 'jira_story_points',
+        'jira_status': 'jira_status',
+        'jira_assignee_username': 'jira_assignee_username',
+        'jira_labels': 'jira_labels',
+    }
+    if incremental:
+        db.bulk_upsert(ReportJiraQARequests, df, column_map, commit=False)
+    else:
+        db.bulk_replace(ReportJiraQARequests, df, column_map)
+
+
+def report_jira_qa_requests_workload_insert(payload, incremental=False):
+    """Same as report_jira_qa_requests_insert, for
+    report_jira_qa_requests_new_issue_types."""
     # DIAGNOSTIC
     print("--------------------------------------")
     print("Running: report_jira_qa_requests_new_issue_types")
@@ -162,17 +194,24 @@ def report_jira_qa_requests_workload_insert(payload):
     db = _db()
     print(payload)
 
-    for index, row in payload.iterrows():
-        print(row)
-        report = ReportJIraQARequestsNewIssueType(jira_key=row['jira_key'],
-                                                  jira_created_at=row['jira_created_at'].date(), # noqa
-                                                  jira_summary=row['jira_summary'], # noqa
-                                                  jira_story_points=row['jira_story_points'], # noqa
-                                                  jira_status=row['jira_status'], # noqa
-                                                  jira_assignee_username=row['jira_assignee_username'], # noqa
-                                                  jira_labels=row['jira_labels'], # noqa
-                                                  jira_tested_train=row['jira_tested_train'], # noqa
-                                                  jira_issue_type=row['jira_issue_type'], # noqa
-                                                  jira_parent_link=row['jira_parent_link']) # noqa
-        db.session.add(report)
-    db.session.commit()
+    payload = payload.drop_duplicates(subset=['jira_key'], keep='last')
+    df = payload.assign(
+        jira_created_at=payload['jira_created_at'].map(lambda d: d.date())
+    )
+    column_map = {
+        'jira_key': 'jira_key',
+        'jira_created_at': 'jira_created_at',
+        'jira_summary': 'jira_summary',
+        'jira_story_points': 'jira_story_points',
+        'jira_status': 'jira_status',
+        'jira_assignee_username': 'jira_assignee_username',
+        'jira_labels': 'jira_labels',
+        'jira_tested_train': 'jira_tested_train',
+        'jira_issue_type': 'jira_issue_type',
+        'jira_parent_link': 'jira_parent_link',
+    }
+    if incremental:
+        db.bulk_upsert(
+            ReportJIraQARequestsNewIssueType, df, column_map, commit=False)
+    else:
+        db.bulk_replace(ReportJIraQARequestsNewIssueType, df, column_map)
@@ -6,6 +6,7 @@
 
 import inspect
 import logging
+from datetime import datetime, timezone
 
 from database import (
     Database,
@@ -24,7 +25,8 @@ from constants import (
     TIMELINE,
 )
 from api.jira.helpers import (
-    jira_delete,
+    filter_sync_done,
+    filter_sync_since,
     prepare_jira_df,
     select_and_transform_jira_df
 )
@@ -53,11 +55,18 @@ def _jira() -> Jira():
 # ===================================================================
 
 
-def jira_qa_requests_desktop():
+def jira_qa_requests_desktop(full_refresh=False):
+    """Sync report_jira_qa_requests_desktop with the desktop QA requests
+    filter: upsert the issues updated since the last run, or reload the
+    whole filter (see filter_sync_since)."""
     jira = _jira()
+    db = _db()
+    run_started = datetime.now(timezone.utc).replace(tzinfo=None)
+    since = filter_sync_since(db, 'qa_requests_desktop', full_refresh)
     try:
         payload = jira.filters(
             filter_id=FILTER_ID_ALL_REQUESTS_DESKTOP,
+            updated_since=since,
             extra_fields=[
                 "reporter",
                 "priority",
@@ -76,16 +85,6 @@ def jira_qa_requests_desktop():
         logger.exception("Jira filters call failed %. No DB changes made.", exc)
         return
 
-    df = prepare_jira_df(payload)
-
-    if df.empty:
-        raise ValueError(
-            "jira_qa_requests_desktop returned empty payload — "
-            "check Jira credentials or filter. Database was not modified."
-        )
-
-    jira_delete(ReportJiraQARequestsDesktop)
-
     selected_columns = {
         'key': 'jira_key',
         'fields_summary': 'jira_summary',
@@ -105,6 +104,19 @@ def jira_qa_requests_desktop():
         'fields_customfield_10147': 'jira_product',
         'fields_customfield_10509_content': 'jira_timeline',
     }
+
+    df = prepare_jira_df(payload, selected_columns)
+
+    if df.empty and since is not None:
+        print(f"jira_qa_requests_desktop: no issues updated since {since}")
+        filter_sync_done(db, 'qa_requests_desktop', run_started, full=False)
+        return
+    if df.empty:
+        raise ValueError(
+            "jira_qa_requests_desktop returned empty payload — "
+            "check Jira credentials or filter. Database was not modified."
+        )
+
     missing_inputs = [c for c in selected_columns.keys() if c not in df.columns]
     if missing_inputs:
         logger.info("Input columns are missing from Jira payload: %s", missing_inputs)
@@ -125,7 +137,10 @@ def jira_qa_requests_desktop():
     payload.to_csv("desktop_payload.csv", index=False)
     print("DIAGNOSTIC - raw df columns:", list(df.columns))
 
-    report_jira_qa_requests_desktop_insert(payload)
+    report_jira_qa_requests_desktop_insert(
+        payload, incremental=since is not None)
+    filter_sync_done(
+        db, 'qa_requests_desktop', run_started, full=since is None)
 
 
 # ===================================================================
@@ -133,7 +148,10 @@ def jira_qa_requests_desktop():
 # ===================================================================
 
 
-def report_jira_qa_requests_desktop_insert(payload):
+def report_jira_qa_requests_desktop_insert(payload, incremental=False):
+    """Replace report_jira_qa_requests_desktop with payload, or upsert it
+    on jira_key (keeping the row with the newer jira_updated_at) without
+    committing when incremental."""
     # DIAGNOSTIC
     print("--------------------------------------")
     print("Running: report_jira_qa_requests")
@@ -143,29 +161,35 @@ def report_jira_qa_requests_desktop_insert(payload):
     db = _db()
     print(payload)
 
-    for index, row in payload.iterrows():
-        print(row)
-        report = ReportJiraQARequestsDesktop(
-            jira_key=row['jira_key'],
-            jira_summary=row['jira_summary'],
-            jira_created_at=row['jira_created_at'],
-            jira_updated_at=row['jira_updated_at'],
-            jira_status=row['jira_status'],
-            jira_assignee_username=row['jira_assignee_username'],
-            jira_reporter_username=row['jira_reporter_username'],
-            jira_priority=row['jira_priority'],
-            jira_issue_type=row['jira_issue_type'],
-            jira_labels=row['jira_labels'],
-            jira_subtasks=(
-                row['jira_subtasks'] if isinstance(row['jira_subtasks'], str) else None
-            ),
-            jira_story_points=row['jira_story_points'],
-            jira_target_release=row['jira_target_release'],
-            jira_engineering_team=row['jira_engineering_team'],
-            jira_tested_trains=row['jira_tested_trains'],
-            jira_product=row['jira_product'],
-            jira_timeline=(
-                row['jira_timeline'] if isinstance(row['jira_timeline'], str) else None
-            ))
-        db.session.add(report)
-    db.session.commit()
+    def text_or_none(value):
+        return value if isinstance(value, str) else None
+
+    payload = payload.drop_duplicates(subset=['jira_key'], keep='last')
+    df = payload.assign(
+        jira_subtasks=payload['jira_subtasks'].map(text_or_none),
+        jira_timeline=payload['jira_timeline'].map(text_or_none),
+    )
+    column_map = {
+        'jira_key': 'jira_key',
+        'jira_summary': 'jira_summary',
+        'jira_created_at': 'jira_created_at',
+        'jira_updated_at': 'jira_updated_at',
+        'jira_status': 'jira_status',
+        'jira_assignee_username': 'jira_assignee_username',
+        'jira_reporter_username': 'jira_reporter_username',
+        'jira_priority': 'jira_priority',
+        'jira_issue_type': 'jira_issue_type',
+        'jira_labels': 'jira_labels',
+        'jira_subtasks': 'jira_subtasks',
+        'jira_story_points': 'jira_story_points',
+        'jira_target_release': 'jira_target_release',
+        'jira_engineering_team': 'jira_engineering_team',
+        'jira_tested_trains': 'jira_tested_trains',
+        'jira_product': 'jira_product',
+        'jira_timeline': 'jira_timeline',
+    }
+    if incremental:
+        db.bulk_upsert(ReportJiraQARequestsDesktop, df, column_map,
+                       newer_than='jira_updated_at', commit=False)
+    else:
+        db.bulk_replace(ReportJiraQARequestsDesktop, df, column_map)
@@ -6,6 +6,7 @@
 
 import inspect
 import logging
+from datetime import datetime, timezone
 
 import pandas as pd
 
@@ -21,6 +22,8 @@ from constants import (
 
 from api.jira.helpers import (
     categorize_labels,
+    filter_sync_done,
+    filter_sync_since,
     prepare_jira_df,
     select_and_transform_jira_df,
 )
@@ -52,8 +55,14 @@ def _jira() -> Jira():
 # ORCHESTRATOR (BATCH)
 # ===================================================================
 
-def jira_softvision_issues_other_teams():
+def jira_softvision_issues_other_teams(full_refresh=False):
+    """Upsert the issues of the Softvision other teams filter into
+    report_jira_softvision_issues_other_teams: those updated since the last run,
+    or the whole filter (see filter_sync_since)."""
     jira = _jira()
+    db = _db()
+    run_started = datetime.now(timezone.utc).replace(tzinfo=None)
+    since = filter_sync_since(db, 'softvision_issues_other_teams', full_refresh)
 
     # NOTE: filter 35755 should restrict to terminal states (closed/done)
     # by appending `AND statusCategory = Done` to its JQL in the Jira UI,
@@ -61,6 +70,7 @@ def jira_softvision_issues_other_teams():
     try:
         payload = jira.filters(
             filter_id=FILTER_ID_SOFTVISION_ISSUES_OTHER_TEAMS,
+            updated_since=since,
             extra_fields=[
                 "project",
                 "reporter",
@@ -78,14 +88,6 @@ def jira_softvision_issues_other_teams():
         )
         return
 
-    df = prepare_jira_df(payload)
-
-    if df.empty:
-        raise ValueError(
-            "jira_softvision_issues_other_teams returned empty payload — "
-            "check Jira credentials or filter."
-        )
-
     selected_columns = {
         "key": "jira_key",
 
@@ -109,6 +111,19 @@ def jira_softvision_issues_other_teams():
         "fields_statuscategorychangedate": "jira_status_changed_at",
     }
 
+    df = prepare_jira_df(payload, selected_columns)
+
+    if df.empty and since is not None:
+        print(f"jira_softvision_issues_other_teams: no issues updated since {since}")
+        filter_sync_done(
+            db, 'softvision_issues_other_teams', run_started, full=False)
+        return
+    if df.empty:
+        raise ValueError(
+            "jira_softvision_issues_other_teams returned empty payload — "
+            "check Jira credentials or filter."
+        )
+
     missing_inputs = [
         c for c in selected_columns.keys()
         if c not in df.columns
@@ -162,14 +177,17 @@ def jira_softvision_issues_other_teams():
     )
     payload = payload.join(categorized)
 
-    report_jira_softvision_issues_other_teams_insert(payload)
+    report_jira_softvision_issues_other_teams_insert(
+        payload, incremental=since is not None)
+    filter_sync_done(
+        db, 'softvision_issues_other_teams', run_started, full=since is None)
 
 
 # ===================================================================
 # DB UPSERT
 # ===================================================================
 
-def report_jira_softvision_issues_other_teams_insert(payload):
+def report_jira_softvision_issues_other_teams_insert(payload, incremental=False):
     print("--------------------------------------")
     print("Running: report_jira_softvision_issues_other_teams")
     print(inspect.currentframe().f_code.co_name)
@@ -177,98 +195,52 @@ def report_jira_softvision_issues_other_teams_insert(payload):
 
     db = _db()
 
-    inserted = 0
-    updated = 0
-    skipped = 0
+    df = payload.assign(
+        jira_created_at=payload["jira_created_at"].map(dt.to_naive_utc),
+        jira_updated_at=payload["jira_updated_at"].map(dt.to_naive_utc),
+        jira_status_changed_at=payload["jira_status_changed_at"].map(
+            dt.to_naive_utc
+        ),
+    )
+    column_map = {
+        "jira_key": "jira_key",
+        "jira_summary": "jira_summary",
+        "jira_project_key": "jira_project_key",
+        "jira_project_name": "jira_project_name",
+        "jira_reporter_name": "jira_reporter_name",
+        "jira_reporter_username": "jira_reporter_username",
+        "jira_status": "jira_status",
+        "jira_priority": "jira_priority",
+        "jira_issue_type": "jira_issue_type",
+        "jira_labels": "jira_labels",
+        "jira_label_verified": "jira_label_verified",
+        "jira_label_wontfix": "jira_label_wontfix",
+        "jira_label_duplicate": "jira_label_duplicate",
+        "jira_label_invalid": "jira_label_invalid",
+        "jira_label_qa_not_actionable": "jira_label_qa_not_actionable",
+        "jira_created_at": "jira_created_at",
+        "jira_updated_at": "jira_updated_at",
+        "jira_status_changed_at": "jira_status_changed_at",
+    }
 
+    # Incremental runs upsert on jira_key; an existing issue is only
+    # overwritten when the incoming jira_updated_at is newer (checked in
+    # SQL), and the caller commits it together with the sync cursor
+    # (filter_sync_done). Full runs replace the table, so issues deleted
+    # or moved out of the filter drop out.
     try:
-        for index, row in payload.iterrows():
-            try:
-                jira_key = row["jira_key"]
-
-                existing = (
-                    db.session.query(ReportJiraSoftvisionIssuesOtherTeams)
-                    .filter_by(jira_key=jira_key)
-                    .one_or_none()
-                )
-
-                remote_updated = dt.to_naive_utc(row["jira_updated_at"])
-
-                if existing:
-                    existing_updated = dt.to_naive_utc(existing.jira_updated_at)
-
-                    if (
-                        remote_updated is not None
-                        and (
-                            existing_updated is None
-                            or remote_updated > existing_updated
-                        )
-                    ):
-                        existing.jira_summary = row["jira_summary"]
-                        existing.jira_project_key = row["jira_project_key"]
-                        existing.jira_project_name = row["jira_project_name"]
-                        existing.jira_reporter_name = row["jira_reporter_name"]
-                        existing.jira_reporter_username = row["jira_reporter_username"]  # noqa: E501
-                        existing.jira_status = row["jira_status"]
-                        existing.jira_priority = row["jira_priority"]
-                        existing.jira_issue_type = row["jira_issue_type"]
-                        existing.jira_labels = row["jira_labels"]
-                        existing.jira_label_verified = row["jira_label_verified"]
-                        existing.jira_label_wontfix = row["jira_label_wontfix"]
-                        existing.jira_label_duplicate = row["jira_label_duplicate"]
-                        existing.jira_label_invalid = row["jira_label_invalid"]
-                        existing.jira_label_qa_not_actionable = row["jira_label_qa_not_actionable"]  # noqa: E501
-                        existing.jira_created_at = row["jira_created_at"]
-                        existing.jira_updated_at = row["jira_updated_at"]
-                        existing.jira_status_changed_at = row["jira_status_changed_at"]  # noqa: E501
-
-                        updated += 1
-                    else:
-                        skipped += 1
-                else:
-                    new_issue = ReportJiraSoftvisionIssuesOtherTeams(
-                        jira_key=jira_key,
-                        jira_summary=row["jira_summary"],
-                        jira_project_key=row["jira_project_key"],
-                        jira_project_name=row["jira_project_name"],
-                        jira_reporter_name=row["jira_reporter_name"],
-                        jira_reporter_username=row["jira_reporter_username"],
-                        jira_status=row["jira_status"],
-                        jira_priority=row["jira_priority"],
-                        jira_issue_type=row["jira_issue_type"],
-                        jira_labels=row["jira_labels"],
-                        jira_label_verified=row["jira_label_verified"],
-                        jira_label_wontfix=row["jira_label_wontfix"],
-                        jira_label_duplicate=row["jira_label_duplicate"],
-                        jira_label_invalid=row["jira_label_invalid"],
-                        jira_label_qa_not_actionable=row["jira_label_qa_not_actionable"],  # noqa: E501
-                        jira_created_at=row["jira_created_at"],
-                        jira_updated_at=row["jira_updated_at"],
-                        jira_status_changed_at=row["jira_status_changed_at"],
-                    )
-
-                    db.session.add(new_issue)
-                    inserted += 1
-
-            except KeyError as e:
-                print(f"Missing key: {e} in row {index}")
-
-        db.session.commit()
-
-        print(
-            f"Summary, inserted: {inserted}, "
-            f"updated: {updated}, skipped: {skipped}"
-        )
-
+        if incremental:
+            affected = db.bulk_upsert(
+                ReportJiraSoftvisionIssuesOtherTeams, df, column_map,
+                newer_than="jira_updated_at", commit=False,
+            )
+            print(f"Summary, upserted: {len(df)}, rows affected: {affected}")
+        else:
+            loaded = db.bulk_replace(
+                ReportJiraSoftvisionIssuesOtherTeams, df, column_map)
+            print(f"Summary, replaced with: {loaded} rows")
     except Exception:
-        db.session.rollback()
-
         logger.exception(
-            "Upsert failed for report_jira_softvision_issues_other_teams; "
-            "rolled back. inserted=%d updated=%d skipped=%d",
-            inserted,
-            updated,
-            skipped,
+            "Load failed for report_jira_softvision_issues_other_teams; rolled back."
         )
-
         raise
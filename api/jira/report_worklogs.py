@@ -1,22 +1,47 @@
-import pandas as pd
-
 from database import (
+    DB_MAX_WORKERS,
     Database,
     ReportJiraSoftvisionWorklogs,
 )
 
 from api.jira.client import Jira
-from api.jira.helpers import jira_delete
+from api.jira.helpers import (
+    JIRA_MAX_WORKERS,
+    filter_sync_done,
+    full_reload_due,
+)
 from api.jira.utils import adf_to_plain_text
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 
 import inspect
+import pandas as pd
 
 
 _DB = None
 _JIRA = None
 
+WORKLOG_COLUMNS = [
+    "parent_key", "child_key", "author",
+    "time_spent", "time_seconds", "started_date",
+    "comment", "parent_name", "child_name", "worklog_id",
+]
+
+WORKLOG_COLUMN_MAP = {
+    'parent_key': 'parent_key',
+    'child_key': 'child_key',
+    'author': 'author',
+    'time_spent': 'time_spent',
+    'time_seconds': 'time_spent_seconds',
+    'started_date': 'started_date',
+    'comment': 'comment',
+    'parent_name': 'parent_name',
+    'child_name': 'child_name',
+    'worklog_id': 'jira_worklog_id',
+}
+
 
 def _db() -> Database():
     global _DB
@@ -36,10 +61,25 @@ def _jira() -> Jira():
 # ===================================================================
 
 
-def jira_worklogs():
+def jira_worklogs(max_workers=None, full_refresh=False):
+    """Sync report_jira_softvision_worklogs with the worklogs of every
+    QATT board issue and of its child issues.
+
+    Once a sync cursor exists, only the worklogs Jira reports as updated
+    or deleted since then are applied (see jira_worklogs_incremental).
+    The first run, full_refresh=True, or a last full load older than
+    JIRA_FULL_RECONCILE_DAYS replaces the whole table: that loads the
+    older worklogs of issues that joined the board since, and drops those
+    of issues that left it.
+
+    Child lists and worklogs are fetched on a pool of at most max_workers
+    (default JIRA_MAX_WORKERS, capped at DB_MAX_WORKERS, the worker count
+    the connection pool is sized for) threads; rows are written in board
+    order.
+    """
     jira = _jira()
+    run_started = datetime.now(timezone.utc).replace(tzinfo=None)
 
-    worklog_data = []
     issues = jira.filter_sv_parent_in_board()
 
     if not issues:
@@ -48,111 +88,225 @@ def jira_worklogs():
             "check Jira credentials or filter. Database was not modified."
         )
 
-    for issue in issues:
-        parent_key = (issue.get("fields", {}).get("parent") or {}).get("key", issue.get("key"))  # noqa
-        parent_name = issue.get("fields", {}).get("summary", "Unknown")
-
-        parent_name = issue["fields"]["summary"]
-        children = jira.filter_child_issues(parent_key)
+    db = _db()
+    cursor = None
+    if not (full_refresh or full_reload_due(db, 'worklogs')):
+        cursor = db.get_sync_state('jira', 'worklogs')
+
+    if cursor and cursor.synced_until:
+        jira_worklogs_incremental(jira, issues, cursor.synced_until)
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers or JIRA_MAX_WORKERS, DB_MAX_WORKERS))
+    try:
+        jira_worklogs_full(jira, issues, executor)
+        # Worklogs changed while the full load ran are picked up by the
+        # next incremental run
+        filter_sync_done(db, 'worklogs', run_started, full=True)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def jira_worklogs_full(jira, issues, executor):
+    """Replace report_jira_softvision_worklogs with every board worklog."""
+    count = 0
+    seen = set()
+    with report_jira_worklogs_writer() as writer:
+        for worklog_data in harvest_worklogs(jira, issues, executor):
+            # Board issues sharing a parent report the same worklogs;
+            # rows without a worklog id cannot be told apart, keep them
+            rows = [row for row in worklog_data
+                    if row[-1] is None or row[-1] not in seen]
+            seen.update(row[-1] for row in rows if row[-1] is not None)
+            # Hand this issue's rows to the writer thread, keep fetching
+            writer.put(dict(zip(WORKLOG_COLUMNS, row)) for row in rows)
+            count += len(rows)
+
+        if not count:
+            # Leaving the block with an error drops the staging table
+            raise ValueError(
+                "Issues were fetched but no worklog data found — "
+                "Database was not modified."
+            )
+
+
+def jira_worklogs_incremental(jira, issues, since):
+    """Apply the worklog changes Jira recorded since `since` (naive UTC).
+
+    Changed worklog ids come from worklog/updated, their bodies from
+    worklog/list (in batches of 1000); the ones logged on board issues or
+    their children are upserted. Worklogs listed by worklog/deleted are
+    removed. The cursor moves to the `until` Jira returned, in the same
+    transaction as the rows.
+
+    Only the issues those worklogs were logged on are looked up, so a run
+    costs requests in proportion to the changes, not to the board.
+    """
+    since_ms = int(since.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    updated_ids, until = jira.worklogs_changed_since(since_ms)
+    deleted_ids, _ = jira.worklogs_changed_since(since_ms, deleted=True)
+
+    worklogs = jira.worklogs_by_ids(updated_ids)
+    issue_index = worklog_issue_index(
+        jira, issues, [log.get("issueId") for log in worklogs])
+
+    rows = []
+    for log in worklogs:
+        issue = issue_index.get(str(log.get("issueId")))
+        if issue:
+            rows.append(worklog_row(log, *issue))
+    print(f"Worklogs since {since}: {len(updated_ids)} updated "
+          f"({len(rows)} on the board), {len(deleted_ids)} deleted")
+
+    report_jira_worklogs_apply_changes(
+        rows, deleted_ids,
+        datetime.fromtimestamp(until / 1000, timezone.utc).replace(tzinfo=None))
+
+
+def harvest_worklogs(jira, issues, executor):
+    """Yield the worklog rows of each board issue (its own worklogs, then
+    its children's), in board order.
+
+    The child searches of all issues are queued on executor at once; as
+    each child list arrives, the worklog fetches of the parent and its
+    children are queued too, so requests for many issues are in flight
+    while earlier issues are being yielded.
+    """
+    parents = board_parents(issues)
+    child_lists = executor.map(
+        lambda parent: jira.filter_child_issues(parent[1]), parents)
+
+    pending = deque()
+    for (_, parent_key, parent_name), children in zip(parents, child_lists):
         print(f"DIAGNOSTIC - children: {children}")
 
-        # ---- Get worklogs for the parent itself ----
-        parent_worklogs = jira.filter_worklogs(parent_key)
-
-        for log in parent_worklogs:
-            author = log["author"]["displayName"]
-            time_spent = log["timeSpent"]
-            time_spent_seconds = log["timeSpentSeconds"]
-            started_raw = log["started"]
-
-            raw_comment = log.get("comment")
-            if isinstance(raw_comment, dict):
-                comment = adf_to_plain_text(raw_comment) or "No Comment"
-            elif isinstance(raw_comment, str):
-                comment = raw_comment.strip() or "No Comment"
-            else:
-                comment = "No Comment"
-
-            try:
-                started_dt = datetime.strptime(started_raw[:19], "%Y-%m-%dT%H:%M:%S") # noqa
-                started_str = started_dt.strftime("%Y-%m-%d %H:%M:%S")
-            except Exception as e:
-                print(f"Error parsing date {started_raw}: {e}")
-                started_str = started_raw
-
-            worklog_data.append([
-                parent_key,  # parent_key
-                None,        # child_key is None for parent logs
-                author,
-                time_spent,
-                time_spent_seconds,
-                started_str,
-                comment,
-                parent_name
-            ])
-
-        # ---- Get worklogs for each child ----
-        for child in children:
-            child_key = child.get("key", "Unknown")
-            child_name = child.get("fields", {}).get("summary", "Unknown")
-
-            # Skip Unknown keys to avoid 404s like issue/Unknown/worklog
-            if child_key in (None, "", "Unknown"):
-                print("⚠️ Skipping child without key:", child)
-                continue
-
-            child_worklogs = jira.filter_worklogs(child_key)
-
-            for log in child_worklogs:
-                author = log["author"]["displayName"]
-                time_spent = log["timeSpent"]
-                time_spent_seconds = log["timeSpentSeconds"]
-                started_raw = log["started"]
-
-                raw_comment = log.get("comment")
-                if isinstance(raw_comment, dict):
-                    comment = adf_to_plain_text(raw_comment) or "No Comment"
-                elif isinstance(raw_comment, str):
-                    comment = raw_comment.strip() or "No Comment"
-                else:
-                    comment = "No Comment"
-
-                try:
-                    started_dt = datetime.strptime(started_raw[:19], "%Y-%m-%dT%H:%M:%S") # noqa
-                    started_str = started_dt.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    print(f"Error parsing date {started_raw}: {e}")
-                    started_str = started_raw
-
-                worklog_data.append([
-                    parent_key,
-                    child_key,
-                    author,
-                    time_spent,
-                    time_spent_seconds,
-                    started_str,
-                    comment,
-                    parent_name,
-                    child_name
-                ])
-
-    df = pd.DataFrame(worklog_data, columns=[
-            "parent_key", "child_key", "author",
-            "time_spent", "time_seconds", "started_date",
-            "comment", "parent_name", "child_name",
-            ])
-
-    # FIX: Replace NaN values with None for MySQL compatibility
-    df = df.astype(object).where(df.notna(), None)
-
-    if df.empty:
-        raise ValueError(
-            "Issues were fetched but no worklog data found — "
-            "Database was not modified."
-        )
+        # (child_key, child_name); None for the parent's own worklogs
+        targets = [(None, None)] + [
+            (child_key, child_name)
+            for _, child_key, child_name in child_targets(children)
+        ]
+
+        futures = [
+            executor.submit(jira.filter_worklogs, child_key or parent_key)
+            for child_key, _ in targets
+        ]
+        pending.append((parent_key, parent_name, targets, futures))
+
+        while pending and all(f.done() for f in pending[0][3]):
+            yield issue_worklog_rows(*pending.popleft())
+    while pending:
+        yield issue_worklog_rows(*pending.popleft())
+
+
+def worklog_issue_index(jira, issues, issue_ids):
+    """{issue id: (parent_key, parent_name, child_key, child_name)} for
+    those of issue_ids whose worklogs the report covers, as
+    harvest_worklogs would label them: the board parents and their child
+    issues. Ids that are not board parents are resolved with one
+    `id in (...)` search (see Jira.issues_by_ids) instead of listing the
+    children of every board parent."""
+    parents = {
+        str(parent_id): (parent_key, parent_name)
+        for parent_id, parent_key, parent_name in board_parents(issues)
+    }
+
+    index = {}
+    others = []
+    for issue_id in dict.fromkeys(str(i) for i in issue_ids if i):
+        if issue_id in parents:
+            index[issue_id] = (*parents[issue_id], None, None)
+        else:
+            others.append(issue_id)
+    for issue in jira.issues_by_ids(others) if others else []:
+        parent = issue.get("fields", {}).get("parent") or {}
+        board_parent = parents.get(str(parent.get("id")))
+        if board_parent is None:
+            continue
+        for child_id, child_key, child_name in child_targets([issue]):
+            index[str(child_id)] = (*board_parent, child_key, child_name)
+    return index
+
+
+# ===================================================================
+# PREPARE/PAYLOAD
+# ===================================================================
 
-    jira_delete(ReportJiraSoftvisionWorklogs)
-    report_jira_worklogs_insert(df)
+
+def board_parents(issues):
+    """(id, key, summary) of the issue each board issue reports worklogs
+    for: its parent if it has one, else the issue itself."""
+    parents = []
+    for issue in issues:
+        fields = issue.get("fields", {})
+        parent = fields.get("parent") or {}
+        parents.append((
+            parent.get("id", issue.get("id")),
+            parent.get("key", issue.get("key")),
+            fields.get("summary", "Unknown"),
+        ))
+    return parents
+
+
+def child_targets(children):
+    """(id, key, summary) of each child issue with a usable key."""
+    targets = []
+    for child in children:
+        child_key = child.get("key", "Unknown")
+        # Skip Unknown keys to avoid 404s like issue/Unknown/worklog
+        if child_key in (None, "", "Unknown"):
+            print("⚠️ Skipping child without key:", child)
+            continue
+        targets.append((
+            child.get("id"),
+            child_key,
+            child.get("fields", {}).get("summary", "Unknown"),
+        ))
+    return targets
+
+
+def issue_worklog_rows(parent_key, parent_name, targets, futures):
+    """Worklog rows of one board issue from its worklog fetches."""
+    rows = []
+    for (child_key, child_name), future in zip(targets, futures):
+        for log in future.result():
+            rows.append(
+                worklog_row(log, parent_key, parent_name, child_key, child_name))
+    return rows
+
+
+def worklog_row(log, parent_key, parent_name, child_key=None, child_name=None):
+    """One report row (in WORKLOG_COLUMNS order) for a Jira worklog.
+    child_key/child_name are None for worklogs of the parent itself."""
+    raw_comment = log.get("comment")
+    if isinstance(raw_comment, dict):
+        comment = adf_to_plain_text(raw_comment) or "No Comment"
+    elif isinstance(raw_comment, str):
+        comment = raw_comment.strip() or "No Comment"
+    else:
+        comment = "No Comment"
+
+    started_raw = log["started"]
+    try:
+        started_dt = datetime.strptime(started_raw[:19], "%Y-%m-%dT%H:%M:%S")
+        started_str = started_dt.strftime("%Y-%m-%d %H:%M:%S")
+    except Exception as e:
+        print(f"Error parsing date {started_raw}: {e}")
+        started_str = started_raw
+
+    return [
+        parent_key,
+        child_key,
+        log["author"]["displayName"],
+        log["timeSpent"],
+        log["timeSpentSeconds"],
+        started_str,
+        comment,
+        parent_name,
+        child_name,
+        int(log["id"]) if log.get("id") else None,
+    ]
 
 
 # ===================================================================
@@ -160,7 +314,10 @@ def jira_worklogs():
 # ===================================================================
 
 
-def report_jira_worklogs_insert(payload):
+def report_jira_worklogs_writer():
+    """Write-behind loader for report_jira_softvision_worklogs: rows put()
+    into it stream into a staging table that replaces the live one when
+    the with-block completes (see Database.replacing)."""
     # DIAGNOSTIC
     print("--------------------------------------")
     print("Running: report_jira_worklogs")
@@ -169,15 +326,21 @@ def report_jira_worklogs_insert(payload):
 
     db = _db()
 
-    for index, row in payload.iterrows():
-        report = ReportJiraSoftvisionWorklogs(parent_key=row['parent_key'],
-                                              child_key=row['child_key'],
-                                              author=row['author'],
-                                              time_spent=row['time_spent'],
-                                              time_spent_seconds=row['time_seconds'], # noqa
-                                              started_date=row['started_date'], # noqa
-                                              comment=row['comment'],
-                                              parent_name=row['parent_name'],
-                                              child_name=row['child_name'],)
-        db.session.add(report)
+    return db.replacing(ReportJiraSoftvisionWorklogs, WORKLOG_COLUMN_MAP)
+
+
+def report_jira_worklogs_apply_changes(rows, deleted_ids, synced_until):
+    """Upsert changed worklog rows (keyed by jira_worklog_id), delete the
+    deleted worklogs and store the new cursor, in one transaction."""
+    db = _db()
+
+    df = pd.DataFrame(rows, columns=WORKLOG_COLUMNS)
+    db.bulk_upsert(
+        ReportJiraSoftvisionWorklogs, df, WORKLOG_COLUMN_MAP, commit=False)
+    if deleted_ids:
+        db.session.query(ReportJiraSoftvisionWorklogs).filter(
+            ReportJiraSoftvisionWorklogs.jira_worklog_id.in_(
+                [int(i) for i in deleted_ids])
+        ).delete(synchronize_session=False)
+    db.set_sync_state('jira', 'worklogs', synced_until=synced_until)
     db.session.commit()
@@ -510,20 +510,17 @@ class DatabaseSentry:
         return df
 
     def issue_insert(self, payload):
-        for index, row in payload.iterrows():
-            print(row)
-            issue = ReportSentryIssues(
-                sentry_id=row['sentry_id'],
-                culprit=row['culprit'],
-                title=row['title'],
-                count=row['count'],
-                user_count=row['user_count'],
-                release_version=row['release_version'],
-                permalink=row['permalink'],
-                sentry_project_id=row['sentry_project_id']
-            )
-            self.db.session.add(issue)
-            self.db.session.commit()
+        print(payload)
+        self.db.bulk_insert(ReportSentryIssues, payload, {
+            'sentry_id': 'sentry_id',
+            'culprit': 'culprit',
+            'title': 'title',
+            'count': 'count',
+            'user_count': 'user_count',
+            'release_version': 'release_version',
+            'permalink': 'permalink',
+            'sentry_project_id': 'sentry_project_id',
+        })
 
     def parse_user_count(self, response):
         """Pull the distinct-user total (count_unique(user)) out of a Sentry
@@ -601,15 +598,12 @@ class DatabaseSentry:
 
     # Insert crash free rates of the day
     def rate_insert(self, payload):
-        for index, row in payload.iterrows():
-            print(row)
-            rates = ReportSentryRates(
-                crash_free_rate_session=row['crash_free_rate_session'],
-                crash_free_rate_user=row['crash_free_rate_user'],
-                adoption_rate_user=row['adoption_rate_user'],
-                release_version=row['release_version'],
-                created_at=row['created_at'],
-                sentry_project_id=row['sentry_project_id']
-            )
-            self.db.session.add(rates)
-            self.db.session.commit()
+        print(payload)
+        self.db.bulk_insert(ReportSentryRates, payload, {
+            'crash_free_rate_session': 'crash_free_rate_session',
+            'crash_free_rate_user': 'crash_free_rate_user',
+            'adoption_rate_user': 'adoption_rate_user',
+            'release_version': 'release_version',
+            'created_at': 'created_at',
+            'sentry_project_id': 'sentry_project_id',
+        })
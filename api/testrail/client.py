@@ -40,6 +40,17 @@ class TestRail:
             data_type="cases"
         )
 
+    def iter_test_cases(self, testrail_project_id, testrail_test_suite_id,
+                        updated_after=None):
+        """Stream the cases of a suite page by page (see APIClient.iter_get),
+        optionally only those updated after an epoch timestamp"""
+        query = f"&updated_after={updated_after}" if updated_after else ''
+        return self.client.iter_get(
+            f"get_cases/{testrail_project_id}"
+            f"&suite_id={testrail_test_suite_id}{query}",
+            data_type="cases"
+        )
+
     def test_case(self, testrail_test_case_id):
         return self.client.send_get(f"get_case/{testrail_test_case_id}")
 
@@ -74,6 +85,13 @@ class TestRail:
     def test_results_for_run(self, run_id):
         return self.client.send_get(f'get_results_for_run/{run_id}')
 
+    def iter_test_results_for_run(self, run_id):
+        """Stream all results of a run page by page"""
+        return self.client.iter_get(
+            f'get_results_for_run/{run_id}',
+            data_type='results'
+        )
+
     # API: Plans
     def get_test_plans(self, testrail_project_id, start_date='', end_date=''):
         """Return all plans related to a project id"""
@@ -113,6 +131,14 @@ class TestRail:
         """Get single test execution by id"""
         return self.client.send_get(f"get_test/{test_id}")
 
+    def get_tests(self, run_id):
+        """Get all tests of a run (paginated)"""
+        return self.client.send_get(f"get_tests/{run_id}", data_type="tests")
+
+    def iter_tests(self, run_id):
+        """Stream all tests of a run page by page"""
+        return self.client.iter_get(f"get_tests/{run_id}", data_type="tests")
+
     # API: Users
     def users(self, testrail_project_id):
         return self.client.send_get(
@@ -6,8 +6,12 @@
 
 
 import inspect
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from database import (
+    DB_MAX_WORKERS,
     Database,
     Projects,
     TestSuites,
@@ -15,6 +19,11 @@ from database import (
 )
 
 
+# Upper bound on TestRail requests in flight during a report's fetch stage;
+# override with TESTRAIL_MAX_WORKERS. A per-call max_workers is clamped to
+# DB_MAX_WORKERS, the worker count the connection pool is sized for.
+TESTRAIL_MAX_WORKERS = int(os.environ.get('TESTRAIL_MAX_WORKERS') or 8)
+
 _DB = None
 
 
@@ -119,3 +128,49 @@ def testrail_project_ids(project):
     print(f"project_ids_list: {project_ids_list}")
 
     return project_ids_list
+
+
+def fetch_concurrently(fetch, items, max_workers=None):
+    """ Call fetch(item) for every item on a bounded thread pool.
+
+    Results are returned as a list in the same order as items, so callers
+    can hand them to the (single-threaded) transform and DB insert code
+    exactly as if they had been fetched one by one. The first exception
+    raised by fetch is re-raised here.
+
+    Only use this for the HTTP side: the DB session is not thread-safe.
+    """
+    return list(iter_concurrently(fetch, items, max_workers))
+
+
+def iter_concurrently(fetch, items, max_workers=None):
+    """ Like fetch_concurrently, but yield each result (in item order) as
+    soon as it is ready, so the caller can load it while later items are
+    still being fetched. Pending fetches are cancelled if the caller stops
+    early.
+
+    Items are submitted through a window of max_workers futures: the next
+    one is only submitted once the oldest result has been handed over, so
+    at most max_workers results are held while the caller is busy (e.g.
+    blocked on a write-behind queue).
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = max(1, min(
+        max_workers or TESTRAIL_MAX_WORKERS, DB_MAX_WORKERS, len(items)))
+    if workers == 1:
+        for item in items:
+            yield fetch(item)
+        return
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for item in items:
+            if len(pending) == workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fetch, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
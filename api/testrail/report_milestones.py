@@ -168,21 +168,21 @@ def report_milestones_insert(projects_id, payload):
 
     db = _db()
 
-    for index, row in payload.iterrows():
-
-        report = ReportTestRailMilestones(
-            testrail_milestone_id=row['testrail_milestone_id'],
-            projects_id=projects_id,
-            name=row['name'],
-            started_on=row['started_on'],
-            is_completed=row['is_completed'],
-            completed_on=row['completed_on'],
-            description=row['description'],
-            url=row['url'],
-            testing_status=row['testing_status'],
-            testing_recommendation=row['testing_recommendation'],
-            build_name=row['build_name'],
-            build_version=row['build_version']
-        )
-        db.session.add(report)
-        db.session.commit()
+    db.bulk_insert(
+        ReportTestRailMilestones,
+        payload.assign(projects_id=projects_id),
+        {
+            'testrail_milestone_id': 'testrail_milestone_id',
+            'projects_id': 'projects_id',
+            'name': 'name',
+            'started_on': 'started_on',
+            'is_completed': 'is_completed',
+            'completed_on': 'completed_on',
+            'description': 'description',
+            'url': 'url',
+            'testing_status': 'testing_status',
+            'testing_recommendation': 'testing_recommendation',
+            'build_name': 'build_name',
+            'build_version': 'build_version',
+        },
+    )
@@ -5,20 +5,41 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 
+import os
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone
+
 import pandas as pd
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 
 from database import (
     Database,
+    TestRailCaseSnapshots,
     TestSuites,
     ReportTestCaseCoverage,
 )
 
 from api.testrail.client import TestRail
-from api.testrail.helpers import testrail_project_ids, test_suites_delete
+from api.testrail.helpers import fetch_concurrently, testrail_project_ids
 
 import inspect
 
 
+SNAPSHOT_CHUNK_SIZE = 500
+
+# The delta pull never sees deleted cases or cases moved to another suite,
+# so every project is pulled in full (replacing its snapshot) this often
+TESTRAIL_FULL_RECONCILE_DAYS = int(
+    os.environ.get('TESTRAIL_FULL_RECONCILE_DAYS') or 7)
+
+SuiteJob = namedtuple('SuiteJob', [
+    'projects_id',
+    'testrail_project_id',
+    'testrail_test_suites_id',
+    'test_suite_name',
+])
+
 _DB = None
 _TR = None
 
@@ -58,7 +79,19 @@ def _has_tae_label(labels):
 # ORCHESTRATOR (BATCH)
 # ===================================================================
 
-def testrail_test_case_coverage(project):
+def testrail_test_case_coverage(project, full_refresh=False, max_workers=None):
+    """Refresh test_suites, the case snapshot and the coverage counts.
+
+    Suites are listed and their changed cases fetched concurrently (at most
+    max_workers, default TESTRAIL_MAX_WORKERS, in flight); everything is
+    then written in one transaction by report_test_coverage_load.
+
+    Only cases updated since the newest snapshot row of a suite are
+    pulled. A suite with no snapshot yet is pulled in full and replaces
+    its snapshot, which also drops deleted cases; so is every suite of a
+    project whose last full pull is TESTRAIL_FULL_RECONCILE_DAYS old, and
+    every suite with full_refresh=True.
+    """
 
     # DIAGNOSTIC
     print("--------------------------------------")
@@ -77,152 +110,259 @@ def testrail_test_case_coverage(project):
     # currently only setup for test_case report
     # fix this for test run data
 
-    # Test suite data is dynamic. Wipe out old test suite data
-    # in database before updating.
     tr = _tr()
+    run_started = datetime.now(timezone.utc).replace(tzinfo=None)
 
-    test_suites_delete()
-
-    for project_ids in project_ids_list:
-        projects_id = project_ids[0]
+    project_suites = fetch_concurrently(
+        lambda project_ids: tr.test_suites(project_ids[1]),
+        project_ids_list,
+        max_workers,
+    )
+    suites = [
+        SuiteJob(projects_id, testrail_project_id, suite['id'], suite['name'])
+        for (projects_id, testrail_project_id), project_suite
+        in zip(project_ids_list, project_suites)
+        for suite in project_suite
+    ]
+
+    testrail_project_ids_list = [ids[1] for ids in project_ids_list]
+    reconcile = case_snapshot_reconcile_due(
+        testrail_project_ids_list, full_refresh)
+    watermarks = {}
+    delta_projects = [
+        pid for pid in testrail_project_ids_list if pid not in reconcile]
+    if delta_projects:
+        watermarks = case_snapshot_watermarks(delta_projects)
+
+    def fetch_suite_cases(job):
+        # Step back one second so cases updated in the same second as the
+        # watermark are not missed (re-upserting them is harmless).
+        watermark = watermarks.get(
+            (job.testrail_project_id, job.testrail_test_suites_id))
+        cases = tr.iter_test_cases(
+            job.testrail_project_id, job.testrail_test_suites_id,
+            updated_after=watermark - 1 if watermark else None
+        )
+        rows = [case_snapshot_row(job.testrail_project_id, case)
+                for case in cases]
+        return rows, watermark is None
 
-        testrail_project_id = project_ids[1]
-        suites = tr.test_suites(testrail_project_id)
+    synced = fetch_concurrently(fetch_suite_cases, suites, max_workers)
 
-        for suite in suites:
-            """
-            print("DIAGNOSTIC")
-            print("testrail_project_id: {0}".format(testrail_project_id))
-            print("suite_id: {0}".format(suite['id']))
-            print("suite_name: {0}".format(suite['name']))
-            """
-            test_suites_update(testrail_project_id,
-                               suite['id'], suite['name'])
-            testrail_coverage_update(projects_id,
-                                     testrail_project_id, suite['id'])
+    report_test_coverage_load(suites, synced, reconcile, run_started)
 
 
 # ===================================================================
-# ORCHESTRATOR (PER PROJECT)
+# PREPARE/PAYLOAD
 # ===================================================================
 
-def testrail_coverage_update(projects_id, testrail_project_id, test_suite_id):
-
-    tr = _tr()
-
-    # Pull JSON blob from Testrail
-    cases = tr.test_cases(testrail_project_id, test_suite_id)
-
-    # Format and store data in a data payload array
-    payload = report_test_coverage_payload(cases)
+def case_snapshot_row(testrail_project_id, case):
+    """Reduce a Testrail case to the fields coverage is counted from."""
+    return {
+        'testrail_case_id': case['id'],
+        'testrail_project_id': testrail_project_id,
+        'testrail_test_suites_id': case['suite_id'],
+        'test_sub_suites': case.get("custom_sub_test_suites", [7]),
+        'test_automation_status_id': case['custom_automation_status'],
+        'test_automation_coverage_id': case['custom_automation_coverage'],
+        'test_automation_tae': _has_tae_label(case.get('labels')),
+        'testrail_updated_on': case['updated_on'],
+    }
 
-    # Insert data in 'totals' array into DB
-    report_test_coverage_insert(projects_id, payload)
-
-
-# ===================================================================
-# PREPARE/PAYLOAD
-# ===================================================================
 
 def report_test_coverage_payload(cases):
-    """given testrail data (cases), calculate test case counts by type"""
+    """given snapshot rows (cases), calculate test case counts by type"""
 
     # DIAGNOSTIC
     print("DIAGNOSTIC:report_test_case_coverage ")
     print(inspect.currentframe().f_code.co_name)
 
-    payload = []
+    # Single pass: tally each (suite, sub, status, cov, tae) group as the
+    # cases stream in, instead of materialising one row per case/sub-suite
+    tally = Counter()
 
     for case in cases:
 
-        row = []
-        suit = case['suite_id']
-        subs = case.get("custom_sub_test_suites", [7])
+        suit = case['testrail_test_suites_id']
+        subs = case['test_sub_suites']
 
         # DIAGNOSTIC
-        # print(f'suite_id: {suit}, case_id: {case["id"]}, subs: {subs}')
+        # print(f'suite_id: {suit}, case_id: {case["testrail_case_id"]}, subs: {subs}')
 
-        stat = case['custom_automation_status']
-        cov = case['custom_automation_coverage']
-        tae = _has_tae_label(case.get('labels'))
+        stat = case['test_automation_status_id']
+        cov = case['test_automation_coverage_id']
+        tae = case['test_automation_tae']
 
         # iterate through multi-select sub_suite data
-        # we need to create a separate row for each
-        # test case that belongs to multiple sub suites
+        # we need to count the test case once for each
+        # sub suite it belongs to
         for sub in subs:
-            row = [suit, sub, stat, cov, tae, 1]
-            payload.append(row)
-
-    df = pd.DataFrame(
-        data=payload,
+            key = (suit, sub, stat, cov, tae)
+            # groupby() dropped groups with a missing key; keep doing so
+            if None not in key:
+                tally[key] += 1
+
+    groups = sorted(tally)
+    return pd.DataFrame(
+        data=[key + (tally[key],) for key in groups],
         columns=['suit', 'sub', 'status', 'cov', 'tae', 'tally']
     )
-    return (
-        df.groupby(['suit', 'sub', 'status', 'cov', 'tae'])['tally']
-          .sum()
-          .reset_index()
-    )
 
 
 # ===================================================================
-# DB INSERT
+# CASE SNAPSHOT
 # ===================================================================
 
-def test_suites_update(testrail_project_id,
-                       testrail_test_suites_id, test_suite_name):
+def case_snapshot_watermarks(testrail_project_ids):
+    """Newest testrail_updated_on (epoch) of every suite in the snapshot,
+    as {(testrail_project_id, testrail_test_suites_id): updated_on}."""
+    db = _db()
+    table = TestRailCaseSnapshots.__table__
+    result = db.session.execute(
+        select(
+            table.c.testrail_project_id,
+            table.c.testrail_test_suites_id,
+            func.max(table.c.testrail_updated_on),
+        ).where(
+            table.c.testrail_project_id.in_(testrail_project_ids)
+        ).group_by(
+            table.c.testrail_project_id,
+            table.c.testrail_test_suites_id,
+        )
+    )
+    return {(project_id, suite_id): updated_on
+            for project_id, suite_id, updated_on in result}
+
 
+def case_snapshot_reconcile_due(testrail_project_ids, full_refresh=False):
+    """The testrail project ids whose snapshot must be pulled in full:
+    never fully pulled, last full pull TESTRAIL_FULL_RECONCILE_DAYS old,
+    or all of them with full_refresh=True."""
+    if full_refresh:
+        return set(testrail_project_ids)
     db = _db()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    due = set()
+    for testrail_project_id in testrail_project_ids:
+        state = db.get_sync_state(
+            'testrail', 'test_case_coverage_full',
+            project=str(testrail_project_id))
+        if not (state and state.synced_until) or (
+                now - state.synced_until
+                >= timedelta(days=TESTRAIL_FULL_RECONCILE_DAYS)):
+            due.add(testrail_project_id)
+    return due
+
+
+def case_snapshot_rows(testrail_project_id, test_suite_id):
+    """Iterate over the snapshot rows of a suite, as dicts."""
+    db = _db()
+    table = TestRailCaseSnapshots.__table__
+    result = db.session.execute(
+        select(table).where(
+            table.c.testrail_project_id == testrail_project_id,
+            table.c.testrail_test_suites_id == test_suite_id,
+        )
+    )
+    return (dict(row) for row in result.mappings())
 
-    # DIAGNOSTIC
-    print("DIAGNOSTIC:report_test_case_coverage ")
-    print(inspect.currentframe().f_code.co_name)
 
-    suites = TestSuites(testrail_project_id=testrail_project_id,
-                        testrail_test_suites_id=testrail_test_suites_id,
-                        test_suite_name=test_suite_name)
-    db.session.add(suites)
-    db.session.commit()
+def case_snapshot_upsert(testrail_project_id, test_suite_id, rows,
+                         replace=False):
+    """Upsert snapshot rows keyed by testrail_case_id, in chunks. With
+    replace=True the suite's existing rows are deleted first.
+
+    Does not commit: the caller owns the transaction."""
+
+    db = _db()
+    table = TestRailCaseSnapshots.__table__
+    stmt = mysql_insert(table)
+    stmt = stmt.on_duplicate_key_update({
+        col.name: stmt.inserted[col.name]
+        for col in table.columns if col.name != 'testrail_case_id'
+    })
+
+    if replace:
+        db.session.execute(
+            delete(table).where(
+                table.c.testrail_project_id == testrail_project_id,
+                table.c.testrail_test_suites_id == test_suite_id,
+            )
+        )
+    for i in range(0, len(rows), SNAPSHOT_CHUNK_SIZE):
+        db.session.execute(stmt, rows[i:i + SNAPSHOT_CHUNK_SIZE])
+
+    print(f"Synced {len(rows)} cases of suite {test_suite_id} "
+          f"({'full' if replace else 'delta'})")
 
 
 # ===================================================================
 # DB INSERT
 # ===================================================================
 
-def report_test_coverage_insert(projects_id, payload):
+def report_test_coverage_load(suites, synced, reconciled=(),
+                              run_started=None):
+    """Write the refreshed suites, snapshot rows and coverage counts in a
+    single transaction.
+
+    Args:
+        suites (list[SuiteJob]): every suite of the selected projects.
+        synced (list[tuple]): (snapshot rows, replace) per suite, in the
+            same order as suites.
+        reconciled (set): testrail project ids pulled in full; their last
+            full pull is recorded as run_started in the same transaction.
+    """
 
     # DIAGNOSTIC
     print("DIAGNOSTIC: report_test_case_coverage")
     print(inspect.currentframe().f_code.co_name)
 
-    # TODO:  Error on insert
-    # insert data from totals into report_test_coverage table
-
     db = _db()
 
-    for index, row in payload.iterrows():
-        """
-        # DIAGNOSTIC
-
-        print(
-            'ROW - suit: {0}, asid: {1}, acid: {2}, ssid: {3}, tally: {4}'.format(
-                row['suit'],
-                row['status'],
-                row['cov'],
-                row['sub'],
-                row['tally']
-
+    try:
+        # Test suite data is dynamic. Wipe out old test suite data
+        # before re-adding it.
+        db.session.execute(delete(TestSuites.__table__))
+        db.bulk_insert(TestSuites, [
+            {
+                'testrail_project_id': job.testrail_project_id,
+                'testrail_test_suites_id': job.testrail_test_suites_id,
+                'test_suite_name': job.test_suite_name,
+            }
+            for job in suites
+        ], commit=False)
+
+        coverage = []
+        for job, (rows, replace) in zip(suites, synced):
+            case_snapshot_upsert(job.testrail_project_id,
+                                 job.testrail_test_suites_id,
+                                 rows, replace=replace)
+
+            # recompute the suite's counts from its (updated) snapshot
+            payload = report_test_coverage_payload(
+                case_snapshot_rows(job.testrail_project_id,
+                                   job.testrail_test_suites_id))
+            coverage.extend(
+                {
+                    'projects_id': job.projects_id,
+                    'testrail_test_suites_id': row['suit'],
+                    'test_automation_status_id': row['status'],
+                    'test_automation_coverage_id': row['cov'],
+                    'test_sub_suites_id': row['sub'],
+                    'test_automation_tae': row['tae'],
+                    'test_count': row['tally'],
+                }
+                for row in payload.to_dict('records')
             )
-        )
-        """
-
-        report = ReportTestCaseCoverage(
-            projects_id=projects_id,
-            testrail_test_suites_id=row['suit'],
-            test_automation_status_id=row['status'],
-            test_automation_coverage_id=row['cov'],
-            test_sub_suites_id=row['sub'],
-            test_automation_tae=row['tae'],
-            test_count=row['tally']
-        )
-        db.session.add(report)
+
+        db.bulk_insert(ReportTestCaseCoverage, coverage, commit=False)
+        for testrail_project_id in sorted(reconciled):
+            db.set_sync_state(
+                'testrail', 'test_case_coverage_full',
+                project=str(testrail_project_id), synced_until=run_started)
         db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    print(f"Loaded {len(suites)} suites, {len(coverage)} coverage rows")
@@ -9,9 +9,9 @@
 # stabilization or optimization, and follow performance trends.
 
 from datetime import datetime, timedelta
-from collections import namedtuple
+
+import pandas as pd
 from sqlalchemy import select
-from sqlalchemy.exc import NoResultFound
 
 from database import (
     Database,
@@ -19,7 +19,7 @@ from database import (
 )
 
 from api.testrail.client import TestRail
-from api.testrail.helpers import testrail_project_ids
+from api.testrail.helpers import fetch_concurrently, testrail_project_ids
 
 # TestRail status_id mapping for pass rate calculation
 # 1=pass -> 1, 4=retest -> 0, 5=fail -> 0
@@ -34,6 +34,48 @@ STATUS_SCORE = {
     7: None,  # not available - skip
 }
 
+# Columns of report_testrail_test_health written by this report
+HEALTH_COLUMNS = [
+    "testrail_case_id",
+    "testrail_project_id",
+    "testrail_case_name",
+    "testrail_suite_name",
+    "num_executions",
+    "avg_runtime",
+    "pass_rate",
+    "most_recent_timestamp",
+    "most_recent_runtime",
+    "most_recent_status",
+    "status_history_1",
+    "status_history_2",
+    "status_history_3",
+    "status_history_4",
+    "created_on",
+]
+
+# Most recent status first, then the shifted history
+HISTORY_COLUMNS = [
+    "most_recent_status",
+    "status_history_1",
+    "status_history_2",
+    "status_history_3",
+    "status_history_4",
+]
+
+# One row per TestRail result collected by testrail_test_health
+RESULT_COLUMNS = [
+    "case_id",
+    "project_id",
+    "case_name",
+    "suite_name",
+    "created_on",
+    "elapsed",
+    "status",
+]
+
+# Rows per IN-query / per INSERT ... ON DUPLICATE KEY UPDATE statement
+HEALTH_CHUNK_SIZE = 500
+
 _DB = None
 _TR = None
 
@@ -73,110 +115,168 @@ def dur_to_sec(timestamp: str) -> float:
     return accu
 
 
-def update_testrail_test_health_row(payload, update_list):
-    db = _db()
-    new_row = {
-        "testrail_case_id": None,
-        "testrail_project_id": None,
-        "testrail_case_name": None,
-        "testrail_suite_name": None,
-        "num_executions": None,
-        "avg_runtime": None,
-        "pass_rate": None,
-        "most_recent_timestamp": None,
-        "most_recent_runtime": None,
-        "most_recent_status": None,
-        "status_history_1": None,
-        "status_history_2": None,
-        "status_history_3": None,
-        "status_history_4": None,
-        "created_on": datetime.utcnow(),
+def tests_index(tests):
+    """Map test_id -> {case_id, title} for the tests of a run, so results
+    can be resolved without one get_test round-trip per result."""
+    return {
+        test.get("id"): {
+            "case_id": test.get("case_id"),
+            "title": test.get("title"),
+        }
+        for test in tests
     }
 
-    reserved_names = ["metadata", "registry"]
-    Update = namedtuple(
-        "Update",
-        [
-            k
-            for k in dir(ReportTestRailTestHealth())
-            if not k.startswith("_") and k not in reserved_names
-        ],
+
+def compute_test_health_rows(results, stored):
+    """Merge a frame of new results into the stored health aggregates.
+
+    results: one row per result, columns RESULT_COLUMNS.
+    stored:  stored health rows for the affected cases, columns
+             HEALTH_COLUMNS (see load_test_health_rows).
+
+    Counts, average runtime and pass rate are computed per case with a
+    groupby over the scored results and combined with the stored
+    aggregates as weighted means. The status history is rebuilt from a
+    single timeline per case: new results newer than the stored most
+    recent one, the stored most recent status, older new results, then
+    the stored history.
+
+    Returns a list of row dicts ready for report_test_health_update.
+    """
+    # A None case id turns the column into floats: drop those results
+    # and restore integer ids, which are the upsert key
+    results = results.dropna(subset=["case_id"])
+    if results.empty:
+        return []
+    results = results.astype({"case_id": int}).sort_values(
+        "created_on", ascending=False, kind="stable"
+    )
+    results = results.assign(
+        score=results["status"].map(STATUS_SCORE).astype(float)
+    )
+    stored = stored.set_index("testrail_case_id")[
+        ["num_executions", "avg_runtime", "pass_rate",
+         "most_recent_timestamp", "most_recent_runtime"] + HISTORY_COLUMNS
+    ]
+    stored = stored.astype({
+        "num_executions": float,
+        "avg_runtime": float,
+        "pass_rate": float,
+        "most_recent_runtime": float,
+    }).assign(
+        most_recent_timestamp=pd.to_datetime(stored["most_recent_timestamp"])
     )
 
-    def increment_average(starting_count, starting_average, new_value) -> float:
-        return (
-                ((float(starting_average) * float(starting_count)) + float(new_value))
-                / (float(starting_count) + 1)
-        )
+    scored = results[results["score"].notna()]
+    new_stats = scored.groupby("case_id").agg(
+        new_count=("score", "size"),
+        new_runtime=("elapsed", "sum"),
+        new_score=("score", "sum"),
+    )
+    latest = results.groupby("case_id").head(1).set_index("case_id")
+    frame = latest.join(new_stats).join(stored)
 
-    new_row["testrail_case_id"] = payload.get("case_id")
-    new_row["testrail_project_id"] = payload.get("project_id")
-    new_row["testrail_case_name"] = payload.get("case_name")
-    new_row["testrail_suite_name"] = payload.get("suite_name")
+    old_n = frame["num_executions"].fillna(0)
+    new_n = frame["new_count"].fillna(0)
+    total = old_n + new_n
+    frame["num_executions"] = total.astype(int)
+    frame["avg_runtime"] = (
+        (frame["avg_runtime"].fillna(0) * old_n + frame["new_runtime"].fillna(0))
+        / total.where(total > 0)
+    )
+    frame["pass_rate"] = (
+        (frame["pass_rate"].fillna(0) * old_n + frame["new_score"].fillna(0))
+        / total.where(total > 0)
+    )
 
-    try:
-        if payload["case_id"] in update_list:
-            row = Update(**(update_list.get(payload["case_id"])))
-        else:
-            row = db.session.scalars(
-                select(ReportTestRailTestHealth).where(
-                    ReportTestRailTestHealth.testrail_case_id == payload.get(
-                        "case_id")
-                )
-            ).one()
-        starting_count = row.num_executions
-        score = STATUS_SCORE.get(payload.get("status"))
-        if score is not None:
-            new_row["num_executions"] = starting_count + 1
-            new_row["avg_runtime"] = increment_average(
-                starting_count, row.avg_runtime, payload.get("elapsed")
-            )
-            new_row["pass_rate"] = increment_average(
-                starting_count, row.pass_rate, score
-            )
-        else:
-            new_row["num_executions"] = starting_count
-            new_row["avg_runtime"] = row.avg_runtime
-            new_row["pass_rate"] = row.pass_rate
-        new_row["status_history_4"] = row.status_history_3
-        new_row["status_history_3"] = row.status_history_2
-        new_row["status_history_2"] = row.status_history_1
-        if payload.get("created_on") > row.most_recent_timestamp:
-            new_row["most_recent_timestamp"] = payload["created_on"]
-            new_row["most_recent_runtime"] = payload["elapsed"]
-            new_row["status_history_1"] = row.most_recent_status
-            new_row["most_recent_status"] = payload["status"]
-        else:
-            new_row["status_history_1"] = payload["status"]
-            new_row["most_recent_timestamp"] = row.most_recent_timestamp
-            new_row["most_recent_runtime"] = row.most_recent_runtime
-            new_row["most_recent_status"] = row.most_recent_status
-    except NoResultFound:
-        # new test
-        score = STATUS_SCORE.get(payload.get("status"))
-        if score is not None:
-            new_row["num_executions"] = 1
-            new_row["avg_runtime"] = payload.get("elapsed")
-            new_row["pass_rate"] = float(score)
-        else:
-            new_row["num_executions"] = 0
-            new_row["avg_runtime"] = None
-            new_row["pass_rate"] = None
-        new_row["most_recent_timestamp"] = payload.get("created_on")
-        new_row["most_recent_runtime"] = payload.get("elapsed")
-        new_row["most_recent_status"] = payload.get("status")
-
-    return new_row
-
-
-def testrail_test_health(project, num_days=1):
+    newer = (
+        frame["most_recent_timestamp"].isna()
+        | (frame["created_on"] > frame["most_recent_timestamp"])
+    )
+    frame["most_recent_timestamp"] = frame["created_on"].where(
+        newer, frame["most_recent_timestamp"]
+    )
+    frame["most_recent_runtime"] = frame["elapsed"].where(
+        newer, frame["most_recent_runtime"]
+    )
+
+    # Status timeline, ordered by (case, group, newest first)
+    stored_ts = pd.Series(
+        stored["most_recent_timestamp"].reindex(results["case_id"]).to_numpy(),
+        index=results.index,
+    )
+    new_part = pd.DataFrame({
+        "case_id": results["case_id"],
+        "group": (
+            (stored_ts.notna() & (results["created_on"] <= stored_ts)) * 2
+        ),
+        "ts": results["created_on"],
+        "slot": 0,
+        "status": results["status"],
+    })
+    known = stored[stored.index.isin(frame.index)]
+    stored_part = known[HISTORY_COLUMNS].reset_index().melt(
+        id_vars="testrail_case_id", var_name="column", value_name="status"
+    ).dropna(subset=["status"])
+    stored_part = pd.DataFrame({
+        "case_id": stored_part["testrail_case_id"],
+        "group": (stored_part["column"] != "most_recent_status") * 2 + 1,
+        "ts": pd.NaT,
+        "slot": stored_part["column"].map(HISTORY_COLUMNS.index),
+        "status": stored_part["status"],
+    })
+    timeline = pd.concat([new_part, stored_part], ignore_index=True)
+    timeline = timeline.sort_values(
+        ["case_id", "group", "ts", "slot"],
+        ascending=[True, True, False, True],
+        kind="stable",
+    )
+    timeline["position"] = timeline.groupby("case_id").cumcount()
+    history = timeline[timeline["position"] < len(HISTORY_COLUMNS)].pivot(
+        index="case_id", columns="position", values="status"
+    ).reindex(columns=range(len(HISTORY_COLUMNS)))
+    history.columns = HISTORY_COLUMNS
+    frame[HISTORY_COLUMNS] = history.reindex(frame.index).astype("Int64")
+
+    frame = frame.reset_index().rename(columns={
+        "case_id": "testrail_case_id",
+        "project_id": "testrail_project_id",
+        "case_name": "testrail_case_name",
+        "suite_name": "testrail_suite_name",
+    })
+    frame["created_on"] = datetime.utcnow()
+    frame = frame[HEALTH_COLUMNS].astype(object)
+    frame = frame.where(frame.notna(), None)
+    rows = frame.to_dict("records")
+    # Hand the driver plain datetimes rather than pandas Timestamps (an
+    # object column re-boxes them, so convert in the records)
+    for row in rows:
+        for col in ("most_recent_timestamp", "created_on"):
+            if isinstance(row[col], pd.Timestamp):
+                row[col] = row[col].to_pydatetime()
+    return rows
+
+
+def _fetch_run(run_id):
+    """Timed results and test index of one run (worker-side fetch).
+
+    Both collections are streamed page by page; only the results that
+    carry an elapsed time are kept."""
+    tr = _tr()
+    return (
+        [r for r in tr.iter_test_results_for_run(run_id) if r.get("elapsed")],
+        tests_index(tr.iter_tests(run_id)),
+    )
+
+
+def testrail_test_health(project, num_days=1, max_workers=None):
     tr = _tr()
 
     # Dictionary of project ids and their respective service acct user id
     AUTOUSERS = {17: 976}
     suite_cache = {}
     test_cache = {}
-    updates = {}
+    update_payloads = []
     project_ids_list = testrail_project_ids(project)[0]
     start_date = datetime.now() - timedelta(days=int(num_days))
     for project_id in project_ids_list:
@@ -188,55 +288,88 @@ def testrail_test_health(project, num_days=1):
             created_after=int(start_date.timestamp()),
         )
 
-        # Iterate through plans to get result and test info
-        for plan in plans.get("plans"):
+        # Fetch plan details, suite names and run results concurrently,
+        # then process them in plan -> entry -> run order
+        plans = plans.get("plans")
+        plan_details = fetch_concurrently(
+            lambda plan: tr.get_test_plan(plan.get("id")), plans, max_workers
+        )
+        runs = []
+        for plan, details in zip(plans, plan_details):
             print(f"Processing {plan.get('name')}...")
-            plan_details = tr.get_test_plan(plan.get("id"))
-            for entry in plan_details.get("entries"):
-                for run in entry.get("runs"):
-                    run_id = run.get("id")
-                    suite_id = run.get("suite_id")
-                    if suite_id not in suite_cache:
-                        suite_cache[suite_id] = tr.test_suite(
-                            suite_id).get("name")
-                    print(f"Processing Run: {run.get('name')}...")
-                    run_results = tr.test_results_for_run(run_id).get("results", [])
-                    print(f"Processing {len(run_results)} test results...")
-                    for result in run_results:
-                        if not result.get("elapsed"):
-                            continue
-                        test_id = result.get("test_id")
-                        if test_id not in test_cache:
-                            test_cache[test_id] = tr.get_test(test_id)
-                        test = test_cache.get(test_id)
-                        suite_name = suite_cache.get(suite_id)
-                        update_payload = {
-                            "case_id": test.get("case_id"),
-                            "project_id": project_id,
-                            "case_name": test.get("title"),
-                            "suite_name": suite_name,
-                            "created_on": datetime.fromtimestamp(
-                                int(result.get("created_on"))
-                            ),
-                            "elapsed": dur_to_sec(result.get("elapsed")),
-                            "status": result.get("status_id"),
-                        }
-                        new_row = update_testrail_test_health_row(
-                            update_payload, updates
-                        )
-                        updates[new_row.get("testrail_case_id")] = new_row
+            for entry in details.get("entries"):
+                runs.extend(entry.get("runs"))
+
+        suite_ids = list(dict.fromkeys(
+            run.get("suite_id") for run in runs
+            if run.get("suite_id") not in suite_cache
+        ))
+        suite_names = fetch_concurrently(
+            lambda suite_id: tr.test_suite(suite_id).get("name"),
+            suite_ids,
+            max_workers,
+        )
+        suite_cache.update(zip(suite_ids, suite_names))
+
+        fetched = fetch_concurrently(
+            _fetch_run, [run.get("id") for run in runs], max_workers
+        )
+        for run, (run_results, tests) in zip(runs, fetched):
+            suite_id = run.get("suite_id")
+            print(f"Processing Run: {run.get('name')}...")
+            print(f"Processing {len(run_results)} test results...")
+            test_cache.update(tests)
+            for result in run_results:
+                test_id = result.get("test_id")
+                if test_id not in test_cache:
+                    test_cache[test_id] = tr.get_test(test_id)
+                test = test_cache.get(test_id)
+                suite_name = suite_cache.get(suite_id)
+                update_payload = {
+                    "case_id": test.get("case_id"),
+                    "project_id": project_id,
+                    "case_name": test.get("title"),
+                    "suite_name": suite_name,
+                    "created_on": datetime.fromtimestamp(
+                        int(result.get("created_on"))
+                    ),
+                    "elapsed": dur_to_sec(result.get("elapsed")),
+                    "status": result.get("status_id"),
+                }
+                update_payloads.append(update_payload)
 
+    # Aggregate every new result in one pass against the stored rows
+    results = pd.DataFrame(update_payloads, columns=RESULT_COLUMNS)
+    stored = load_test_health_rows(results["case_id"].dropna().unique())
+    updates = compute_test_health_rows(results, stored)
     report_test_health_update(updates)
 
 
-def report_test_health_update(payload):
+def load_test_health_rows(case_ids):
+    """Return the stored health rows of case_ids as a DataFrame
+    (columns HEALTH_COLUMNS), read with one IN-query per chunk."""
     db = _db()
-    for testrail_case_id, row in payload.items():
-        matching_row = db.session.query(ReportTestRailTestHealth).filter(
-            ReportTestRailTestHealth.testrail_case_id == testrail_case_id
+    table = ReportTestRailTestHealth.__table__
+    case_ids = [int(case_id) for case_id in case_ids]
+    rows = []
+    for i in range(0, len(case_ids), HEALTH_CHUNK_SIZE):
+        chunk = case_ids[i:i + HEALTH_CHUNK_SIZE]
+        result = db.session.execute(
+            select(*[table.c[col] for col in HEALTH_COLUMNS]).where(
+                table.c.testrail_case_id.in_(chunk)
+            )
         )
-        if matching_row.all():
-            matching_row.update(row, synchronize_session="fetch")
-        else:
-            db.session.add(ReportTestRailTestHealth(**row))
-        db.session.commit()
+        rows.extend(dict(row) for row in result.mappings())
+    return pd.DataFrame(rows, columns=HEALTH_COLUMNS)
+
+
+def report_test_health_update(rows):
+    """Write the health rows with one INSERT ... ON DUPLICATE KEY UPDATE
+    per chunk, committed once.
+    Requires the UNIQUE KEY on testrail_case_id (see db/migrations)."""
+    db = _db()
+    if not rows:
+        return
+
+    db.bulk_upsert(ReportTestRailTestHealth, rows, chunk_size=HEALTH_CHUNK_SIZE)
+    print(f"Upserted {len(rows)} test health rows")
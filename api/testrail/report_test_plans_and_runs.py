@@ -12,7 +12,7 @@ from database import (
 )
 
 from api.testrail.client import TestRail
-from api.testrail.helpers import testrail_project_ids
+from api.testrail.helpers import fetch_concurrently, testrail_project_ids
 from utils.datetime_utils import DatetimeUtils as dt
 from utils.payload_utils import PayloadUtils as pl
 
@@ -143,7 +143,8 @@ def testrail_plans_and_runs(project, start_date=None, num_days=None, end_date=No
 # ORCHESTRATOR (BATCH)
 # ===================================================================
 
-def testrail_runs_update(project_plans, start_date=None, end_date=None, num_days=None):
+def testrail_runs_update(project_plans, start_date=None, end_date=None, num_days=None,
+                         max_workers=None):
     """
         Update the test_runs table with the latest entries up until
         the specified number of days.
@@ -151,6 +152,8 @@ def testrail_runs_update(project_plans, start_date=None, end_date=None, num_days
         Args:
             num_days (str): number of days to go back from.
             project_plans (dict): the queried and filtered testrail plans.
+            max_workers (int): cap on concurrent get_test_plan calls
+                (defaults to TESTRAIL_MAX_WORKERS).
     """
 
     # DIAGNOSTIC
@@ -167,13 +170,19 @@ def testrail_runs_update(project_plans, start_date=None, end_date=None, num_days
         num_days=num_days
     )
 
-    # querying each test plan individually returns the associated runs
-    for plan in project_plans.values():
-        plan_info = tr.get_test_plan(
+    # querying each test plan individually returns the associated runs;
+    # fetch them concurrently, then insert in plan order
+    plans = list(project_plans.values())
+    plan_infos = fetch_concurrently(
+        lambda plan: tr.get_test_plan(
             plan['plan_id'],
             start_date_value,
             end_date_value
-        )
+        ),
+        plans,
+        max_workers=max_workers,
+    )
+    for plan, plan_info in zip(plans, plan_infos):
         if not isinstance(plan_info, dict) or 'entries' not in plan_info:
             print(f"No 'entries' for plan {plan['plan_id']}: {plan_info}")
             continue
@@ -245,6 +254,7 @@ def _classify_run(name):
 def report_test_runs_insert(db_plan_id, suite_id, runs):
     db = _db()
 
+    rows = []
     for run in runs:
         created_on = dt.convert_epoch_to_datetime(run['created_on'])
         completed_on = (
@@ -259,7 +269,7 @@ def report_test_runs_insert(db_plan_id, suite_id, runs):
                 + run['blocked_count']
         )
 
-        report_run = ReportTestRailTestRuns(
+        rows.append(dict(
             testrail_run_id=run['id'],
             plan_id=db_plan_id,
             suite_id=suite_id,
@@ -273,8 +283,6 @@ def report_test_runs_insert(db_plan_id, suite_id, runs):
             test_case_total_count=total_count,
             testrail_created_on=created_on,
             testrail_completed_on=completed_on
-        )
+        ))
 
-        db.session.add(report_run)
-
-    db.session.commit()
+    db.bulk_insert(ReportTestRailTestRuns, rows)
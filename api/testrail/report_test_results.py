@@ -14,6 +14,7 @@ from database import (
 )
 
 from api.testrail.client import TestRail
+from api.testrail.helpers import fetch_concurrently, iter_concurrently
 from utils.datetime_utils import DatetimeUtils as dt
 
 _TR = None
@@ -38,9 +39,12 @@ def _db() -> Database():
 # ORCHESTRATOR (BATCH)
 # ===================================================================
 
-def testrail_test_results():
+def testrail_test_results(max_workers=None):
     """Gets all the test result duration for the latest test plans
-    Precondition: testrail_plans_and_runs have been run prior"""
+    Precondition: testrail_plans_and_runs have been run prior
+
+    Plans and run results are fetched concurrently (at most max_workers,
+    default TESTRAIL_MAX_WORKERS, in flight) and inserted in plan order."""
 
     print("--------------------------------------")
     print("DIAGNOSTIC")
@@ -62,30 +66,46 @@ def testrail_test_results():
             if tp_ids[0] and tp_ids[1]:
                 break
 
-    # Insert data for beta and refer back to test run table
-    db.clean_table(ReportTestRailTestResults)
+    # Results for beta and l10n, referring back to the test run table.
+    # Rows are written behind the fetch into a staging table that is
+    # swapped in at the end, so the table is never seen empty or partial.
     types = ("beta", "l10n")
 
-    for i, type in enumerate(types):
-
-        print("DIAGNOSTIC")
-        print(f"type: {type}, i: {i}, tp_ids[i]: {tp_ids[i]}")
-
-        runs = tr.get_test_plan(tp_ids[i])["entries"]
-
-        for run in runs:
-            for config in run["runs"]:
+    # A type without a plan yet has no id to fetch
+    found = [tp_id for tp_id in tp_ids if tp_id]
+    plans = dict(zip(
+        found, fetch_concurrently(tr.get_test_plan, found, max_workers)))
+
+    with report_testrail_test_results_writer() as writer:
+        for i, type in enumerate(types):
+
+            print("DIAGNOSTIC")
+            print(f"type: {type}, i: {i}, tp_ids[i]: {tp_ids[i]}")
+            if not tp_ids[i]:
+                print(f"No {type} test plan found, skipping")
+                continue
+
+            configs = [
+                config for run in plans[tp_ids[i]]["entries"]
+                for config in run["runs"]
+            ]
+            # Each worker streams its run's results page by page and keeps
+            # only the prepared rows, never the raw JSON history
+            run_results = iter_concurrently(
+                lambda config: report_test_result_payload(
+                    tr.iter_test_results_for_run(config["id"]), type),
+                configs,
+                max_workers,
+            )
+
+            for config, rows in zip(configs, run_results):
                 db_run_id = db.session.query(
                     ReportTestRailTestRuns).filter_by(
                         testrail_run_id=config["id"]).first().id
-                run_results = (
-                    tr.test_results_for_run(config["id"])["results"]
-                )
 
                 print(f"Adding all results from run {config['id']}")
-                report_testrail_test_result_insert(
-                    db_run_id, run_results, type)
-        print(f"Added all test results from table {type}")
+                writer.put(dict(row, run_id=db_run_id) for row in rows)
+            print(f"Added all test results from table {type}")
 
 
 # ===================================================================
@@ -137,6 +157,46 @@ def report_test_run_payload(runs):
     return payload
 
 
+def report_test_result_payload(results, type):
+    """Prepare report_testrail_test_results rows (minus run_id) from an
+    iterable of TestRail results, skipping results not from automation."""
+
+    payload = []
+
+    for result in results:
+        # Skip if not automated testing
+        if result["created_by"] != 976:
+            continue
+
+        created_on = dt.convert_epoch_to_datetime(result['created_on'])
+
+        completed_on = (
+            dt.convert_epoch_to_datetime(result['completed_on'])
+            if result.get('completed_on') else None
+        )
+
+        elapsed = result["elapsed"]
+        if elapsed:
+            if "min" in elapsed:
+                parts = elapsed.split(" ")
+                time = int(parts[0][:-3]) * 60 + \
+                    (int(parts[1][:-3]) if len(parts) > 1 else 0)
+            else:
+                time = elapsed[:-3]
+
+        payload.append({
+            'testrail_result_id': result['id'],
+            'test_id': result['test_id'],
+            'elapsed': float(time),
+            'status_id': result['status_id'],
+            'testrail_created_on': created_on,
+            'testrail_completed_on': completed_on,
+            'type': type
+        })
+
+    return payload
+
+
 # ===================================================================
 # ORCHESTRATOR (PER-PROJECT)
 # ===================================================================
@@ -178,56 +238,18 @@ def testrail_run_counts_update(project, num_days):
 # DB INSERT
 # ===================================================================
 
-def report_testrail_test_result_insert(db_run_id, payload, type):
+def report_testrail_test_results_writer():
+    """Write-behind loader replacing report_testrail_test_results with
+    the rows put() into it (see Database.replacing)."""
 
     print("--------------------------------------")
     print("DIAGNOSTIC")
     print(inspect.currentframe().f_code.co_name)
     print("--------------------------------------")
 
-    # insert data from payload into report_testrail_test_results table
-
     db = _db()
 
-    for result in payload:
-        # Skip if not automated testing
-        if result["created_by"] != 976:
-            continue
-
-        created_on = dt.convert_epoch_to_datetime(result['created_on'])
-
-        completed_on = (
-            dt.convert_epoch_to_datetime(result['completed_on'])
-            if result.get('completed_on') else None
-        )
-
-        elapsed = result["elapsed"]
-        if elapsed:
-            if "min" in elapsed:
-                parts = elapsed.split(" ")
-                time = int(parts[0][:-3]) * 60 + \
-                    (int(parts[1][:-3]) if len(parts) > 1 else 0)
-            else:
-                time = elapsed[:-3]
-
-        args = {
-            'testrail_result_id': result['id'],
-            'run_id': db_run_id,
-            'test_id': result['test_id'],
-            'elapsed': float(time),
-            'status_id': result['status_id'],
-            'testrail_created_on': created_on,
-            'testrail_completed_on': completed_on,
-            'type': type
-        }
-
-        report = ReportTestRailTestResults(**args)
-
-        db.session.add(report)
-        db.session.commit()
-        result['id'] = report.id
-
-    return payload
+    return db.replacing(ReportTestRailTestResults)
 
 
 def report_test_runs_insert(self, db_plan_id, suite_id, runs):
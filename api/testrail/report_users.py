@@ -134,13 +134,10 @@ def report_testrail_users_insert(payload):
 
     db = _db()
 
-    for index, row in payload.iterrows():
-        report = ReportTestRailUsers(
-            name=row['name'],
-            email=row['email'],
-            status=row['status'],
-            role=row['role'],
-            created_at=row['created_at']
-        )
-        db.session.add(report)
-        db.session.commit()
+    db.bulk_insert(ReportTestRailUsers, payload, {
+        'name': 'name',
+        'email': 'email',
+        'status': 'status',
+        'role': 'role',
+        'created_at': 'created_at',
+    })
@@ -90,6 +90,11 @@ QATT_FIELDS = "key,summary"
 QATT_BOARD = "15948"
 QATT_PARENT_TICKETS_IN_BOARD = f"filter={QATT_BOARD}&jql=parent="
 WORKLOG_URL_TEMPLATE = "issue/{issue_key}/worklog"
+WORKLOG_UPDATED = "worklog/updated"
+WORKLOG_DELETED = "worklog/deleted"
+WORKLOG_LIST = "worklog/list"
+WORKLOG_LIST_BATCH_SIZE = 1000  # max ids per worklog/list request
+ISSUE_ID_BATCH_SIZE = 100  # ids per "id in (...)" issue search
 
 # JQL Ecosystem and Service QA Issues
 FILTER_ID_SOFTVISION_ISSUES_QA_TEAMS = "35754"
@@ -4,143 +4,506 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from sqlalchemy import Table
-
-from lib.database_conn import Session, Base, pool
-
-
-class Projects(Base):
-    __table__ = Table('projects', Base.metadata, autoload_with=pool)
-
-
-class TestAutomationStatus(Base):
-    __table__ = Table('test_automation_status', Base.metadata, autoload_with=pool)
-
-
-class TestAutomationCoverage(Base):
-    __table__ = Table('test_automation_coverage', Base.metadata, autoload_with=pool)
-
-
-class TestSuites(Base):
-    __table__ = Table('test_suites', Base.metadata, autoload_with=pool)
-
-
-class TestSubSuites(Base):
-    __table__ = Table('test_sub_suites', Base.metadata, autoload_with=pool)
-
-
-class ReportTestCaseCoverage(Base):
-    __table__ = Table('report_test_case_coverage', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportTestRailTestHealth(Base):
-    __table__ = Table("report_testrail_test_health", Base.metadata, autoload_with=pool)
-
-
-# class ReportTestRunCounts(Base):
-#    __table__ = Table('report_test_run_counts', Base.metadata, autoload_with=pool)
-
-
-class ReportTestRailTestPlans(Base):
-    __table__ = Table('report_testrail_test_plans', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportTestRailTestRuns(Base):
-    __table__ = Table('report_testrail_test_runs', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportGithubIssues(Base):
-    __table__ = Table('report_github_issues', Base.metadata, autoload_with=pool)
-
-
-class ReportJiraQARequests(Base):
-    __table__ = Table('report_jira_qa_requests', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportJIraQARequestsNewIssueType(Base):
-    __table__ = Table('report_jira_qa_requests_new_issue_types', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportJiraQARequestsDesktop(Base):
-    __table__ = Table('report_jira_qa_requests_desktop', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportJiraQANeeded(Base):
-    __table__ = Table('report_jira_qa_needed', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportJiraSoftvisionIssuesQATeams(Base):
-    __table__ = Table('report_jira_softvision_issues_qa_teams', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportJiraSoftvisionIssuesOtherTeams(Base):
-    __table__ = Table('report_jira_softvision_issues_other_teams', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaQENeeded(Base):
-    __table__ = Table('report_bugzilla_qe_needed', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaQEVerifyCount(Base):
-    __table__ = Table('report_bugzilla_qe_needed_count', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportTestRailMilestones(Base):
-    __table__ = Table('report_testrail_milestones', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportTestRailUsers(Base):
-    __table__ = Table('report_testrail_users', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportJiraSoftvisionWorklogs(Base):
-    __table__ = Table('report_jira_softvision_worklogs', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBitriseBuildsCount(Base):
-    __table__ = Table('report_bitrise_builds_count', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportSentryIssues(Base):
-    __table__ = Table('report_sentry_issues', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportSentryRates(Base):
-    __table__ = Table('report_sentry_rates', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaSoftvisionBugs(Base):
-    __table__ = Table('report_bugzilla_softvision_bugs', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaReleaseFlagsBugs(Base):
-    __table__ = Table('report_bugzilla_query_release_flags_for_bugs', Base.metadata, autoload_with=pool) # noqa
-
-
-class ReportTestRailTestResults(Base):
-    __table__ = Table('report_testrail_test_results', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaMetaBugs(Base):
-    __table__ = Table('report_bugzilla_meta_bugs', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaQueryByKeyword(Base):
-    __table__ = Table('report_bugzilla_query_by_keyword', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportBugzillaOverallBugs(Base):
-    __table__ = Table('report_bugzilla_overall_bugs', Base.metadata, autoload_with=pool)  # noqa
-
-
-class ReportGithubBugs(Base):
-    __table__ = Table('report_github_bugs', Base.metadata, autoload_with=pool)  # noqa
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import namedtuple
+
+import pandas as pd
+from sqlalchemy import MetaData, Table, and_, case, insert, or_, select, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import DBAPIError
+
+# DB_MAX_WORKERS is re-exported: the report helpers cap their pools at it
+from lib.database_conn import (  # noqa: F401
+    BULK_LOADER,
+    DB_MAX_WORKERS,
+    Base,
+    pool,
+    scoped_sessions,
+    strip_four_byte_utf8,
+)
+from lib.write_behind import WriteBehind
+
+BULK_CHUNK_SIZE = 1000
+
+# Last-synced position of an incremental connector (see sync_state)
+SyncCursor = namedtuple('SyncCursor', 'synced_until max_id page_token')
+
+# MySQL errors meaning LOAD DATA LOCAL INFILE is disabled on the server
+# (1148, 3948) or refused by the client (2068)
+_INFILE_DISABLED = {1148, 2068, 3948}
+
+# ORM models, reflected from the database on first use (see __getattr__).
+# `from database import Projects` reflects only the `projects` table, and
+# does not touch MySQL at all when the metadata cache is warm.
+MODELS = {
+    'Projects': 'projects',
+    'TestAutomationStatus': 'test_automation_status',
+    'TestAutomationCoverage': 'test_automation_coverage',
+    'TestSuites': 'test_suites',
+    'TestRailCaseSnapshots': 'testrail_case_snapshots',
+    'TestSubSuites': 'test_sub_suites',
+    'ReportTestCaseCoverage': 'report_test_case_coverage',
+    'ReportTestRailTestHealth': 'report_testrail_test_health',
+    'ReportTestRailTestPlans': 'report_testrail_test_plans',
+    'ReportTestRailTestRuns': 'report_testrail_test_runs',
+    'ReportGithubIssues': 'report_github_issues',
+    'ReportJiraQARequests': 'report_jira_qa_requests',
+    'ReportJIraQARequestsNewIssueType': 'report_jira_qa_requests_new_issue_types',
+    'ReportJiraQARequestsDesktop': 'report_jira_qa_requests_desktop',
+    'ReportJiraQANeeded': 'report_jira_qa_needed',
+    'ReportJiraSoftvisionIssuesQATeams': 'report_jira_softvision_issues_qa_teams',
+    'ReportJiraSoftvisionIssuesOtherTeams': 'report_jira_softvision_issues_other_teams',
+    'ReportBugzillaQENeeded': 'report_bugzilla_qe_needed',
+    'ReportBugzillaQEVerifyCount': 'report_bugzilla_qe_needed_count',
+    'ReportTestRailMilestones': 'report_testrail_milestones',
+    'ReportTestRailUsers': 'report_testrail_users',
+    'ReportJiraSoftvisionWorklogs': 'report_jira_softvision_worklogs',
+    'ReportBitriseBuildsCount': 'report_bitrise_builds_count',
+    'ReportSentryIssues': 'report_sentry_issues',
+    'ReportSentryRates': 'report_sentry_rates',
+    'ReportBugzillaSoftvisionBugs': 'report_bugzilla_softvision_bugs',
+    'ReportBugzillaReleaseFlagsBugs': 'report_bugzilla_query_release_flags_for_bugs',
+    'ReportTestRailTestResults': 'report_testrail_test_results',
+    'ReportBugzillaMetaBugs': 'report_bugzilla_meta_bugs',
+    'ReportBugzillaQueryByKeyword': 'report_bugzilla_query_by_keyword',
+    'ReportBugzillaOverallBugs': 'report_bugzilla_overall_bugs',
+    'ReportGithubBugs': 'report_github_bugs',
+    'SyncState': 'sync_state',
+    # 'ReportTestRunCounts': 'report_test_run_counts',
+}
+
+# Reflected table definitions are pickled here, in a file keyed by the hash
+# of db/schema.sql, db/migrations/ and the database they were reflected
+# from (host, port, CLOUD_SQL_DATABASE_NAME), so they are re-reflected
+# whenever the schema changes or another database is targeted. Set
+# DB_METADATA_CACHE_DIR to relocate it.
+_DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db')
+METADATA_CACHE_DIR = os.environ.get('DB_METADATA_CACHE_DIR') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'testops-dashboard')
+
+_LOCK = threading.RLock()
+_metadata_cache = None
+
+
+def _schema_files():
+    migrations = os.path.join(_DB_DIR, 'migrations')
+    files = [os.path.join(_DB_DIR, 'schema.sql')]
+    if os.path.isdir(migrations):
+        files += [os.path.join(migrations, name)
+                  for name in sorted(os.listdir(migrations))]
+    return files
+
+
+def metadata_cache_path():
+    """Path of the MetaData cache for the current schema files and
+    database."""
+    digest = hashlib.sha256()
+    url = pool.url
+    digest.update(f'{url.host}:{url.port}/{url.database}\n'.encode())
+    for path in _schema_files():
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return os.path.join(
+        METADATA_CACHE_DIR, f'metadata-{digest.hexdigest()[:16]}.pickle')
+
+
+def _load_metadata_cache():
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = MetaData()
+        try:
+            with open(metadata_cache_path(), 'rb') as f:
+                _metadata_cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+    return _metadata_cache
+
+
+def _save_metadata_cache(metadata):
+    try:
+        path = metadata_cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(metadata, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not write metadata cache: {e}")
+
+
+def reflect_table(name):
+    """Return the Table `name` in Base.metadata, taking it from the
+    metadata cache or, on a cache miss, reflecting it (once) from MySQL."""
+    with _LOCK:
+        if name in Base.metadata.tables:
+            return Base.metadata.tables[name]
+        cache = _load_metadata_cache()
+        if name in cache.tables:
+            return cache.tables[name].to_metadata(Base.metadata)
+        table = Table(name, Base.metadata, autoload_with=pool)
+        table.to_metadata(cache)
+        _save_metadata_cache(cache)
+        return table
+
+
+def __getattr__(name):
+    # PEP 562: build ORM models lazily, the first time they are imported.
+    table_name = MODELS.get(name)
+    if table_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _LOCK:
+        model = globals().get(name)
+        if model is None:
+            model = type(name, (Base,), {
+                '__table__': reflect_table(table_name),
+                '__module__': __name__,
+            })
+            globals()[name] = model
+    return model
+
+
+def __dir__():
+    return sorted(set(globals()) | set(MODELS))
 
 
 class Database:
     def __init__(self):
-        self.session = Session()
+        # Thread-local: every thread using this Database (e.g. the workers
+        # of a fetch pool) gets its own Session behind self.session
+        self.session = scoped_sessions()
+        self.loader = BULK_LOADER
+
+    def release_session(self):
+        """Close the calling thread's session; call it when a worker thread
+        is done with the database."""
+        self.session.remove()
 
     def clean_table(self, table):
         self.session.query(table).delete()
         self.session.commit()
+
+    def get_sync_state(self, source, report, project=''):
+        """Return the SyncCursor stored for (source, report, project), or
+        None if that report was never synced."""
+        table = reflect_table('sync_state')
+        row = self.session.execute(
+            select(table.c.synced_until, table.c.max_id, table.c.page_token)
+            .where(
+                table.c.source == source,
+                table.c.report == report,
+                table.c.project == project,
+            )
+        ).first()
+        return SyncCursor(*row) if row else None
+
+    def set_sync_state(self, source, report, project='', synced_until=None,
+                       max_id=None, page_token=None, commit=False):
+        """Store the cursor a sync of (source, report, project) reached.
+
+        Does not commit by default: call it after loading the rows with
+        commit=False and commit once, so the cursor only moves forward
+        together with the data it covers.
+        """
+        table = reflect_table('sync_state')
+        stmt = mysql_insert(table).values(
+            source=source,
+            report=report,
+            project=project,
+            synced_until=synced_until,
+            max_id=max_id,
+            page_token=page_token,
+        )
+        stmt = stmt.on_duplicate_key_update({
+            col: stmt.inserted[col]
+            for col in ('synced_until', 'max_id', 'page_token')
+        })
+        try:
+            self.session.execute(stmt)
+            if commit:
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def bulk_insert(self, model, df, column_map=None,
+                    chunk_size=BULK_CHUNK_SIZE, commit=True, loader=None):
+        """Insert the rows of a DataFrame into model's table.
+
+        Uses Core insert() executemany in chunks of chunk_size, or LOAD DATA
+        LOCAL INFILE with the 'infile' loader, in a single transaction
+        (rolled back on error). NaN/NaT/None become NULL.
+
+        Args:
+            model: ORM model (or Table) to insert into.
+            df (DataFrame or list of dicts): rows to insert.
+            column_map (dict): {df column: table column}; only mapped
+                columns are inserted. Defaults to df's columns as-is.
+            chunk_size (int): rows per executemany batch.
+            commit (bool): commit when done; pass False to keep the rows
+                in a larger transaction owned by the caller.
+            loader (str): 'executemany' or 'infile'. Defaults to
+                DB_BULK_LOADER (see lib/database_conn.py).
+
+        Returns:
+            int: number of rows inserted.
+        """
+        records = _prepare_records(df, column_map)
+        if not records:
+            return 0
+
+        table = getattr(model, '__table__', model)
+        return self._load(table, records, chunk_size, commit, loader)
+
+    def bulk_upsert(self, model, df, column_map=None, newer_than=None,
+                    chunk_size=BULK_CHUNK_SIZE, commit=True):
+        """Insert rows, updating the existing row on a duplicate key.
+
+        Uses MySQL INSERT ... ON DUPLICATE KEY UPDATE, so the table needs a
+        PRIMARY/UNIQUE key on the natural key column (e.g. jira_key). Every
+        inserted column other than the primary key is updated.
+
+        Args:
+            model, df, column_map, chunk_size, commit: as bulk_insert.
+            newer_than (str): optional timestamp column (table name). When
+                set, an existing row is only updated if the incoming value
+                is not NULL and newer than the stored one (or the stored one
+                is NULL). The check runs in SQL, per row.
+
+        Returns:
+            int: MySQL affected rows (1 per insert, 2 per changed update).
+        """
+        records = _prepare_records(df, column_map)
+        if not records:
+            return 0
+
+        table = getattr(model, '__table__', model)
+        stmt = mysql_insert(table)
+        columns = [
+            col for col in records[0]
+            if not table.c[col].primary_key and col != newer_than
+        ]
+        if newer_than:
+            # MySQL applies the assignments left to right, so the guard
+            # column must be assigned last or later checks would compare
+            # against the value just written.
+            columns.append(newer_than)
+            incoming, stored = stmt.inserted[newer_than], table.c[newer_than]
+            newer = and_(
+                incoming.isnot(None),
+                or_(stored.is_(None), incoming > stored),
+            )
+            updates = [
+                (col, case((newer, stmt.inserted[col]), else_=table.c[col]))
+                for col in columns
+            ]
+        else:
+            updates = [(col, stmt.inserted[col]) for col in columns]
+        stmt = stmt.on_duplicate_key_update(updates)
+        return self._execute_chunked(stmt, records, chunk_size, commit)
+
+    def bulk_replace(self, model, df, column_map=None,
+                     chunk_size=BULK_CHUNK_SIZE, loader=None):
+        """Replace the whole content of model's table with the given rows.
+
+        For full-refresh reports, instead of clean_table() + insert: rows
+        are loaded into a shadow `<table>__staging` (CREATE TABLE ... LIKE)
+        which is then swapped in with a single RENAME TABLE. Readers see
+        either the old or the new data, never an empty or partial table,
+        and there is no table-wide DELETE. If the load fails the live table
+        is left untouched.
+
+        Args:
+            model, df, column_map, chunk_size, loader: as bulk_insert.
+
+        Returns:
+            int: number of rows loaded.
+        """
+        records = _prepare_records(df, column_map)
+
+        staging_table = self._begin_replace(model)
+        try:
+            count = 0
+            if records:
+                count = self._load(
+                    staging_table, records, chunk_size, True, loader)
+            self._finish_replace(model)
+        except Exception:
+            self._abort_replace(model)
+            raise
+        return count
+
+    @contextlib.contextmanager
+    def replacing(self, model, column_map=None, loader=None, **write_behind):
+        """Streaming variant of bulk_replace.
+
+        Yields a lib.write_behind.WriteBehind: rows put() into it are
+        loaded into `<table>__staging` by its writer thread (with its own
+        session) while the caller keeps fetching. The staging table is
+        swapped in when the block exits normally, and dropped, leaving the
+        live table untouched, when it raises.
+
+            with db.replacing(Model, column_map) as writer:
+                for page in pages:
+                    writer.put(rows_of(page))
+
+        Args:
+            model, column_map, loader: as bulk_insert.
+            write_behind: batch_size, flush_interval, max_pending for
+                WriteBehind.
+        """
+        staging_table = self._begin_replace(model)
+        try:
+            with WriteBehind(
+                lambda rows: self.bulk_insert(
+                    staging_table, rows, column_map, loader=loader),
+                on_exit=self.release_session,
+                **write_behind,
+            ) as writer:
+                yield writer
+            print(f"Loaded {writer.count} rows into {staging_table.name}")
+            self._finish_replace(model)
+        except BaseException:
+            self._abort_replace(model)
+            raise
+
+    def _begin_replace(self, model):
+        table = getattr(model, '__table__', model)
+        live, staging, old = _replace_names(table)
+        # MySQL DDL commits implicitly, so close any pending work first.
+        self.session.commit()
+        self.session.execute(text(f'DROP TABLE IF EXISTS `{staging}`, `{old}`'))
+        self.session.execute(text(f'CREATE TABLE `{staging}` LIKE `{live}`'))
+        return table.to_metadata(MetaData(), name=staging)
+
+    def _finish_replace(self, model):
+        live, staging, old = _replace_names(getattr(model, '__table__', model))
+        self.session.execute(text(
+            f'RENAME TABLE `{live}` TO `{old}`, `{staging}` TO `{live}`'))
+        self.session.execute(text(f'DROP TABLE `{old}`'))
+        self.session.commit()
+
+    def _abort_replace(self, model):
+        live, staging, old = _replace_names(getattr(model, '__table__', model))
+        self.session.rollback()
+        self.session.execute(text(f'DROP TABLE IF EXISTS `{staging}`'))
+
+    def _load(self, table, records, chunk_size, commit, loader=None):
+        if (loader or self.loader) == 'infile':
+            # The caller may own the open transaction (commit=False), so a
+            # failed INFILE attempt only rolls back to this savepoint
+            savepoint = self.session.begin_nested()
+            try:
+                count = self._load_infile(table, records)
+            except Exception as e:
+                savepoint.rollback()
+                orig = getattr(e, 'orig', None)
+                if (not isinstance(e, DBAPIError) or orig is None
+                        or orig.args[0] not in _INFILE_DISABLED):
+                    self.session.rollback()
+                    raise
+                print(f"LOAD DATA LOCAL INFILE unavailable ({orig}), "
+                      "falling back to executemany")
+                self.loader = 'executemany'
+            else:
+                savepoint.commit()
+                if commit:
+                    self.session.commit()
+                return count
+        return self._execute_chunked(insert(table), records, chunk_size, commit)
+
+    def _load_infile(self, table, records):
+        """Write records to a temporary TSV file (MySQL's default LOAD DATA
+        format) and load it with LOAD DATA LOCAL INFILE.
+
+        LOCAL implies IGNORE: the server skips rows with a duplicate key
+        instead of failing. Skipped rows raise DuplicateRowsSkipped here,
+        so the infile loader fails like executemany's IntegrityError.
+        """
+        columns = list(records[0])
+        fd, path = tempfile.mkstemp(suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                for record in records:
+                    f.write('\t'.join(_tsv_value(record[c]) for c in columns))
+                    f.write('\n')
+            stmt = text(
+                f"LOAD DATA LOCAL INFILE :path INTO TABLE `{table.name}` "
+                "CHARACTER SET utf8mb4 "
+                f"({', '.join(f'`{c}`' for c in columns)})"
+            )
+            count = self.session.execute(stmt, {'path': path}).rowcount
+        finally:
+            os.remove(path)
+        if count < len(records):
+            raise DuplicateRowsSkipped(
+                f"LOAD DATA skipped {len(records) - count} of {len(records)} "
+                f"rows loading {table.name} (duplicate keys)")
+        return count
+
+    def _execute_chunked(self, stmt, records, chunk_size, commit):
+        count = 0
+        try:
+            for i in range(0, len(records), chunk_size):
+                result = self.session.execute(stmt, records[i:i + chunk_size])
+                count += result.rowcount
+            if commit:
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return count
+
+
+class DuplicateRowsSkipped(Exception):
+    """LOAD DATA LOCAL INFILE skipped rows on a duplicate key."""
+
+
+def _replace_names(table):
+    """(live, staging, old) table names used by bulk_replace."""
+    return table.name, f'{table.name}__staging', f'{table.name}__old'
+
+
+_TSV_ESCAPES = str.maketrans({
+    '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0',
+})
+
+
+def _tsv_value(value):
+    """One field of a LOAD DATA file: \\N for NULL, special chars escaped."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def _prepare_records(df, column_map=None):
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    if column_map:
+        df = df[list(column_map)].rename(columns=column_map)
+    return _to_records(df)
+
+
+def _to_records(df):
+    """DataFrame -> list of dicts of driver-ready values: missing values as
+    None, datetimes as datetime.datetime, 4-byte UTF-8 chars stripped
+    (Core inserts bypass the ORM before_flush hook)."""
+    if df.empty:
+        return []
+    df = strip_four_byte_utf8(df)
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            if series.dt.tz is not None:
+                # DATETIME columns are tz-naive UTC
+                series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+            df[col] = pd.Series(
+                series.dt.to_pydatetime(), index=df.index, dtype=object)
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict('records')
@@ -0,0 +1,65 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Time Database.bulk_replace with each bulk loader.
+
+Loads synthetic rows into report_bugzilla_overall_bugs, so run it against
+a scratch database only (see "Bulk loader" in db/README.md), with
+DB_BULK_LOADER=infile so the connection allows LOAD DATA LOCAL INFILE.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, ReportBugzillaOverallBugs  # noqa: E402
+
+LOADERS = ('executemany', 'infile')
+
+
+def synthetic_bugs(rows):
+    created = datetime(2025, 1, 1)
+    return pd.DataFrame({
+        'bugzilla_key': range(1, rows + 1),
+        'bugzilla_summary': [f"Crash in\ttab {i}\\n" for i in range(rows)],
+        'bugzilla_product': 'Fenix',
+        'bugzilla_bug_severity': 'S3',
+        'bugzilla_bug_priority': 'P2',
+        'bugzilla_bug_status': 'NEW',
+        'bugzilla_bug_resolution': None,
+        'bugzilla_bug_created_at': [
+            created + timedelta(minutes=i) for i in range(rows)],
+        'bugzilla_bug_keyword': 'regression, crash',
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    db = Database()
+    df = synthetic_bugs(args.rows)
+    for loader in LOADERS:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            db.bulk_replace(ReportBugzillaOverallBugs, df, loader=loader)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{loader:>12}: {args.rows} rows, best of {args.repeat} "
+              f"{best:.2f}s ({args.rows / best:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
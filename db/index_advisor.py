@@ -0,0 +1,189 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Check that the columns the reports look rows up by are indexed.
+
+Reads db/schema.sql plus db/migrations/*.sql, reports every lookup in
+HOT_LOOKUPS that no index covers, and prints the DDL to add the missing
+indexes (--write saves it as the next db/migrations file). With --explain
+it also runs EXPLAIN for each lookup against the CLOUD_SQL_* database.
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+from collections import namedtuple
+
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA = os.path.join(DB_DIR, 'schema.sql')
+MIGRATIONS = os.path.join(DB_DIR, 'migrations')
+
+# table, columns filtered on (in index order), report code doing it, and a
+# sample WHERE clause for EXPLAIN
+Lookup = namedtuple('Lookup', 'table columns used_by where')
+
+HOT_LOOKUPS = [
+    Lookup('report_testrail_test_runs', ('testrail_run_id',),
+           'testrail_test_results', 'testrail_run_id = 1'),
+    Lookup('report_testrail_test_runs', ('plan_id',),
+           'testrail_runs_update', 'plan_id IN (1, 2)'),
+    Lookup('report_testrail_test_plans', ('testrail_plan_id',),
+           'testrail_runs_update', 'testrail_plan_id IN (1, 2)'),
+    Lookup('report_testrail_test_health', ('testrail_case_id',),
+           'testrail_test_health', 'testrail_case_id IN (1, 2)'),
+    Lookup('testrail_case_snapshots',
+           ('testrail_project_id', 'testrail_test_suites_id'),
+           'testrail_test_case_coverage',
+           'testrail_project_id = 1 AND testrail_test_suites_id = 1'),
+    Lookup('report_bugzilla_softvision_bugs', ('bugzilla_key',),
+           'bugzilla_desktop_bugs', 'bugzilla_key = 1'),
+    Lookup('report_bugzilla_overall_bugs', ('bugzilla_key',),
+           'bugzilla_fetch_overall_bugs', 'bugzilla_key = 1'),
+    Lookup('report_bugzilla_query_by_keyword', ('bugzilla_key',),
+           'bugzilla_query_by_keyword', 'bugzilla_key = 1'),
+    Lookup('report_jira_qa_requests', ('jira_key',),
+           'jira_qa_requests (incremental upsert)', "jira_key = 'QA-1'"),
+    Lookup('report_jira_qa_requests_new_issue_types', ('jira_key',),
+           'jira_qa_requests_workload (incremental upsert)', "jira_key = 'QA-1'"),
+    Lookup('report_jira_qa_requests_desktop', ('jira_key',),
+           'jira_qa_requests_desktop (incremental upsert)', "jira_key = 'QA-1'"),
+    Lookup('report_jira_softvision_issues_qa_teams', ('jira_key',),
+           'jira_softvision_issues_qa_teams', "jira_key = 'QA-1'"),
+    Lookup('report_jira_softvision_issues_other_teams', ('jira_key',),
+           'jira_softvision_issues_other_teams', "jira_key = 'QA-1'"),
+    Lookup('report_jira_softvision_worklogs', ('jira_worklog_id',),
+           'jira_worklogs_incremental', 'jira_worklog_id IN (1, 2)'),
+    Lookup('report_github_bugs', ('github_number', 'github_project'),
+           'github_update_bugs',
+           "github_number = 1 AND github_project = 'fenix'"),
+    Lookup('report_github_bugs', ('github_project',),
+           'github_issue_insert / get_all_issues', "github_project = 'fenix'"),
+]
+
+_CREATE_TABLE = re.compile(r"CREATE TABLE `(\w+)` \((.*?)\n\)", re.S)
+_ALTER_TABLE = re.compile(r"ALTER TABLE `(\w+)`(.*?);", re.S)
+# PRIMARY KEY, UNIQUE KEY `name`, KEY `name` (and FOREIGN KEY, which
+# InnoDB backs with an index too)
+_INDEX = re.compile(r"\bKEY\s*(?:`\w+`)?\s*\(([^)]*(?:\(\d+\))?[^)]*)\)")
+
+
+def _index_columns(definition):
+    return tuple(re.findall(r"`(\w+)`", definition))
+
+
+def read_indexes(paths):
+    """{table: [index column tuples]} from CREATE/ALTER TABLE statements."""
+    indexes = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            sql = f.read()
+        for table, body in _CREATE_TABLE.findall(sql):
+            indexes[table] = [
+                _index_columns(cols) for cols in _INDEX.findall(body)]
+        for table, body in _ALTER_TABLE.findall(sql):
+            indexes.setdefault(table, []).extend(
+                _index_columns(cols) for cols in _INDEX.findall(body))
+    return indexes
+
+
+def is_covered(lookup, table_indexes):
+    """True if an index starts with the lookup's columns (in any order)."""
+    n = len(lookup.columns)
+    return any(
+        set(index[:n]) == set(lookup.columns) for index in table_indexes)
+
+
+def missing_lookups(indexes, lookups=HOT_LOOKUPS):
+    """(lookups with no covering index, lookups on unknown tables)"""
+    missing, unknown = [], []
+    for lookup in lookups:
+        if lookup.table not in indexes:
+            unknown.append(lookup)
+        elif not is_covered(lookup, indexes[lookup.table]):
+            missing.append(lookup)
+    return missing, unknown
+
+
+def migration_ddl(lookups):
+    lines = [
+        "-- Indexes for the columns the reports look rows up by",
+        "-- (generated by db/index_advisor.py).",
+    ]
+    for lookup in lookups:
+        name = 'idx_' + '_'.join(lookup.columns)
+        columns = ', '.join(f'`{c}`' for c in lookup.columns)
+        lines += [
+            "",
+            f"-- {lookup.used_by}",
+            f"ALTER TABLE `{lookup.table}`",
+            f"  ADD KEY `{name}` ({columns});",
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def next_migration_path(name):
+    numbers = [
+        int(os.path.basename(path)[:3])
+        for path in glob.glob(os.path.join(MIGRATIONS, '[0-9][0-9][0-9]_*.sql'))
+    ]
+    return os.path.join(MIGRATIONS, f'{max(numbers, default=0) + 1:03d}_{name}.sql')
+
+
+def explain(lookups):
+    """Print the EXPLAIN plan of each lookup against the configured DB."""
+    sys.path.insert(0, os.path.dirname(DB_DIR))
+    from sqlalchemy import text
+    from lib.database_conn import pool
+
+    print(f"{'table':<45} {'type':<7} {'key':<28} {'rows':>9}  used by")
+    with pool.connect() as conn:
+        for lookup in lookups:
+            sql = f"EXPLAIN SELECT * FROM `{lookup.table}` WHERE {lookup.where}"
+            plan = conn.execute(text(sql)).mappings().first()
+            flag = '  <-- full scan' if plan['type'] == 'ALL' else ''
+            print(f"{lookup.table:<45} {plan['type'] or '-':<7} "
+                  f"{plan['key'] or '-':<28} {plan['rows'] or 0:>9}  "
+                  f"{lookup.used_by}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--write', action='store_true',
+                        help='save the DDL as the next db/migrations file')
+    parser.add_argument('--explain', action='store_true',
+                        help='EXPLAIN the lookups against the CLOUD_SQL_* db')
+    args = parser.parse_args()
+
+    paths = [SCHEMA] + sorted(glob.glob(os.path.join(MIGRATIONS, '*.sql')))
+    missing, unknown = missing_lookups(read_indexes(paths))
+
+    for lookup in unknown:
+        print(f"? {lookup.table} is not in schema.sql or migrations")
+    for lookup in missing:
+        print(f"- {lookup.table} ({', '.join(lookup.columns)}) is not "
+              f"indexed; used by {lookup.used_by}")
+    if missing:
+        ddl = migration_ddl(missing)
+        if args.write:
+            path = next_migration_path('hot_lookup_indexes')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(ddl)
+            print(f"Wrote {path}")
+        else:
+            print()
+            print(ddl)
+    elif not unknown:
+        print("All hot lookup columns are indexed.")
+
+    if args.explain:
+        print()
+        explain(HOT_LOOKUPS)
+
+
+if __name__ == '__main__':
+    main()
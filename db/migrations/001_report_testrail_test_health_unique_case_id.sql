@@ -0,0 +1,10 @@
+-- report_test_health_update writes with INSERT ... ON DUPLICATE KEY UPDATE,
+-- which needs testrail_case_id to be unique.
+-- Duplicate case ids left by earlier loads are removed first, keeping the
+-- newest row.
+
+DELETE a FROM `report_testrail_test_health` a
+  JOIN `report_testrail_test_health` b
+    ON a.`testrail_case_id` = b.`testrail_case_id` AND a.`id` < b.`id`;
+ALTER TABLE `report_testrail_test_health`
+  ADD UNIQUE KEY `uq_testrail_case_id` (`testrail_case_id`);
@@ -0,0 +1,16 @@
+-- Local snapshot of TestRail cases, keyed by case id.
+-- testrail_test_case_coverage refreshes it with get_cases&updated_after=<max
+-- testrail_updated_on of the suite> and recomputes coverage from it.
+
+CREATE TABLE IF NOT EXISTS `testrail_case_snapshots` (
+  `testrail_case_id` int NOT NULL,
+  `testrail_project_id` int NOT NULL,
+  `testrail_test_suites_id` int NOT NULL,
+  `test_sub_suites` json DEFAULT NULL,
+  `test_automation_status_id` int DEFAULT NULL,
+  `test_automation_coverage_id` int DEFAULT NULL,
+  `test_automation_tae` int NOT NULL DEFAULT '0',
+  `testrail_updated_on` int NOT NULL,
+  PRIMARY KEY (`testrail_case_id`),
+  KEY `project_suite_updated_on` (`testrail_project_id`,`testrail_test_suites_id`,`testrail_updated_on`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
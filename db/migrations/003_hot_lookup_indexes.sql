@@ -0,0 +1,14 @@
+-- Indexes for the columns the reports look rows up by
+-- (generated by db/index_advisor.py).
+
+-- testrail_test_results
+ALTER TABLE `report_testrail_test_runs`
+  ADD KEY `idx_testrail_run_id` (`testrail_run_id`);
+
+-- testrail_runs_update
+ALTER TABLE `report_testrail_test_plans`
+  ADD KEY `idx_testrail_plan_id` (`testrail_plan_id`);
+
+-- github_issue_insert / get_all_issues
+ALTER TABLE `report_github_bugs`
+  ADD KEY `idx_github_project` (`github_project`);
@@ -0,0 +1,15 @@
+-- Last-synced cursor of each incremental connector, keyed by
+-- (source, report, project); project is '' for reports without one.
+-- Written in the same transaction as the rows it covers
+-- (Database.set_sync_state), so a failed load never advances it.
+
+CREATE TABLE IF NOT EXISTS `sync_state` (
+  `source` varchar(50) NOT NULL,
+  `report` varchar(100) NOT NULL,
+  `project` varchar(100) NOT NULL DEFAULT '',
+  `synced_until` datetime DEFAULT NULL,
+  `max_id` bigint DEFAULT NULL,
+  `page_token` varchar(1024) DEFAULT NULL,
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`source`,`report`,`project`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
@@ -0,0 +1,9 @@
+-- Jira worklog id of each report_jira_softvision_worklogs row, so the
+-- incremental sync (api/jira/report_worklogs.py) can upsert the worklogs
+-- Jira reports as updated and delete the ones it reports as deleted.
+-- Rows loaded before this column existed stay NULL until the next full
+-- refresh (the first run without a jira/worklogs sync_state cursor).
+
+ALTER TABLE `report_jira_softvision_worklogs`
+  ADD COLUMN `jira_worklog_id` bigint DEFAULT NULL,
+  ADD UNIQUE KEY `uq_jira_worklog_id` (`jira_worklog_id`);
@@ -0,0 +1,22 @@
+-- Unique jira_key on the Jira filter reports that sync incrementally
+-- (Jira.filters with updated_since), so changed issues are upserted in
+-- place. Duplicate keys left by earlier full loads are removed first,
+-- keeping the newest row.
+
+DELETE a FROM `report_jira_qa_requests` a
+  JOIN `report_jira_qa_requests` b
+    ON a.`jira_key` = b.`jira_key` AND a.`id` < b.`id`;
+ALTER TABLE `report_jira_qa_requests`
+  ADD UNIQUE KEY `jira_key` (`jira_key`);
+
+DELETE a FROM `report_jira_qa_requests_new_issue_types` a
+  JOIN `report_jira_qa_requests_new_issue_types` b
+    ON a.`jira_key` = b.`jira_key` AND a.`id` < b.`id`;
+ALTER TABLE `report_jira_qa_requests_new_issue_types`
+  ADD UNIQUE KEY `jira_key` (`jira_key`);
+
+DELETE a FROM `report_jira_qa_requests_desktop` a
+  JOIN `report_jira_qa_requests_desktop` b
+    ON a.`jira_key` = b.`jira_key` AND a.`id` < b.`id`;
+ALTER TABLE `report_jira_qa_requests_desktop`
+  ADD UNIQUE KEY `jira_key` (`jira_key`);
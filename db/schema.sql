@@ -279,7 +279,8 @@ CREATE TABLE `report_jira_qa_requests` (
   `jira_status` varchar(100) NOT NULL,
   `jira_assignee_username` varchar(100) DEFAULT NULL,
   `jira_labels` varchar(100) DEFAULT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `jira_key` (`jira_key`)
 ) ENGINE=InnoDB AUTO_INCREMENT=68327 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -304,7 +305,8 @@ CREATE TABLE `report_jira_qa_requests_new_issue_types` (
   `jira_tested_train` varchar(100) DEFAULT NULL,
   `jira_issue_type` varchar(50) NOT NULL,
   `jira_parent_link` varchar(25) DEFAULT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `jira_key` (`jira_key`)
 ) ENGINE=InnoDB AUTO_INCREMENT=25619 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -392,7 +394,9 @@ CREATE TABLE `report_jira_softvision_worklogs` (
   `time_spent_seconds` int NOT NULL DEFAULT '0',
   `parent_name` varchar(2000) DEFAULT NULL,
   `child_name` varchar(2000) DEFAULT NULL,
-  PRIMARY KEY (`id`)
+  `jira_worklog_id` bigint DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_jira_worklog_id` (`jira_worklog_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=652343 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -523,6 +527,35 @@ CREATE TABLE `report_testrail_milestones` (
 ) ENGINE=InnoDB AUTO_INCREMENT=10775 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `report_testrail_test_health`
+--
+
+DROP TABLE IF EXISTS `report_testrail_test_health`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `report_testrail_test_health` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `testrail_case_id` int NOT NULL,
+  `testrail_project_id` int DEFAULT NULL,
+  `testrail_case_name` varchar(250) DEFAULT NULL,
+  `testrail_suite_name` varchar(250) DEFAULT NULL,
+  `num_executions` int NOT NULL DEFAULT '0',
+  `avg_runtime` double DEFAULT NULL,
+  `pass_rate` double DEFAULT NULL,
+  `most_recent_timestamp` datetime DEFAULT NULL,
+  `most_recent_runtime` double DEFAULT NULL,
+  `most_recent_status` int DEFAULT NULL,
+  `status_history_1` int DEFAULT NULL,
+  `status_history_2` int DEFAULT NULL,
+  `status_history_3` int DEFAULT NULL,
+  `status_history_4` int DEFAULT NULL,
+  `created_on` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_testrail_case_id` (`testrail_case_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `report_testrail_test_plans`
 --
@@ -543,7 +576,8 @@ CREATE TABLE `report_testrail_test_plans` (
   `testrail_created_on` date DEFAULT NULL,
   `testrail_completed_on` timestamp NULL DEFAULT NULL,
   PRIMARY KEY (`id`),
-  KEY `test_run_projects` (`projects_id`)
+  KEY `test_run_projects` (`projects_id`),
+  KEY `idx_testrail_plan_id` (`testrail_plan_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=1147 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -634,7 +668,8 @@ CREATE TABLE `report_testrail_test_runs` (
   `testrail_created_on` date DEFAULT NULL,
   `testrail_completed_on` timestamp NULL DEFAULT NULL,
   PRIMARY KEY (`id`),
-  KEY `test_run_plans` (`plan_id`)
+  KEY `test_run_plans` (`plan_id`),
+  KEY `idx_testrail_run_id` (`testrail_run_id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=68923 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -785,6 +820,46 @@ CREATE TABLE `test_suites` (
   PRIMARY KEY (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=26073 DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `testrail_case_snapshots`
+--
+
+DROP TABLE IF EXISTS `testrail_case_snapshots`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `testrail_case_snapshots` (
+  `testrail_case_id` int NOT NULL,
+  `testrail_project_id` int NOT NULL,
+  `testrail_test_suites_id` int NOT NULL,
+  `test_sub_suites` json DEFAULT NULL,
+  `test_automation_status_id` int DEFAULT NULL,
+  `test_automation_coverage_id` int DEFAULT NULL,
+  `test_automation_tae` int NOT NULL DEFAULT '0',
+  `testrail_updated_on` int NOT NULL,
+  PRIMARY KEY (`testrail_case_id`),
+  KEY `project_suite_updated_on` (`testrail_project_id`,`testrail_test_suites_id`,`testrail_updated_on`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `sync_state`
+--
+
+DROP TABLE IF EXISTS `sync_state`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `sync_state` (
+  `source` varchar(50) NOT NULL,
+  `report` varchar(100) NOT NULL,
+  `project` varchar(100) NOT NULL DEFAULT '',
+  `synced_until` datetime DEFAULT NULL,
+  `max_id` bigint DEFAULT NULL,
+  `page_token` varchar(1024) DEFAULT NULL,
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`source`,`report`,`project`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+/*!40101 SET character_set_client = @saved_cs_client */;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
 
 /*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
@@ -863,7 +938,8 @@ CREATE TABLE `report_github_bugs` (
   `github_project` varchar(250) DEFAULT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
-  UNIQUE KEY `uq_github_number_project` (`github_number`, `github_project`)
+  UNIQUE KEY `uq_github_number_project` (`github_number`, `github_project`),
+  KEY `idx_github_project` (`github_project`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -894,7 +970,8 @@ CREATE TABLE `report_github_bugs` (
     `jira_product` varchar(100) DEFAULT NULL,
     `jira_timeline` text DEFAULT NULL,
     `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY (`id`)
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `jira_key` (`jira_key`)
   ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
   /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -7,8 +7,8 @@ import api.jira.report_worklogs as worklogs
 
 
 def handle_jira_qa_requests(args):
-    requests.jira_qa_requests()
-    requests.jira_qa_requests_workload()
+    requests.jira_qa_requests(full_refresh=args.full_refresh)
+    requests.jira_qa_requests_workload(full_refresh=args.full_refresh)
 
 
 def handle_jira_qa_needed(args):
@@ -16,16 +16,18 @@ def handle_jira_qa_needed(args):
 
 
 def handle_jira_softvision_worklogs(args):
-    worklogs.jira_worklogs()
+    worklogs.jira_worklogs(full_refresh=args.full_refresh)
 
 
 def handle_jira_qa_requests_desktop(args):
-    requests_desktop.jira_qa_requests_desktop()
+    requests_desktop.jira_qa_requests_desktop(full_refresh=args.full_refresh)
 
 
 def handle_jira_softvision_issues_qa_teams(args):
-    softvision_issues_qa_teams.jira_softvision_issues_qa_teams()
+    softvision_issues_qa_teams.jira_softvision_issues_qa_teams(
+        full_refresh=args.full_refresh)
 
 
 def handle_jira_softvision_issues_other_teams(args):
-    softvision_issues_other_teams.jira_softvision_issues_other_teams()
+    softvision_issues_other_teams.jira_softvision_issues_other_teams(
+        full_refresh=args.full_refresh)
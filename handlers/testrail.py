@@ -29,7 +29,8 @@ def handle_testrail_users(args):
 
 
 def handle_testrail_test_case_coverage(args):
-    test_case_coverage.testrail_test_case_coverage(args.arg_list)
+    test_case_coverage.testrail_test_case_coverage(
+        args.arg_list, full_refresh=args.full_refresh)
 
 
 def handle_testrail_test_health(args):
@@ -5,7 +5,8 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import logging
-import requests
+
+from lib.http_conn import get_session
 
 
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +22,7 @@ class BitriseAPIClient:
                                'Authorization': self.token}
             self.BITRISE_APP_SLUG = ''
             self.__url = base_url
+            self.session = get_session('bitrise')
 
         except KeyError:
             print("ERROR: must set BITRISE_TOKEN")
@@ -28,8 +30,8 @@ class BitriseAPIClient:
 
     def get_apps(self):
         url = self.__url
-        resp = requests.get(url,
-                            headers=self.API_HEADER)
+        resp = self.session.get(url,
+                                headers=self.API_HEADER)
         if resp.status_code != 200:
             raise print('GET /apps/ {}'.format(resp.status_code))
         return resp.json()
@@ -44,9 +46,9 @@ class BitriseAPIClient:
     def get_app(self, project, apps):
         url = self.__url
         if not self.BITRISE_APP_SLUG:
-            resp = requests.get('{0}''{1}'.
-                                format(url, self.BITRISE_APP_SLUG),
-                                headers=self.API_HEADER)
+            resp = self.session.get('{0}''{1}'.
+                                    format(url, self.BITRISE_APP_SLUG),
+                                    headers=self.API_HEADER)
             if resp.status_code != 200:
                 raise _logger.error('GET /apps/ {}'.format(resp.status_code))
             return resp.json()
@@ -54,9 +56,9 @@ class BitriseAPIClient:
     def workflows(self, BITRISE_APP_SLUG):
         url = self.__url
         resp = \
-            requests.get('{0}{1}'
-                         '/build-workflows'.format(url, self.BITRISE_APP_SLUG),
-                         headers=self.API_HEADER)
+            self.session.get('{0}{1}'
+                             '/build-workflows'.format(url, self.BITRISE_APP_SLUG),
+                             headers=self.API_HEADER)
         if resp.status_code != 200:
             raise _logger.error('GET /apps/ {}'.format(resp.status_code))
         return resp.json()
@@ -66,9 +68,9 @@ class BitriseAPIClient:
 
         # Change to BITRISE_HOST
         resp = \
-            requests.get('{0}{1}'
-                         '/builds'.format(url, BITRISE_APP_SLUG), # noqa
-                         headers=self.API_HEADER)
+            self.session.get('{0}{1}'
+                             '/builds'.format(url, BITRISE_APP_SLUG), # noqa
+                             headers=self.API_HEADER)
         if resp.status_code != 200:
             raise _logger.error('GET /apps/ {}'.format(resp.status_code))
         return resp.json()
@@ -84,7 +86,7 @@ class BitriseAPIClient:
             if next_cursor:
                 url += f"&next={next_cursor}"
 
-            response = requests.get(url, headers=self.API_HEADER)
+            response = self.session.get(url, headers=self.API_HEADER)
             if response.status_code != 200:
                 print(f"Error fetching builds: {response.status_code}")
                 return builds_data
@@ -7,19 +7,45 @@
 """Base database connector module
 https://github.com/swaathi/sqlalchemy"""
 
+import functools
 import os
 import re
 
+import pandas as pd
 from sqlalchemy import create_engine, engine, event, String
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 # MySQL utf8 columns only support 3-byte UTF-8. Characters in the
 # supplementary planes (emoji, rare CJK, etc.) are 4 bytes and cause
-# DataError on insert. Strip them at the session level so every model
-# is protected regardless of which API the data came from.
+# DataError on insert. Bulk loads strip them per column with
+# strip_four_byte_utf8(); the session hook below covers ORM writes.
 _FOUR_BYTE_UTF8 = re.compile('[\U00010000-\U0010ffff]', flags=re.UNICODE)
 
+# infer_dtype() results of columns that may hold str values
+_TEXT_DTYPES = {'string', 'mixed', 'mixed-integer'}
+
+
+def strip_four_byte_utf8(df):
+    """Return a copy of df with 4-byte UTF-8 characters removed from its
+    text columns.
+
+    One vectorized Series.str.replace per text column, so the cost grows
+    with the number of columns rather than with Python work per value.
+    Non-str values (numbers, lists, None) are left as they are.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if not (series.dtype == object or pd.api.types.is_string_dtype(series)):
+            continue
+        if pd.api.types.infer_dtype(series, skipna=True) not in _TEXT_DTYPES:
+            continue
+        replaced = series.str.replace(_FOUR_BYTE_UTF8, '', regex=True)
+        # .str yields NaN for non-str values: keep the original ones
+        df[col] = replaced.where(replaced.notna(), series)
+    return df
+
 
 db_username = os.environ['CLOUD_SQL_DATABASE_USERNAME']
 db_password = os.environ['CLOUD_SQL_DATABASE_PASSWORD']
@@ -30,8 +56,22 @@ db_host = os.environ.get('CLOUD_SQL_DATABASE_HOST', 'localhost')
 db_port = os.environ.get('CLOUD_SQL_DATABASE_PORT', 3307)
 db_port = int(db_port) if str(db_port).strip() else 3307
 
+# Loader used by Database.bulk_insert / bulk_replace:
+#   executemany  chunked INSERT ... executemany (default)
+#   infile       LOAD DATA LOCAL INFILE from a temporary TSV file; falls
+#                back to executemany when the server has local_infile off
+BULK_LOADER = os.environ.get('DB_BULK_LOADER') or 'executemany'
+
+# Worker threads that may each hold a connection: the TestRail and Jira
+# worker pools (TESTRAIL_MAX_WORKERS in api/testrail/helpers.py and
+# JIRA_MAX_WORKERS in api/jira/helpers.py; read here with the same
+# defaults, as those modules import this one). The pool keeps one
+# connection per worker plus one for the main thread.
+DB_MAX_WORKERS = max(int(os.environ.get('TESTRAIL_MAX_WORKERS') or 8),
+                     int(os.environ.get('JIRA_MAX_WORKERS') or 8))
+
 db_config = {
-    "pool_size": 5,
+    "pool_size": DB_MAX_WORKERS + 1,
     "max_overflow": 2,
     "pool_timeout": 30,  # 30 seconds
     "pool_recycle": 1800,  # 30 minutes
@@ -49,6 +89,8 @@ pool = create_engine(
         database=db_name,
         query={}
     ),
+    # PyMySQL only sends local files when the client flag is set
+    connect_args={'local_infile': BULK_LOADER == 'infile'},
     **db_config
 )
 
@@ -56,14 +98,32 @@ Session = sessionmaker(bind=pool)
 Base.metadata.bind = pool
 
 
+def scoped_sessions():
+    """Return a new thread-local Session registry.
+
+    The registry can be used like a Session: each thread that touches it
+    gets (and reuses) its own Session, so worker threads can flush and
+    commit their own batches. Call .remove() when a worker is done to
+    close its session and give the connection back to the pool.
+    """
+    return scoped_session(Session)
+
+
+@functools.lru_cache(maxsize=None)
+def _string_keys(mapper):
+    return tuple(col.key for col in mapper.columns
+                 if isinstance(col.type, String))
+
+
 @event.listens_for(Session, 'before_flush')
 def _sanitize_string_values(session, flush_context, instances):
+    # Fallback for rows written through the ORM; Database.bulk_* already
+    # sanitize whole DataFrames with strip_four_byte_utf8().
     for obj in session.new | session.dirty:
         mapper = getattr(obj.__class__, '__mapper__', None)
         if mapper is None:
             continue
-        for col in mapper.columns:
-            if isinstance(col.type, String):
-                val = getattr(obj, col.key, None)
-                if isinstance(val, str) and _FOUR_BYTE_UTF8.search(val):
-                    setattr(obj, col.key, _FOUR_BYTE_UTF8.sub('', val))
+        for key in _string_keys(mapper):
+            val = getattr(obj, key, None)
+            if isinstance(val, str) and _FOUR_BYTE_UTF8.search(val):
+                setattr(obj, key, _FOUR_BYTE_UTF8.sub('', val))
@@ -5,9 +5,10 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import os
-import requests
 from requests.exceptions import HTTPError
 
+from lib.http_conn import get_session
+
 
 class APIClient:
     def __init__(self, base_url='https://api.github.com'):
@@ -15,6 +16,7 @@ class APIClient:
             base_url += '/'
         self.__url = base_url
         self.api_token = os.environ.get('GITHUB_TOKEN', '')
+        self.session = get_session('github')
 
     def http_get(self, uri):
         headers = {
@@ -27,7 +29,7 @@ class APIClient:
 
         while url:
             print(f"Fetching: {url}")
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
             try:
                 response.raise_for_status()
             except HTTPError:
@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Shared pooled HTTP transport for the lib/*_conn API clients.
+
+Every connector asks for a session by service name ('testrail', 'jira', ...)
+and gets back the same long-lived keep-alive requests.Session for the whole
+process, so paginated pulls reuse TCP+TLS connections instead of paying a
+fresh handshake per page.
+
+Defaults can be tuned through the environment:
+  HTTP_POOL_CONNECTIONS  number of per-host pools kept by each session
+  HTTP_POOL_MAXSIZE      max keep-alive connections per host
+  HTTP_TIMEOUT           default (connect, read) timeout in seconds
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _env_number(name, default, cast=int):
+    value = os.environ.get(name, '')
+    return cast(value) if str(value).strip() else default
+
+
+DEFAULT_POOL_CONNECTIONS = _env_number('HTTP_POOL_CONNECTIONS', 10)
+DEFAULT_POOL_MAXSIZE = _env_number('HTTP_POOL_MAXSIZE', 16)
+DEFAULT_TIMEOUT = _env_number('HTTP_TIMEOUT', 60.0, cast=float)
+
+_SESSIONS = {}
+_LOCK = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a sized connection pool and a default timeout.
+
+    The timeout is only applied when the caller does not pass one, so
+    existing per-call timeouts keep working unchanged.
+    """
+
+    def __init__(self,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session(service, **kwargs):
+    """Return the process-wide session for `service`, creating it on first use.
+
+    kwargs (pool_connections, pool_maxsize, timeout) only take effect when
+    the session is created; later callers share the existing pool.
+    """
+    with _LOCK:
+        session = _SESSIONS.get(service)
+        if session is None:
+            session = PooledSession(**kwargs)
+            _SESSIONS[service] = session
+        return session
+
+
+def close_sessions():
+    """Close every pooled session (releases keep-alive sockets)."""
+    with _LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
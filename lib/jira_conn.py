@@ -12,10 +12,23 @@ https://docs.atlassian.com/software/jira/docs/api/REST/9.16.0/
 
 Copyright Atlassian developer. See license.md for details.
 """
-import requests
-
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from requests.auth import HTTPBasicAuth
-from urllib.parse import urlsplit, parse_qsl
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+from lib.http_conn import get_session
+
+# Sharded search: number of `created` ranges a large JQL search is split
+# into, each paged through its own nextPageToken chain concurrently.
+# Off by default (0/1 keeps the single serial token chain): sharding costs
+# two extra bound lookups, which only pays off for large filters. Enable
+# it here for every full filter load, or per call with `shards`.
+SEARCH_SHARDS = int(os.environ.get('JIRA_SEARCH_SHARDS') or 0)
+
+_ORDER_BY = re.compile(r'\s+order\s+by\s+.*$', re.I | re.S)
 
 
 class JiraAPIClient:
@@ -25,6 +38,7 @@ class JiraAPIClient:
         if not base_url.endswith('/'):
             base_url += '/'
         self.__url = base_url
+        self.session = get_session('jira')
 
     def get_search(self, query, data_type):
         """
@@ -40,6 +54,99 @@ class JiraAPIClient:
         """
         return self.__send_request(query, data_type)
 
+    def get_search_sharded(self, query, data_type='issues', shards=None):
+        """
+        Same result as get_search for an enhanced search query, fetched as
+        `shards` (default SEARCH_SHARDS) disjoint `created` ranges in
+        parallel.
+
+        The range bounds split the interval between the oldest and newest
+        issue the JQL matches. Adjacent shards share a bound (`created <
+        b` / `created >= b`), so every issue falls in exactly one range
+        whatever timezone Jira reads the bounds in. Issues are merged in
+        shard order and deduplicated by key (the last copy wins), since
+        an issue can still show up twice while it is being edited.
+        """
+        shards = SEARCH_SHARDS if shards is None else shards
+        parts = urlsplit(query)
+        params = parse_qsl(parts.query)
+        jql = dict(params).get('jql')
+        if shards <= 1 or not jql:
+            return self.get_search(query, data_type)
+
+        jql = _ORDER_BY.sub('', jql)
+        bounds = self.__created_bounds(parts.path, jql, shards)
+        if not bounds:
+            return self.get_search(query, data_type)
+
+        ranges = [None] + bounds + [None]
+        queries = []
+        for start, end in zip(ranges, ranges[1:]):
+            shard_jql = f'({jql})'
+            if start:
+                shard_jql += f' AND created >= "{start}"'
+            if end:
+                shard_jql += f' AND created < "{end}"'
+            shard_params = [
+                (k, shard_jql if k == 'jql' else v) for k, v in params]
+            queries.append(urlunsplit(
+                ('', '', parts.path, urlencode(shard_params), '')))
+
+        print(f"Searching {len(queries)} created-date shards concurrently")
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            pages = list(executor.map(
+                lambda q: self.__send_request(q, data_type), queries))
+
+        merged = {}
+        for page in pages:
+            for item in page:
+                merged[item.get('key', id(item))] = item
+        print(f"✅ Total {data_type} retrieved (sharded): {len(merged)}")
+        return list(merged.values())
+
+    def __created_bounds(self, path, jql, shards):
+        """`shards - 1` JQL dates ("yyyy-MM-dd HH:mm") evenly splitting the
+        created dates of the issues jql matches (fewer when they span only
+        a few minutes), or None when there is nothing to split."""
+        def created(order):
+            data = self.get(path, params={
+                'jql': f'({jql}) ORDER BY created {order}',
+                'fields': 'created', 'maxResults': 1})
+            issues = data.get('issues') or []
+            if not issues:
+                return None
+            return datetime.strptime(
+                issues[0]['fields']['created'][:16], '%Y-%m-%dT%H:%M')
+
+        first, last = created('ASC'), created('DESC')
+        if first is None or last is None or first >= last:
+            return None
+        step = (last - first) / shards
+        # Minute resolution: bounds collapse when the span is short
+        return sorted({
+            (first + step * i).strftime('%Y-%m-%d %H:%M')
+            for i in range(1, shards)
+        })
+
+    def get(self, path, params=None):
+        """GET `path` (relative to the API base URL); returns the JSON body."""
+        r = self.session.get(self.__url + path, headers=self.__headers(),
+                             auth=HTTPBasicAuth(self.user, self.password),
+                             params=params, timeout=60)
+        r.raise_for_status()
+        return r.json()
+
+    def post(self, path, payload):
+        """POST `payload` as JSON to `path`; returns the JSON body."""
+        r = self.session.post(self.__url + path, headers=self.__headers(),
+                              auth=HTTPBasicAuth(self.user, self.password),
+                              json=payload, timeout=60)
+        r.raise_for_status()
+        return r.json()
+
+    def __headers(self):
+        return {"Accept": "application/json", "Content-Type": "application/json"}
+
     def __send_request(self, query, data_type):
         url = self.__url + query
         headers = {"Accept": "application/json", "Content-Type": "application/json"}
@@ -71,9 +178,9 @@ class JiraAPIClient:
                 effective = dict(params)
                 if next_token:
                     effective["nextPageToken"] = next_token
-                r = requests.get(url, headers=headers,
-                                 auth=HTTPBasicAuth(self.user, self.password),
-                                 params=effective, timeout=60)
+                r = self.session.get(url, headers=headers,
+                                     auth=HTTPBasicAuth(self.user, self.password),
+                                     params=effective, timeout=60)
                 r.raise_for_status()
                 data = r.json()
 
@@ -96,9 +203,9 @@ class JiraAPIClient:
             params = {"startAt": 0, "maxResults": 100}
             all_logs = []
             while True:
-                r = requests.get(url, headers=headers,
-                                 auth=HTTPBasicAuth(self.user, self.password),
-                                 params=params, timeout=60)
+                r = self.session.get(url, headers=headers,
+                                     auth=HTTPBasicAuth(self.user, self.password),
+                                     params=params, timeout=60)
                 r.raise_for_status()
                 data = r.json()
 
@@ -122,9 +229,9 @@ class JiraAPIClient:
             # Safe default for simple top-level collections
             params["fields"] = "key,summary"
 
-        r = requests.get(url, headers=headers,
-                         auth=HTTPBasicAuth(self.user, self.password),
-                         params=params or None, timeout=60)
+        r = self.session.get(url, headers=headers,
+                             auth=HTTPBasicAuth(self.user, self.password),
+                             params=params or None, timeout=60)
         r.raise_for_status()
         data = r.json()
 
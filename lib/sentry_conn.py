@@ -7,6 +7,8 @@
 import requests
 from requests.exceptions import HTTPError, JSONDecodeError
 
+from lib.http_conn import get_session
+
 
 class APIClient:
     def __init__(self, base_url):
@@ -17,6 +19,7 @@ class APIClient:
         self.__url = (
                 '{0}api/0/'
             ).format(base_url)
+        self.session = get_session('sentry')
 
     def http_get(self, uri, paginate=True):
         headers = {
@@ -29,7 +32,7 @@ class APIClient:
 
         while url:
             print(f"Fetching: {url}")
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
             try:
                 response.raise_for_status()
             except HTTPError:
@@ -15,9 +15,20 @@ Copyright Gurock Software GmbH. See license.md for details.
 
 import base64
 import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+from lib.http_conn import get_session
+
+PAGE_LIMIT = 250
+
+# Opt-in speculative paging: number of offset pages kept in flight at once.
+# 0/1 keeps the serial fetch-one-page-then-the-next behaviour.
+PREFETCH_PAGES = int(os.environ.get('TESTRAIL_PREFETCH_PAGES') or 0)
+
 
 class APIClient:
     def __init__(self, base_url):
@@ -26,6 +37,8 @@ class APIClient:
         if not base_url.endswith('/'):
             base_url += '/'
         self.__url = base_url + 'index.php?/api/v2/'
+        self.session = get_session('testrail')
+        self.prefetch = PREFETCH_PAGES
         print(self.__url)
     
     def send_get(self, uri, data_type=None, filepath=None):
@@ -41,6 +54,26 @@ class APIClient:
         """
 
         return self.__send_request('GET', uri, data_type, filepath)
+
+    def iter_get(self, uri, data_type, prefetch=None):
+        """Iterate over a paginated collection (GET), one page at a time.
+
+        Unlike send_get, which collects every page before returning, this
+        only holds the current page in memory, so callers that consume it
+        incrementally stay flat however large the collection is.
+
+        Args:
+            uri: The API method to call including parameters, e.g.
+                get_cases/1&suite_id=2.
+            data_type: The collection key of the response, e.g. 'cases'.
+            prefetch: Number of pages to request ahead (defaults to
+                self.prefetch, i.e. TESTRAIL_PREFETCH_PAGES).
+
+        Yields:
+            The items of the collection, in API order.
+        """
+        for page in self.__iter_pages(uri, data_type, prefetch):
+            yield from page
     
 
     def send_post(self, uri, data):
@@ -55,61 +88,31 @@ class APIClient:
         Returns:
             A dict containing the result of the request.
         """
-        return self.__send_request('POST', uri, data)
+        return self.__send_request('POST', uri, None, data)
 
     def __send_request(self, method, uri, data_type, data):
         url = self.__url + uri
-        auth = str(
-            base64.b64encode(
-                bytes('%s:%s' % (self.user, self.password), 'utf-8')
-            ),
-            'ascii'
-        ).strip()
-        headers = {'Authorization': 'Basic ' + auth}
+        headers = self.__headers()
 
         if method == 'POST':
             if uri[:14] == 'add_attachment':    # add_attachment API method
+                # requests sets the multipart Content-Type (with boundary)
+                del headers['Content-Type']
                 files = {'attachment': (open(data, 'rb'))}
-                response = requests.post(url, headers=headers, files=files)
+                response = self.session.post(url, headers=headers, files=files)
                 files['attachment'].close()
             else:
-                headers['Content-Type'] = 'application/json'
                 payload = bytes(json.dumps(data), 'utf-8')
-                response = requests.post(url, headers=headers, data=payload)
+                response = self.session.post(url, headers=headers, data=payload)
         else:
-            all_items = []
-            offset = 0
-            limit = 250
-
-            headers['Content-Type'] = 'application/json'
-
-            while True:
-                response = requests.get(f"{url}&limit={limit}&offset={offset}", headers=headers)
-                data = response.json()
-
-                if data_type is None:
-                    # No collection key expected — caller wants the raw
-                    # response (e.g. a single plan/case object).
-                    all_items = data
-                    break
-                elif isinstance(data, dict) and data_type in data:
-                    all_items.extend(data[data_type])  # Append cases/milestones
-
-                    if len(data[data_type]) < limit:
-                        break
-                elif isinstance(data, list):
-                    all_items = data  # Legacy (non-paginated) list response
-                    break
-                else:
-                    # Unexpected/error response (e.g. {"error": ...}) — the
-                    # expected key is missing. Don't leak the dict downstream;
-                    # callers expect a list.
-                    print(f"Unexpected response for '{data_type}': {data}")
-                    all_items = []
-                    break
-
-                offset += limit
+            if data_type is None:
+                # No collection key expected — caller wants the raw
+                # response (e.g. a single plan/case object).
+                return self.__get_page(url, 0).json()
 
+            all_items = []
+            for page in self.__iter_pages(uri, data_type):
+                all_items.extend(page)  # Append cases/milestones
             return all_items
 
         if response.status_code > 201:
@@ -131,6 +134,86 @@ class APIClient:
                 except requests.exceptions.HTTPError: 
                     return {}
 
+    def __headers(self):
+        auth = str(
+            base64.b64encode(
+                bytes('%s:%s' % (self.user, self.password), 'utf-8')
+            ),
+            'ascii'
+        ).strip()
+        return {
+            'Authorization': 'Basic ' + auth,
+            'Content-Type': 'application/json',
+        }
+
+    def __get_page(self, url, offset):
+        return self.session.get(
+            f"{url}&limit={PAGE_LIMIT}&offset={offset}",
+            headers=self.__headers(),
+        )
+
+    def __get_json(self, url, offset):
+        return self.__get_page(url, offset).json()
+
+    def __page_items(self, data, data_type):
+        """Return (items, is_last_page) for one decoded page."""
+        if isinstance(data, dict) and data_type in data:
+            items = data[data_type]
+            return items, len(items) < PAGE_LIMIT
+        elif isinstance(data, list):
+            return data, True  # Legacy (non-paginated) list response
+        # Unexpected/error response (e.g. {"error": ...}) — the
+        # expected key is missing. Don't leak the dict downstream;
+        # callers expect a list.
+        print(f"Unexpected response for '{data_type}': {data}")
+        return [], True
+
+    def __iter_pages(self, uri, data_type, prefetch=None):
+        url = self.__url + uri
+        depth = self.prefetch if prefetch is None else prefetch
+        if depth and depth > 1:
+            yield from self.__iter_pages_prefetch(url, data_type, depth)
+            return
+
+        offset = 0
+        while True:
+            items, last = self.__page_items(
+                self.__get_json(url, offset), data_type)
+            yield items
+            if last:
+                return
+            offset += PAGE_LIMIT
+
+    def __iter_pages_prefetch(self, url, data_type, depth):
+        """Keep `depth` offset pages in flight, yielding them in order.
+
+        The page size is fixed, so the next offsets are known before the
+        current page arrives. Paging stops at the first short page; any
+        pages requested past it (empty by definition) are discarded.
+        """
+        executor = ThreadPoolExecutor(max_workers=depth)
+        pending = deque()
+        next_offset = 0
+
+        def request_next():
+            nonlocal next_offset
+            pending.append(
+                executor.submit(self.__get_json, url, next_offset))
+            next_offset += PAGE_LIMIT
+
+        try:
+            for _ in range(depth):
+                request_next()
+            while pending:
+                items, last = self.__page_items(
+                    pending.popleft().result(), data_type)
+                yield items
+                if last:
+                    return
+                request_next()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
 
 class APIError(Exception):
     pass
@@ -0,0 +1,155 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Write-behind buffer between a report's fetch loop and its DB load.
+
+The fetch loop put()s rows as pages arrive; a writer thread groups them
+into batches and hands each batch to `write`, so HTTP and DB time overlap
+instead of adding up. The queue is bounded: when the writer falls behind,
+put() blocks, which keeps memory bounded.
+
+Defaults can be tuned through the environment:
+  WRITE_BEHIND_BATCH_SIZE      rows per write() call
+  WRITE_BEHIND_FLUSH_INTERVAL  max seconds a partial batch waits
+  WRITE_BEHIND_MAX_PENDING     put() calls queued before put() blocks
+"""
+
+import os
+import queue
+import threading
+import time
+
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE') or 1000)
+WRITE_BEHIND_FLUSH_INTERVAL = float(
+    os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL') or 5)
+WRITE_BEHIND_MAX_PENDING = int(os.environ.get('WRITE_BEHIND_MAX_PENDING') or 8)
+
+_DONE = object()
+
+
+class WriteBehind:
+    """Bounded queue plus one writer thread calling write(rows).
+
+    Use it as a context manager: leaving the block normally flushes the
+    remaining rows and waits for the writer; leaving it with an exception
+    drops whatever is still queued. An exception raised by write() stops
+    the writer and is re-raised by the next put() or by close().
+
+    Args:
+        write (callable): called on the writer thread with a list of rows.
+        batch_size (int): rows per write() call.
+        flush_interval (float): seconds after which a partial batch is
+            written anyway.
+        max_pending (int): put() calls that may be queued before put()
+            blocks.
+        on_exit (callable): called on the writer thread when it stops,
+            e.g. to release a thread-local DB session.
+    """
+
+    def __init__(self, write,
+                 batch_size=WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval=WRITE_BEHIND_FLUSH_INTERVAL,
+                 max_pending=WRITE_BEHIND_MAX_PENDING,
+                 on_exit=None):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_exit = on_exit
+        self.count = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._aborted = False
+        self._thread = threading.Thread(
+            target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def put(self, rows):
+        """Queue rows (a list of dicts) for writing; blocks while the queue
+        is full."""
+        self._raise_error()
+        rows = list(rows)
+        if not rows:
+            return
+        while True:
+            try:
+                self._queue.put(rows, timeout=1)
+                return
+            except queue.Full:
+                self._raise_error()
+
+    def close(self):
+        """Write the remaining rows and stop the writer."""
+        self._queue.put(_DONE)
+        self._thread.join()
+        self._raise_error()
+
+    def abort(self):
+        """Stop the writer, dropping the rows that were not written yet."""
+        self._aborted = True
+        try:
+            self._queue.put_nowait(_DONE)
+        except queue.Full:
+            pass  # the writer wakes up on the queued rows and stops
+        self._thread.join()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        batch = []
+        deadline = None
+        done = False
+        try:
+            while True:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                done = item is _DONE
+                if self._aborted:
+                    break
+                if done:
+                    self._flush(batch)
+                    break
+                if item is not None:
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval
+                    batch.extend(item)
+                while len(batch) >= self.batch_size:
+                    self._flush(batch[:self.batch_size])
+                    batch = batch[self.batch_size:]
+                if batch and (item is None or time.monotonic() >= deadline):
+                    self._flush(batch)
+                    batch = []
+                if not batch:
+                    deadline = None
+        except Exception as e:
+            self._error = e
+            # Keep draining so a blocked put() can notice the error
+            while not done and not self._aborted:
+                done = self._queue.get() is _DONE
+        finally:
+            if self.on_exit is not None:
+                self.on_exit()
+
+    def _flush(self, rows):
+        if rows:
+            self.write(rows)
+            self.count += len(rows)
@@ -16,7 +16,7 @@ from lib.jira_conn import JiraAPIClient
 # database.py runs autoload_with=pool at module level (to reflect table schemas),
 # which requires a live DB connection. Unit tests don't have one.
 if 'database' not in sys.modules:
-    sys.modules['database'] = MagicMock()
+    sys.modules['database'] = MagicMock(DB_MAX_WORKERS=8)
 
 ATLASSIAN_BASE_URL = f"https://{os.environ['ATLASSIAN_HOST']}/rest/api/3/"
 
@@ -27,7 +27,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         self.client.user = ""
         self.client.password = ""
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_enhanced_no_fields_no_params(self, mock_get):
         page = {"issues": [], "isLast": True}
         mock_get.return_value = MagicMock(status_code=200, json=lambda: page)
@@ -37,7 +37,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         params_used = mock_get.call_args.kwargs["params"]
         self.assertEqual(params_used["fields"], "key,summary")
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_url_construction(self, mock_get):
         """Test that full URL is constructed correctly"""
         page = {"issues": [], "isLast": True}
@@ -46,12 +46,12 @@ class TestsJiraAPIClient(unittest.TestCase):
         query = "search/jql?jql=project=MTE"
         self.client.get_search(query, "issues")
 
-        # Verify the full URL passed to requests.get
+        # Verify the full URL passed to the pooled session
         called_url = mock_get.call_args.args[0]
         expected_url = f"{ATLASSIAN_BASE_URL}search/jql?jql=project=MTE"
         self.assertEqual(called_url, expected_url)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_enhanced_with_fields_in_query(self, mock_get):
         """Test that fields param is not added if already in query"""
         page = {"issues": [], "isLast": True}
@@ -63,7 +63,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         # Should not override fields since it's already in query
         self.assertNotIn("fields", params_used)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_enhanced_pagination(self, mock_get):
         """Test pagination with multiple pages using nextPageToken"""
         page1 = {
@@ -92,7 +92,56 @@ class TestsJiraAPIClient(unittest.TestCase):
         second_call_params = mock_get.call_args_list[1].kwargs["params"]
         self.assertEqual(second_call_params["nextPageToken"], "token123")
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
+    def test_get_search_sharded_splits_by_created(self, mock_get):
+        """Sharded search runs one created-date range per shard and merges
+        the results, deduplicated by key."""
+        from urllib.parse import parse_qs, urlsplit
+
+        def respond(url, params=None, **kwargs):
+            jql = params.get("jql") or parse_qs(urlsplit(url).query)["jql"][0]
+            if "ORDER BY created ASC" in jql:
+                issues = [{"fields": {"created": "2024-01-01T00:00:00.000+0000"}}]
+            elif "ORDER BY created DESC" in jql:
+                issues = [{"fields": {"created": "2024-01-04T00:00:00.000+0000"}}]
+            elif 'created < "2024-01-02 00:00"' in jql:
+                issues = [{"key": "MTE-1"}, {"key": "MTE-2"}]
+            elif 'created < "2024-01-03 00:00"' in jql:
+                issues = [{"key": "MTE-2"}, {"key": "MTE-3"}]
+            else:
+                issues = [{"key": "MTE-4"}]
+            return MagicMock(status_code=200,
+                             json=lambda: {"issues": issues, "isLast": True})
+
+        mock_get.side_effect = respond
+
+        results = self.client.get_search_sharded(
+            "search/jql?jql=filter=1 ORDER BY key&fields=key", "issues", shards=3)
+
+        self.assertEqual([r["key"] for r in results],
+                         ["MTE-1", "MTE-2", "MTE-3", "MTE-4"])
+        shard_jqls = sorted(
+            parse_qs(urlsplit(c.args[0]).query)["jql"][0]
+            for c in mock_get.call_args_list if "?" in c.args[0])
+        self.assertEqual(shard_jqls, [
+            '(filter=1) AND created < "2024-01-02 00:00"',
+            '(filter=1) AND created >= "2024-01-02 00:00" '
+            'AND created < "2024-01-03 00:00"',
+            '(filter=1) AND created >= "2024-01-03 00:00"',
+        ])
+
+    @patch("lib.http_conn.PooledSession.get")
+    def test_get_search_sharded_serial_when_one_shard(self, mock_get):
+        page = {"issues": [{"key": "MTE-1"}], "isLast": True}
+        mock_get.return_value = MagicMock(status_code=200, json=lambda: page)
+
+        results = self.client.get_search_sharded(
+            "search/jql?jql=project=MTE", "issues", shards=1)
+
+        self.assertEqual(results, [{"key": "MTE-1"}])
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_enhanced_stops_on_empty_results(self, mock_get):
         """Test that pagination stops when no items are returned"""
         page = {"issues": [], "isLast": False, "nextPageToken": "token123"}
@@ -104,7 +153,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         self.assertEqual(len(results), 0)
         self.assertEqual(mock_get.call_count, 1)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_enhanced_raises_on_invalid_data_type(self, mock_get):
         """Test that KeyError is raised when data_type is not a list"""
         page = {"issues": "not a list", "isLast": True}
@@ -116,7 +165,7 @@ class TestsJiraAPIClient(unittest.TestCase):
             self.client.get_search(query, "issues")
         self.assertIn("Expected list", str(context.exception))
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_worklog_url_construction(self, mock_get):
         """Test that worklog URL is constructed correctly"""
         response = {"worklogs": [], "total": 0, "maxResults": 100}
@@ -125,12 +174,12 @@ class TestsJiraAPIClient(unittest.TestCase):
         query = "issue/MTE-123/worklog"
         self.client.get_search(query, "worklogs")
 
-        # Verify the full URL passed to requests.get
+        # Verify the full URL passed to the pooled session
         called_url = mock_get.call_args.args[0]
         expected_url = f"{ATLASSIAN_BASE_URL}issue/MTE-123/worklog"
         self.assertEqual(called_url, expected_url)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_worklog_single_page(self, mock_get):
         """Test worklog endpoint with single page"""
         response = {
@@ -150,7 +199,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         self.assertEqual(results[0]["id"], "1")
         self.assertEqual(mock_get.call_count, 1)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_worklog_pagination(self, mock_get):
         """Test worklog endpoint with multiple pages"""
         page1 = {
@@ -178,7 +227,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         second_call_params = mock_get.call_args_list[1].kwargs["params"]
         self.assertEqual(second_call_params["startAt"], 100)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_worklog_empty(self, mock_get):
         """Test worklog endpoint with no worklogs"""
         response = {"worklogs": [], "total": 0, "maxResults": 100}
@@ -190,7 +239,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         self.assertEqual(len(results), 0)
         self.assertEqual(mock_get.call_count, 1)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_default_endpoint_url_construction(self, mock_get):
         """Test that default endpoint URL is constructed correctly"""
         response = {"projects": [{"key": "MTE"}]}
@@ -199,12 +248,12 @@ class TestsJiraAPIClient(unittest.TestCase):
         query = "project"
         self.client.get_search(query, "projects")
 
-        # Verify the full URL passed to requests.get
+        # Verify the full URL passed to the pooled session
         called_url = mock_get.call_args.args[0]
         expected_url = f"{ATLASSIAN_BASE_URL}project"
         self.assertEqual(called_url, expected_url)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_default_endpoint_with_data_type(self, mock_get):
         """Test default endpoint that returns data_type from response"""
         response = {
@@ -221,7 +270,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         self.assertEqual(len(results), 2)
         self.assertEqual(results[0]["key"], "MTE")
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_default_endpoint_empty_data_type(self, mock_get):
         """Test default endpoint with empty data_type returns whole payload"""
         response = {"key": "MTE-123", "summary": "Test issue"}
@@ -233,7 +282,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         self.assertEqual(results["key"], "MTE-123")
         self.assertEqual(results["summary"], "Test issue")
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_default_endpoint_with_fields_in_query(self, mock_get):
         """Test default endpoint doesn't add fields if already in query"""
         response = {"projects": [{"key": "MTE"}]}
@@ -246,7 +295,7 @@ class TestsJiraAPIClient(unittest.TestCase):
         # Should be None since fields already in URL
         self.assertIsNone(params_used)
 
-    @patch("lib.jira_conn.requests.get")
+    @patch("lib.http_conn.PooledSession.get")
     def test_get_search_http_error(self, mock_get):
         """Test that HTTP errors are raised"""
         mock_response = MagicMock()
@@ -311,10 +360,10 @@ class TestJiraWorklogs(unittest.TestCase):
 
         self.assertIn("No issues returned", str(ctx.exception))
 
-    @patch("api.jira.report_worklogs.jira_delete")
+    @patch("api.jira.report_worklogs._db")
     @patch("api.jira.report_worklogs._jira")
-    def test_db_not_cleared_when_no_issues(self, mock_jira, mock_delete):
-        """jira_delete must not be called if 0 issues are returned."""
+    def test_db_not_cleared_when_no_issues(self, mock_jira, mock_db):
+        """The table must not be replaced if 0 issues are returned."""
         from api.jira.report_worklogs import jira_worklogs
 
         mock_jira.return_value.filter_sv_parent_in_board.return_value = []
@@ -324,12 +373,12 @@ class TestJiraWorklogs(unittest.TestCase):
         except ValueError:
             pass
 
-        mock_delete.assert_not_called()
+        mock_db.return_value.replacing.assert_not_called()
 
-    @patch("api.jira.report_worklogs.jira_delete")
+    @patch("api.jira.report_worklogs._db")
     @patch("api.jira.report_worklogs._jira")
-    def test_db_not_cleared_when_no_worklogs(self, mock_jira, mock_delete):
-        """jira_delete must not be called if issues exist but all have 0 worklogs."""
+    def test_db_not_cleared_when_no_worklogs(self, mock_jira, mock_db):
+        """The staging load is aborted if issues exist but have 0 worklogs."""
         from api.jira.report_worklogs import jira_worklogs
 
         mock_client = mock_jira.return_value
@@ -338,54 +387,384 @@ class TestJiraWorklogs(unittest.TestCase):
         ]
         mock_client.filter_child_issues.return_value = []
         mock_client.filter_worklogs.return_value = []
+        mock_db.return_value.get_sync_state.return_value = None
 
         with self.assertRaises(ValueError) as ctx:
             jira_worklogs()
 
         self.assertIn("no worklog data found", str(ctx.exception))
-        mock_delete.assert_not_called()
+        # The ValueError leaves the replacing() block, which drops staging
+        exit_args = mock_db.return_value.replacing.return_value.__exit__.call_args
+        self.assertIs(exit_args[0][0], ValueError)
+
+    def test_harvest_worklogs_keeps_board_order(self):
+        """Concurrent harvesting yields parent then child rows per issue,
+        in board order."""
+        from concurrent.futures import ThreadPoolExecutor
+        from api.jira.report_worklogs import harvest_worklogs
+
+        def log(author):
+            return {"author": {"displayName": author}, "timeSpent": "1h",
+                    "timeSpentSeconds": 3600,
+                    "started": "2025-01-02T03:04:05.000+0000", "comment": None}
+
+        jira = MagicMock()
+        jira.filter_child_issues.side_effect = lambda key: {
+            "QATT-1": [{"key": "QA-11", "fields": {"summary": "child"}},
+                       {"fields": {}}],
+            "QATT-2": [],
+        }[key]
+        jira.filter_worklogs.side_effect = lambda key: [log(key)]
+        issues = [
+            {"key": "QATT-1", "fields": {"summary": "one", "parent": None}},
+            {"key": "QATT-2", "fields": {"summary": "two", "parent": None}},
+        ]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            rows = list(harvest_worklogs(jira, issues, executor))
+
+        self.assertEqual(
+            [[(r[0], r[1], r[2]) for r in issue_rows] for issue_rows in rows],
+            [
+                [("QATT-1", None, "QATT-1"), ("QATT-1", "QA-11", "QA-11")],
+                [("QATT-2", None, "QATT-2")],
+            ],
+        )
+        self.assertEqual(rows[0][0][5], "2025-01-02 03:04:05")
+        self.assertEqual(rows[0][1][8], "child")
+
+    @patch("api.jira.report_worklogs.report_jira_worklogs_apply_changes")
+    @patch("api.jira.report_worklogs._db")
+    @patch("api.jira.report_worklogs._jira")
+    def test_incremental_applies_changed_board_worklogs(
+            self, mock_jira, mock_db, mock_apply):
+        """With a cursor, only changed worklogs on board issues are
+        upserted, deletions are passed through and the cursor moves to
+        Jira's `until`."""
+        from datetime import datetime
+        from api.jira.report_worklogs import jira_worklogs
+
+        mock_db.return_value.get_sync_state.side_effect = (
+            lambda source, report: MagicMock(
+                synced_until=datetime.utcnow() if report.endswith('_full')
+                else datetime(2025, 1, 1)))
+        client = mock_jira.return_value
+        client.filter_sv_parent_in_board.return_value = [
+            {"id": "10", "key": "QATT-1",
+             "fields": {"summary": "one", "parent": None}}]
+        client.issues_by_ids.return_value = [
+            {"id": "11", "key": "QA-11",
+             "fields": {"summary": "child", "parent": {"id": "10"}}},
+            {"id": "99", "key": "QA-99",
+             "fields": {"summary": "other", "parent": {"id": "50"}}}]
+        client.worklogs_changed_since.side_effect = (
+            lambda since, deleted=False:
+                (["7"], 1735790400000) if deleted
+                else (["5", "6"], 1735776000000))
+        client.worklogs_by_ids.return_value = [
+            {"id": "5", "issueId": "11", "author": {"displayName": "a"},
+             "timeSpent": "1h", "timeSpentSeconds": 3600,
+             "started": "2025-01-02T03:04:05.000+0000", "comment": "c"},
+            {"id": "6", "issueId": "99", "author": {"displayName": "b"},
+             "timeSpent": "1h", "timeSpentSeconds": 3600,
+             "started": "2025-01-02T03:04:05.000+0000", "comment": "c"},
+        ]
+
+        jira_worklogs()
+
+        client.worklogs_changed_since.assert_any_call(1735689600000)
+        # Only the issues of the changed worklogs are looked up
+        client.issues_by_ids.assert_called_once_with(["11", "99"])
+        client.filter_child_issues.assert_not_called()
+        mock_db.return_value.replacing.assert_not_called()
+        rows, deleted, until = mock_apply.call_args[0]
+        self.assertEqual(
+            [(r[0], r[1], r[9]) for r in rows], [("QATT-1", "QA-11", 5)])
+        self.assertEqual(deleted, ["7"])
+        self.assertEqual(until, datetime(2025, 1, 2))
+
+    @patch("api.jira.report_worklogs.report_jira_worklogs_writer")
+    @patch("api.jira.report_worklogs._db")
+    @patch("api.jira.report_worklogs._jira")
+    def test_stale_full_load_reloads_and_keeps_rows_without_id(
+            self, mock_jira, mock_db, mock_writer):
+        """A last full load older than JIRA_FULL_RECONCILE_DAYS replaces
+        the table; shared worklogs are deduped, id-less ones all kept."""
+        from datetime import datetime, timedelta
+        from api.jira.helpers import JIRA_FULL_RECONCILE_DAYS
+        from api.jira.report_worklogs import jira_worklogs
+
+        stale = datetime.utcnow() - timedelta(days=JIRA_FULL_RECONCILE_DAYS + 1)
+        db = mock_db.return_value
+        db.get_sync_state.side_effect = lambda source, report: MagicMock(
+            synced_until=stale if report.endswith('_full')
+            else datetime.utcnow())
+        client = mock_jira.return_value
+        client.filter_sv_parent_in_board.return_value = [
+            {"key": "QATT-1", "fields": {"summary": "one", "parent": None}},
+            {"key": "QATT-2", "fields": {"summary": "two", "parent": None}},
+        ]
+        client.filter_child_issues.return_value = []
+
+        def log(worklog_id):
+            return {"id": worklog_id, "author": {"displayName": "a"},
+                    "timeSpent": "1h", "timeSpentSeconds": 3600,
+                    "started": "2025-01-02T03:04:05.000+0000", "comment": None}
+        client.filter_worklogs.return_value = [log("5"), log(None), log(None)]
+        writer = mock_writer.return_value.__enter__.return_value
+
+        jira_worklogs()
+
+        client.worklogs_changed_since.assert_not_called()
+        written = [row for call in writer.put.call_args_list
+                   for row in call[0][0]]
+        self.assertEqual(
+            [row["worklog_id"] for row in written], [5, None, None, None, None])
+        self.assertEqual(
+            {call[0][1] for call in db.set_sync_state.call_args_list},
+            {'worklogs', 'worklogs_full'})
+
+    def test_worklogs_by_ids_batches_of_1000(self):
+        from api.jira.client import Jira
+
+        jira = Jira.__new__(Jira)
+        jira.client = MagicMock()
+        jira.client.post.side_effect = lambda path, body: body["ids"]
+
+        self.assertEqual(jira.worklogs_by_ids(list(range(2500))),
+                         list(range(2500)))
+        self.assertEqual(
+            [len(c[0][1]["ids"]) for c in jira.client.post.call_args_list],
+            [1000, 1000, 500])
+
+    def test_issues_by_ids_batches_of_100(self):
+        from urllib.parse import unquote
+        from api.jira.client import Jira
+
+        jira = Jira.__new__(Jira)
+        jira.client = MagicMock()
+        jira.client.get_search.return_value = [{"id": "1"}]
+
+        self.assertEqual(len(jira.issues_by_ids(list(range(250)))), 3)
+        queries = [unquote(c[0][0])
+                   for c in jira.client.get_search.call_args_list]
+        self.assertEqual(len(queries), 3)
+        self.assertIn("id in (200,", queries[2])
+        self.assertIn("fields=summary,parent", queries[0])
 
 
 class TestJiraQARequestsEmptyPayload(unittest.TestCase):
 
-    @patch("api.jira.report_qa_requests.jira_delete")
+    @patch("api.jira.report_qa_requests._db")
     @patch("api.jira.report_qa_requests._jira")
-    def test_qa_requests_raises_on_empty_payload(self, mock_jira, mock_delete):
-        """jira_delete must not be called if filters() returns no issues."""
+    def test_qa_requests_raises_on_empty_payload(self, mock_jira, mock_db):
+        """The table must not be replaced if filters() returns no issues."""
         from api.jira.report_qa_requests import jira_qa_requests
 
         mock_jira.return_value.filters.return_value = []
+        mock_db.return_value.get_sync_state.return_value = None
 
         with self.assertRaises(ValueError) as ctx:
             jira_qa_requests()
 
         self.assertIn("empty payload", str(ctx.exception))
-        mock_delete.assert_not_called()
+        mock_db.return_value.bulk_replace.assert_not_called()
 
-    @patch("api.jira.report_qa_requests.jira_delete")
+    @patch("api.jira.report_qa_requests._db")
     @patch("api.jira.report_qa_requests._jira")
-    def test_qa_requests_workload_raises_on_empty_payload(self, mock_jira, mock_delete):
-        """jira_delete must not be called if filters_new_issue_type() returns empty."""
+    def test_qa_requests_workload_raises_on_empty_payload(self, mock_jira, mock_db):
+        """The table must not be replaced if filters_new_issue_type() is empty."""
         from api.jira.report_qa_requests import jira_qa_requests_workload
 
         mock_jira.return_value.filters_new_issue_type.return_value = []
+        mock_db.return_value.get_sync_state.return_value = None
 
         with self.assertRaises(ValueError) as ctx:
             jira_qa_requests_workload()
 
         self.assertIn("empty payload", str(ctx.exception))
-        mock_delete.assert_not_called()
+        mock_db.return_value.bulk_replace.assert_not_called()
 
-    @patch("api.jira.report_qa_requests_desktop.jira_delete")
+    @patch("api.jira.report_qa_requests_desktop._db")
     @patch("api.jira.report_qa_requests_desktop._jira")
-    def test_qa_requests_desktop_raises_on_empty_payload(self, mock_jira, mock_delete):
-        """jira_delete must not be called if filters() returns no issues."""
+    def test_qa_requests_desktop_raises_on_empty_payload(self, mock_jira, mock_db):
+        """The table must not be replaced if filters() returns no issues."""
         from api.jira.report_qa_requests_desktop import jira_qa_requests_desktop
 
         mock_jira.return_value.filters.return_value = []
+        mock_db.return_value.get_sync_state.return_value = None
 
         with self.assertRaises(ValueError) as ctx:
             jira_qa_requests_desktop()
 
         self.assertIn("empty payload", str(ctx.exception))
-        mock_delete.assert_not_called()
+        mock_db.return_value.bulk_replace.assert_not_called()
+
+
+class TestJiraSoftvisionIssuesLoad(unittest.TestCase):
+
+    PAYLOAD = [{"key": "QA-1", "fields": {
+        "summary": "one", "created": "2025-01-02T03:04:05.000+0000",
+        "updated": "2025-01-03T03:04:05.000+0000",
+        "statuscategorychangedate": "2025-01-03T03:04:05.000+0000",
+        "labels": ["qa-verified"], "status": {"name": "Done"}}}]
+
+    @patch("api.jira.report_softvision_issues_other_teams._db")
+    @patch("api.jira.report_softvision_issues_other_teams._jira")
+    def test_full_run_replaces(self, mock_jira, mock_db):
+        """A full reload replaces the table so issues that left the
+        filter drop out."""
+        from api.jira.report_softvision_issues_other_teams import (
+            jira_softvision_issues_other_teams,
+        )
+
+        mock_jira.return_value.filters.return_value = self.PAYLOAD
+        mock_db.return_value.get_sync_state.return_value = None
+
+        jira_softvision_issues_other_teams()
+
+        mock_db.return_value.bulk_replace.assert_called_once()
+        mock_db.return_value.bulk_upsert.assert_not_called()
+
+    @patch("api.jira.report_softvision_issues_other_teams._db")
+    @patch("api.jira.report_softvision_issues_other_teams._jira")
+    def test_incremental_run_upserts(self, mock_jira, mock_db):
+        from datetime import datetime
+        from api.jira.report_softvision_issues_other_teams import (
+            jira_softvision_issues_other_teams,
+        )
+
+        mock_jira.return_value.filters.return_value = self.PAYLOAD
+        mock_db.return_value.get_sync_state.return_value = MagicMock(
+            synced_until=datetime.utcnow())
+
+        jira_softvision_issues_other_teams()
+
+        mock_db.return_value.bulk_replace.assert_not_called()
+        self.assertEqual(
+            mock_db.return_value.bulk_upsert.call_args[1],
+            {"newer_than": "jira_updated_at", "commit": False})
+
+
+class TestJiraProjectedExtraction(unittest.TestCase):
+
+    PAYLOAD = [
+        {"id": "1", "key": "QA-1", "fields": {
+            "summary": "one", "created": "2025-01-02T03:04:05.000+0000",
+            "labels": ["a", "b"], "status": {"name": "Open"},
+            "assignee": {"emailAddress": "qa@example.com"},
+            "customfield_10155": {"value": "Fx 140", "id": "7"},
+            "customfield_10037": 3,
+            "issuelinks": [{"outwardIssue": {"key": "QA-9"}}]}},
+        {"id": "2", "key": "QA-2", "fields": {
+            "summary": "two", "created": "2025-01-03T03:04:05.000+0000",
+            "labels": [], "status": {"name": "Done"}, "assignee": None,
+            "customfield_10155": None, "customfield_10037": None,
+            "issuelinks": []}},
+    ]
+    SELECTED = {
+        'key': 'jira_key',
+        'fields_summary': 'jira_summary',
+        'fields_created': 'jira_created_at',
+        'fields_customfield_10155_value': 'jira_firefox_release_train',
+        'fields_customfield_10037': 'jira_story_points',
+        'fields_status_name': 'jira_status',
+        'fields_assignee_emailAddress': 'jira_assignee_username',
+        'fields_labels': 'jira_labels',
+        'fields_issuelinks': 'jira_linked_issues',
+        'fields_customfield_99999_value': 'jira_missing',
+    }
+
+    def test_projection_matches_json_normalize(self):
+        from api.jira.helpers import prepare_jira_df, select_and_transform_jira_df
+
+        full = prepare_jira_df(self.PAYLOAD)
+        projected = prepare_jira_df(self.PAYLOAD, self.SELECTED)
+
+        self.assertNotIn('fields_customfield_99999_value', projected.columns)
+        self.assertEqual(
+            select_and_transform_jira_df(projected, self.SELECTED).to_dict('records'),
+            select_and_transform_jira_df(full, self.SELECTED).to_dict('records'))
+
+    def test_projection_of_empty_payload_is_empty(self):
+        from api.jira.helpers import prepare_jira_df
+
+        self.assertTrue(prepare_jira_df([], self.SELECTED).empty)
+
+
+class TestJiraFilterIncrementalSync(unittest.TestCase):
+
+    @staticmethod
+    def _db(synced_until, reconciled):
+        db = MagicMock()
+        db.get_sync_state.side_effect = lambda source, report: MagicMock(
+            synced_until=reconciled if report.endswith('_full')
+            else synced_until)
+        return db
+
+    def test_filter_sync_since_overlaps_last_sync(self):
+        from datetime import datetime, timedelta
+        from api.jira.helpers import JIRA_SYNC_OVERLAP_HOURS, filter_sync_since
+
+        last = datetime.utcnow() - timedelta(hours=2)
+        db = self._db(last, last - timedelta(days=1))
+
+        self.assertEqual(
+            filter_sync_since(db, 'qa_requests'),
+            last - timedelta(hours=JIRA_SYNC_OVERLAP_HOURS))
+        self.assertIsNone(
+            filter_sync_since(db, 'qa_requests', full_refresh=True))
+
+    def test_filter_sync_since_reconciles_periodically(self):
+        from datetime import datetime, timedelta
+        from api.jira.helpers import JIRA_FULL_RECONCILE_DAYS, filter_sync_since
+
+        last = datetime.utcnow() - timedelta(hours=2)
+        db = self._db(
+            last, last - timedelta(days=JIRA_FULL_RECONCILE_DAYS + 1))
+        self.assertIsNone(filter_sync_since(db, 'qa_requests'))
+
+        db = MagicMock()
+        db.get_sync_state.return_value = None
+        self.assertIsNone(filter_sync_since(db, 'qa_requests'))
+
+    def test_filters_appends_updated_clause(self):
+        from datetime import datetime
+        from urllib.parse import unquote
+        from api.jira.client import Jira
+
+        jira = Jira.__new__(Jira)
+        jira.client = MagicMock()
+        jira.filters(filter_id="123", updated_since=datetime(2025, 1, 2, 3, 4))
+
+        query = unquote(jira.client.get_search.call_args[0][0])
+        self.assertIn('jql=filter=123 AND updated >= "2025-01-02 03:04"&', query)
+
+    @patch("api.jira.report_qa_requests._db")
+    @patch("api.jira.report_qa_requests._jira")
+    def test_qa_requests_incremental_upserts(self, mock_jira, mock_db):
+        """With a recent cursor only changed issues are fetched and they
+        are upserted, not replaced; the cursor moves in the same commit."""
+        from datetime import datetime, timedelta
+        from api.jira.report_qa_requests import jira_qa_requests
+
+        db = mock_db.return_value
+        last = datetime.utcnow() - timedelta(hours=2)
+        db.get_sync_state.side_effect = \
+            self._db(last, last).get_sync_state.side_effect
+        mock_jira.return_value.filters.return_value = [
+            {"key": "QA-1", "fields": {
+                "summary": "s", "created": "2025-01-02T03:04:05.000+0000",
+                "labels": ["a"], "status": {"name": "Open"}}},
+        ]
+
+        jira_qa_requests()
+
+        since = mock_jira.return_value.filters.call_args[1]["updated_since"]
+        self.assertLess(since, last)
+        db.bulk_replace.assert_not_called()
+        self.assertEqual(db.bulk_upsert.call_args[1], {"commit": False})
+        self.assertEqual(
+            [c[0][1] for c in db.set_sync_state.call_args_list],
+            ["qa_requests"])
+        db.session.commit.assert_called_once()
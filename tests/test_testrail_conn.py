@@ -0,0 +1,115 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import re
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from lib.testrail_conn import PAGE_LIMIT, APIClient
+
+
+def _page(items):
+    response = MagicMock()
+    response.json.return_value = {"cases": items}
+    return response
+
+
+class TestIterGet(unittest.TestCase):
+
+    def setUp(self):
+        self.client = APIClient("https://testrail.invalid")
+        self.client.session = MagicMock()
+
+    def test_streams_pages_until_short_page(self):
+        full = list(range(PAGE_LIMIT))
+        self.client.session.get.side_effect = [
+            _page(full), _page(full), _page([1, 2]),
+        ]
+
+        items = self.client.iter_get("get_cases/1&suite_id=2", "cases")
+
+        # Nothing is fetched until the caller starts consuming.
+        self.client.session.get.assert_not_called()
+        self.assertEqual(next(items), 0)
+        self.assertEqual(self.client.session.get.call_count, 1)
+        self.assertEqual(len(list(items)), 2 * PAGE_LIMIT + 2 - 1)
+        self.assertEqual(self.client.session.get.call_count, 3)
+        last_url = self.client.session.get.call_args[0][0]
+        self.assertTrue(last_url.endswith(f"offset={2 * PAGE_LIMIT}"))
+
+    def test_send_get_collects_pages(self):
+        self.client.session.get.side_effect = [
+            _page(list(range(PAGE_LIMIT))), _page([]),
+        ]
+        self.assertEqual(
+            len(self.client.send_get("get_cases/1", data_type="cases")),
+            PAGE_LIMIT,
+        )
+
+    def test_unexpected_response_yields_nothing(self):
+        response = MagicMock()
+        response.json.return_value = {"error": "nope"}
+        self.client.session.get.return_value = response
+        self.assertEqual(list(self.client.iter_get("get_cases/1", "cases")), [])
+
+
+class TestSendPost(unittest.TestCase):
+
+    def test_send_post_uses_client_headers(self):
+        client = APIClient("https://testrail.invalid")
+        client.session = MagicMock()
+        client.user, client.password = "user", "secret"
+        client.session.post.return_value.status_code = 200
+        client.session.post.return_value.json.return_value = {"id": 1}
+
+        self.assertEqual(client.send_post("add_result/1", {"status_id": 1}),
+                         {"id": 1})
+
+        kwargs = client.session.post.call_args[1]
+        self.assertEqual(kwargs["headers"], {
+            "Authorization": "Basic dXNlcjpzZWNyZXQ=",
+            "Content-Type": "application/json",
+        })
+        self.assertEqual(kwargs["data"], b'{"status_id": 1}')
+
+
+class TestPrefetch(unittest.TestCase):
+
+    TOTAL = 5 * PAGE_LIMIT + 10
+
+    def setUp(self):
+        self.client = APIClient("https://testrail.invalid")
+        self.client.session = MagicMock()
+        self.lock = threading.Lock()
+        self.offsets = []
+        self.client.session.get.side_effect = self._get
+
+    def _get(self, url, headers=None):
+        offset = int(re.search(r"offset=(\d+)", url).group(1))
+        with self.lock:
+            self.offsets.append(offset)
+        return _page(list(range(offset, min(offset + PAGE_LIMIT, self.TOTAL))))
+
+    def test_prefetch_matches_serial_order(self):
+        items = list(self.client.iter_get("get_cases/1", "cases", prefetch=4))
+        self.assertEqual(items, list(range(self.TOTAL)))
+        # Pages 0..5 are needed; at most depth-1 extra offsets are requested.
+        self.assertLessEqual(len(self.offsets), 6 + 3)
+        self.assertEqual(
+            sorted(self.offsets)[:6], [i * PAGE_LIMIT for i in range(6)]
+        )
+
+    def test_prefetch_default_from_client(self):
+        self.client.prefetch = 3
+        self.assertEqual(
+            len(self.client.send_get("get_cases/1", data_type="cases")),
+            self.TOTAL,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
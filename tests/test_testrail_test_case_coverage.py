@@ -0,0 +1,160 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+# Prevent database.py from connecting to MySQL at import time during unit tests.
+if 'database' not in sys.modules:
+    sys.modules['database'] = MagicMock(DB_MAX_WORKERS=8)
+
+# The TestRail client is built from env vars; unit tests never hit the API.
+for var in ('TESTRAIL_HOST', 'TESTRAIL_USERNAME', 'TESTRAIL_PASSWORD'):
+    os.environ.setdefault(var, 'https://testrail.invalid')
+
+from api.testrail import report_test_case_coverage as coverage  # noqa: E402
+from api.testrail.report_test_case_coverage import (  # noqa: E402
+    SuiteJob,
+    TESTRAIL_FULL_RECONCILE_DAYS,
+    case_snapshot_reconcile_due,
+    case_snapshot_row,
+    case_snapshot_watermarks,
+    report_test_coverage_load,
+    report_test_coverage_payload,
+)
+
+MODULE = 'api.testrail.report_test_case_coverage'
+
+
+def _case(case_id, subs=None, status=1, cov=2, labels=None):
+    case = {
+        'id': case_id,
+        'suite_id': 9,
+        'custom_automation_status': status,
+        'custom_automation_coverage': cov,
+        'labels': labels,
+        'updated_on': 1700000000 + case_id,
+    }
+    if subs is not None:
+        case['custom_sub_test_suites'] = subs
+    return case
+
+
+class TestCaseSnapshotRow(unittest.TestCase):
+
+    def test_defaults_and_tae(self):
+        row = case_snapshot_row(17, _case(1, labels=[{'title': 'TAE'}]))
+        self.assertEqual(row['testrail_case_id'], 1)
+        self.assertEqual(row['testrail_project_id'], 17)
+        self.assertEqual(row['testrail_test_suites_id'], 9)
+        self.assertEqual(row['test_sub_suites'], [7])
+        self.assertEqual(row['test_automation_tae'], 1)
+        self.assertEqual(row['testrail_updated_on'], 1700000001)
+
+
+class TestCoveragePayload(unittest.TestCase):
+
+    def test_counts_by_type(self):
+        rows = [
+            case_snapshot_row(17, _case(1, subs=[3, 4])),
+            case_snapshot_row(17, _case(2, subs=[3])),
+            case_snapshot_row(17, _case(3, status=4)),
+        ]
+
+        payload = report_test_coverage_payload(rows)
+
+        self.assertEqual(
+            list(payload.itertuples(index=False, name=None)),
+            [
+                (9, 3, 1, 2, 0, 2),
+                (9, 4, 1, 2, 0, 1),
+                (9, 7, 4, 2, 0, 1),
+            ],
+        )
+
+
+class TestCaseSnapshotSync(unittest.TestCase):
+
+    @patch(f'{MODULE}.TestRailCaseSnapshots', __table__=MagicMock())
+    @patch(f'{MODULE}.select')
+    @patch(f'{MODULE}._db')
+    def test_watermarks_by_suite(self, mock_db, mock_select, mock_model):
+        mock_db.return_value.session.execute.return_value = [
+            (17, 9, 1700000005), (17, 10, 1700000100)]
+
+        self.assertEqual(case_snapshot_watermarks([17]),
+                         {(17, 9): 1700000005, (17, 10): 1700000100})
+
+    @patch(f'{MODULE}._db')
+    def test_reconcile_due_when_full_pull_is_stale(self, mock_db):
+        now = datetime.utcnow()
+        states = {
+            '17': MagicMock(synced_until=now - timedelta(days=1)),
+            '18': MagicMock(synced_until=now - timedelta(
+                days=TESTRAIL_FULL_RECONCILE_DAYS + 1)),
+        }
+        mock_db.return_value.get_sync_state.side_effect = (
+            lambda source, report, project: states.get(project))
+
+        self.assertEqual(case_snapshot_reconcile_due([17, 18, 19]), {18, 19})
+        self.assertEqual(
+            case_snapshot_reconcile_due([17], full_refresh=True), {17})
+
+    @patch(f'{MODULE}.report_test_coverage_load')
+    @patch(f'{MODULE}.case_snapshot_watermarks')
+    @patch(f'{MODULE}.case_snapshot_reconcile_due')
+    @patch(f'{MODULE}.testrail_project_ids')
+    @patch(f'{MODULE}._tr')
+    def test_delta_pull_steps_back_from_watermark(
+            self, mock_tr, mock_ids, mock_due, mock_watermarks, mock_load):
+        mock_ids.return_value = [(1, 17), (2, 18)]
+        mock_due.return_value = {18}
+        mock_watermarks.return_value = {(17, 9): 1700000005}
+        tr = mock_tr.return_value
+        tr.test_suites.side_effect = lambda pid: [{'id': pid - 8, 'name': 's'}]
+        tr.iter_test_cases.return_value = [_case(1)]
+
+        coverage.testrail_test_case_coverage('fenix', max_workers=1)
+
+        mock_watermarks.assert_called_once_with([17])
+        tr.iter_test_cases.assert_any_call(17, 9, updated_after=1700000004)
+        tr.iter_test_cases.assert_any_call(18, 10, updated_after=None)
+        suites, synced, reconciled, _ = mock_load.call_args[0]
+        self.assertEqual([replace for _, replace in synced], [False, True])
+        self.assertEqual(reconciled, {18})
+
+    @patch(f'{MODULE}.TestSuites', __table__=MagicMock())
+    @patch(f'{MODULE}.report_test_coverage_payload')
+    @patch(f'{MODULE}.case_snapshot_rows')
+    @patch(f'{MODULE}.case_snapshot_upsert')
+    @patch(f'{MODULE}.delete')
+    @patch(f'{MODULE}._db')
+    def test_load_replaces_or_upserts_per_suite(
+            self, mock_db, mock_delete, mock_upsert, mock_rows, mock_payload,
+            mock_model):
+        mock_payload.return_value = report_test_coverage_payload([])
+        suites = [SuiteJob(1, 17, 9, 'a'), SuiteJob(2, 18, 10, 'b')]
+        rows = [case_snapshot_row(17, _case(1))]
+        started = datetime(2025, 1, 1)
+
+        report_test_coverage_load(
+            suites, [(rows, False), ([], True)], {18}, started)
+
+        self.assertEqual(
+            [(c[0][:2], c[1]) for c in mock_upsert.call_args_list],
+            [((17, 9), {'replace': False}), ((18, 10), {'replace': True})])
+        db = mock_db.return_value
+        db.set_sync_state.assert_called_once_with(
+            'testrail', 'test_case_coverage_full', project='18',
+            synced_until=started)
+        db.session.commit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import os
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+# Prevent database.py from connecting to MySQL at import time during unit tests.
+if 'database' not in sys.modules:
+    sys.modules['database'] = MagicMock(DB_MAX_WORKERS=8)
+
+# The TestRail client is built from env vars; unit tests never hit the API.
+for var in ('TESTRAIL_HOST', 'TESTRAIL_USERNAME', 'TESTRAIL_PASSWORD'):
+    os.environ.setdefault(var, 'https://testrail.invalid')
+
+from api.testrail.helpers import (  # noqa: E402
+    fetch_concurrently,
+    iter_concurrently,
+)
+from api.testrail.report_test_health import (  # noqa: E402
+    HEALTH_COLUMNS,
+    RESULT_COLUMNS,
+    compute_test_health_rows,
+)
+
+
+def _result(case_id, day, elapsed, status):
+    return [case_id, 17, f"case {case_id}", "suite",
+            datetime(2026, 1, day), elapsed, status]
+
+
+class TestComputeTestHealthRows(unittest.TestCase):
+
+    def test_new_case(self):
+        results = pd.DataFrame([
+            _result(1, 1, 10.0, 1),
+            _result(1, 2, 20.0, 5),
+            _result(1, 3, 99.0, 2),  # blocked: not scored
+        ], columns=RESULT_COLUMNS)
+
+        rows = compute_test_health_rows(
+            results, pd.DataFrame(columns=HEALTH_COLUMNS)
+        )
+
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row["testrail_case_id"], 1)
+        self.assertEqual(row["num_executions"], 2)
+        self.assertAlmostEqual(row["avg_runtime"], 15.0)
+        self.assertAlmostEqual(row["pass_rate"], 0.5)
+        self.assertEqual(row["most_recent_timestamp"], datetime(2026, 1, 3))
+        self.assertEqual(row["most_recent_runtime"], 99.0)
+        self.assertEqual(row["most_recent_status"], 2)
+        self.assertEqual(row["status_history_1"], 5)
+        self.assertEqual(row["status_history_2"], 1)
+        self.assertIsNone(row["status_history_3"])
+
+    def test_merges_with_stored_row(self):
+        stored = pd.DataFrame([{
+            "testrail_case_id": 1,
+            "num_executions": 3,
+            "avg_runtime": 10.0,
+            "pass_rate": 1.0,
+            "most_recent_timestamp": datetime(2026, 1, 5),
+            "most_recent_runtime": 10.0,
+            "most_recent_status": 1,
+            "status_history_1": 1,
+            "status_history_2": 4,
+            "status_history_3": None,
+            "status_history_4": None,
+        }], columns=HEALTH_COLUMNS)
+        results = pd.DataFrame([
+            _result(1, 6, 30.0, 5),   # newer than stored
+            _result(1, 4, 10.0, 1),   # older than stored
+        ], columns=RESULT_COLUMNS)
+
+        row = compute_test_health_rows(results, stored)[0]
+
+        self.assertEqual(row["num_executions"], 5)
+        self.assertAlmostEqual(row["avg_runtime"], 14.0)
+        self.assertAlmostEqual(row["pass_rate"], 0.8)
+        self.assertEqual(row["most_recent_timestamp"], datetime(2026, 1, 6))
+        self.assertEqual(row["most_recent_runtime"], 30.0)
+        self.assertEqual(
+            [row[c] for c in ("most_recent_status", "status_history_1",
+                              "status_history_2", "status_history_3",
+                              "status_history_4")],
+            [5, 1, 1, 1, 4],
+        )
+
+    def test_row_types(self):
+        """Rows carry plain Python values: int case ids (results with no
+        case id dropped) and datetimes rather than pandas Timestamps."""
+        results = pd.DataFrame([
+            _result(None, 1, 10.0, 1),
+            _result(2, 2, 20.0, 5),
+        ], columns=RESULT_COLUMNS)
+
+        rows = compute_test_health_rows(
+            results, pd.DataFrame(columns=HEALTH_COLUMNS)
+        )
+
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertIs(type(row["testrail_case_id"]), int)
+        self.assertEqual(row["testrail_case_id"], 2)
+        self.assertIs(type(row["num_executions"]), int)
+        self.assertIs(type(row["most_recent_status"]), int)
+        self.assertIs(type(row["most_recent_timestamp"]), datetime)
+        self.assertIs(type(row["created_on"]), datetime)
+
+    def test_no_results(self):
+        results = pd.DataFrame(columns=RESULT_COLUMNS)
+        self.assertEqual(
+            compute_test_health_rows(
+                results, pd.DataFrame(columns=HEALTH_COLUMNS)
+            ),
+            [],
+        )
+
+
+class TestFetchConcurrently(unittest.TestCase):
+
+    def test_preserves_input_order(self):
+        # Later items finish first; results must still follow the input.
+        def fetch(n):
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        self.assertEqual(
+            fetch_concurrently(fetch, range(5), max_workers=5),
+            [0, 10, 20, 30, 40],
+        )
+
+    def test_respects_cap(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def fetch(n):
+            with lock:
+                active.append(n)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(n)
+            return n
+
+        fetch_concurrently(fetch, range(12), max_workers=3)
+        self.assertLessEqual(max(peak), 3)
+
+        # A per-call value above the pool's worker count is clamped
+        peak.clear()
+        with patch('api.testrail.helpers.DB_MAX_WORKERS', 2):
+            fetch_concurrently(fetch, range(12), max_workers=10)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_empty(self):
+        self.assertEqual(fetch_concurrently(lambda n: n, []), [])
+
+    def test_iter_bounds_pending_results(self):
+        # While the caller holds a result, at most max_workers fetches
+        # have been submitted beyond the ones already handed over.
+        started = []
+
+        def fetch(n):
+            started.append(n)
+            return n
+
+        results = iter_concurrently(fetch, range(20), max_workers=3)
+        self.assertEqual(next(results), 0)
+        time.sleep(0.05)
+        self.assertLessEqual(len(started), 3)
+        self.assertEqual(list(results), list(range(1, 20)))
+
+
+if __name__ == '__main__':
+    unittest.main()
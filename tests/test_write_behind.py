@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import threading
+import unittest
+
+from lib.write_behind import WriteBehind
+
+
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.exited = threading.Event()
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault('flush_interval', 60)
+        return WriteBehind(self.batches.append, on_exit=self.exited.set,
+                           **kwargs)
+
+    def test_batches_rows_and_flushes_rest_on_close(self):
+        with self._writer(batch_size=3) as writer:
+            writer.put([1, 2])
+            writer.put([3, 4, 5, 6, 7])
+            writer.put([])
+
+        self.assertEqual(self.batches, [[1, 2, 3], [4, 5, 6], [7]])
+        self.assertEqual(writer.count, 7)
+        self.assertTrue(self.exited.is_set())
+
+    def test_flush_interval_writes_partial_batch(self):
+        flushed = threading.Event()
+        writer = WriteBehind(lambda rows: flushed.set(),
+                             batch_size=100, flush_interval=0.01)
+        writer.put([1])
+        self.assertTrue(flushed.wait(5))
+        writer.close()
+
+    def test_write_error_is_raised_to_producer(self):
+        def write(rows):
+            raise RuntimeError("boom")
+
+        writer = WriteBehind(write, batch_size=1, max_pending=1)
+        with self.assertRaises(RuntimeError):
+            # put() blocks on the full queue until it notices the error
+            for _ in range(100):
+                writer.put([1])
+            writer.close()
+
+    def test_abort_drops_pending_rows(self):
+        release = threading.Event()
+
+        def write(rows):
+            release.wait(5)
+            self.batches.append(rows)
+
+        with self.assertRaises(ValueError):
+            with WriteBehind(write, batch_size=1, max_pending=2) as writer:
+                writer.put([1])
+                writer.put([2])
+                writer.put([3])
+                # The writer is still busy with [1] when the block aborts
+                threading.Timer(0.1, release.set).start()
+                raise ValueError
+
+        self.assertEqual(self.batches, [[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()